@@ -1,116 +1,238 @@
 from __future__ import annotations
 
-import json
+import importlib
 import sys
-import urllib.request
-from pathlib import Path
-from typing import List, Optional, Any
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
-from PySide6.QtCore import QTimer, QUrl
+from PySide6.QtCore import QTimer, QUrl, Signal, Slot
 from PySide6.QtGui import QIcon, QDesktopServices
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QTableWidget, QTableWidgetItem, QMessageBox, QLabel,
-    QCheckBox, QComboBox, QHeaderView, QSpinBox, QKeySequenceEdit
+    QPushButton, QTableWidget, QTableView, QMessageBox, QLabel, QAbstractItemView,
+    QCheckBox, QComboBox, QHeaderView, QSpinBox, QKeySequenceEdit,
+    QDialog, QDialogButtonBox, QPlainTextEdit, QLineEdit, QInputDialog
 )
 
-from models import MacroItem
-from storage import load_config, save_config, load_items, write_items, app_resource_path
-from input_send import press_key, click_left
-from scheduler import MacroScheduler
-from overlay import OverlayWindow
-from hotkey import GlobalHotkey
+from item_table import ItemTableModel, install_delegates
+from models import MacroItem, Profile
+from storage import (
+    ConfigWatcher, load_config, save_config_async, flush_config, load_profiles, write_profiles, app_resource_path
+)
+from updater import UpdateChecker, UpdateResult, read_version_json
+from hotkey import (
+    GlobalHotkey, HotkeyBinding, compile_bindings, load_keyboard, ACTIONS,
+    ACTION_TOGGLE, ACTION_STOP, ACTION_PAUSE, ACTION_PROFILE, ACTION_TOGGLE_ITEM, ACTION_TOOL_DELAY,
+)
 
+# Not needed to draw the main window: imported where they are used, and
+# preloaded on a background thread once the window is up (finish_startup).
+if TYPE_CHECKING:
+    from overlay import OverlayWindow
+    from planner import Plan
+    from scheduler import MacroScheduler, PreparedItems
+
+PRELOAD_MODULES = ("scheduler", "overlay", "planner", "limiter", "input_send")
+
+
+def show_update_required(parent: Optional[QWidget], result: UpdateResult) -> None:
+    QMessageBox.warning(
+        parent,
+        "Update required",
+        "This is the older version of the app. Please go install the updated version on "
+        "https://github.com/Kreativscripts/FavWhite"
+    )
+    QDesktopServices.openUrl(QUrl(result.update_url))
+
+
+class TimelinePreviewDialog(QDialog):
+    """Read-only list of the planned fires for the next N minutes."""
+
+    MAX_LINES = 5000
+
+    def __init__(self, items: List[MacroItem], plan: Optional[Plan], minutes: int, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Timeline preview")
+        self.resize(520, 480)
+
+        self._items = items
+        self._plan = plan
+
+        layout = QVBoxLayout(self)
+
+        row = QHBoxLayout()
+        row.addWidget(QLabel("Minutes:"))
+        self.spin_minutes = QSpinBox()
+        self.spin_minutes.setRange(1, 120)
+        self.spin_minutes.setValue(max(1, min(120, minutes)))
+        row.addWidget(self.spin_minutes)
+        row.addStretch(1)
+        layout.addLayout(row)
+
+        self.lbl_summary = QLabel()
+        layout.addWidget(self.lbl_summary)
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        layout.addWidget(self.text, stretch=1)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.spin_minutes.valueChanged.connect(self._refresh)
+        self._refresh()
+
+    def _refresh(self) -> None:
+        from planner import preview_timeline
+
+        plan = self._plan
+        fires = preview_timeline(self._items, plan.offsets_s if plan else None, self.spin_minutes.value() * 60.0)
+
+        spacing_ms = plan.min_spacing_ms if plan else 0.0
+        lines = []
+        close = 0
+        prev = None
+        for t, slot in fires:
+            gap_ms = (t - prev) * 1000.0 if prev is not None else None
+            prev = t
+            flag = ""
+            if gap_ms is not None and gap_ms < spacing_ms:
+                close += 1
+                flag = "  <"
+            if len(lines) < self.MAX_LINES:
+                it = self._items[slot]
+                m, sec = divmod(t, 60.0)
+                gap = f"+{gap_ms:0.0f}ms" if gap_ms is not None else ""
+                lines.append(f"{int(m):02d}:{sec:06.3f}  {it.name} [{it.key}]  {gap}{flag}")
+        if len(fires) > self.MAX_LINES:
+            lines.append(f"... {len(fires) - self.MAX_LINES} more")
+
+        if plan is None:
+            summary = f"{len(fires)} fires, planner off"
+        else:
+            min_gap = "n/a" if plan.min_gap_ms is None else f"{plan.min_gap_ms:0.0f}ms"
+            summary = (
+                f"{len(fires)} fires, planned min gap {min_gap}, "
+                f"{close} closer than {spacing_ms:0.0f}ms"
+            )
+            if not plan.complete:
+                summary += " (planner stopped at its time budget; the rest keep their interval)"
+        self.lbl_summary.setText(summary)
+        self.text.setPlainText("\n".join(lines))
 
-ALLOWED_KEYS = ["2", "3", "4", "5", "6", "7"]
-DEFAULT_UPDATE_URL = "https://github.com/Kreativscripts/FavWhite"
 
+class HotkeyBindingsDialog(QDialog):
+    """Editor for the extra hotkey bindings (favwhite.cfg "hotkeys")."""
 
-def _exe_dir() -> Path:
-    if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
-        return Path(sys._MEIPASS).resolve()
-    if getattr(sys, "frozen", False):
-        return Path(sys.executable).resolve().parent
-    return Path(__file__).resolve().parent
+    ARG_HINTS = {
+        ACTION_PROFILE: "profile name",
+        ACTION_TOGGLE_ITEM: "item name",
+        ACTION_TOOL_DELAY: "ms step, e.g. +5 or -5",
+    }
 
+    def __init__(self, bindings: List[HotkeyBinding], primary: HotkeyBinding, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Hotkeys")
+        self.resize(560, 320)
 
-def _read_version_json() -> dict:
-    p = _exe_dir() / "version.json"
-    if not p.exists():
-        return {
-            "version": "unknown",
-            "version_checker": "https://favnc.pages.dev/bss/whm.json",
-            "update_url": DEFAULT_UPDATE_URL,
-        }
+        self._primary = primary
+        self._result: List[HotkeyBinding] = []
 
-    try:
-        return json.loads(p.read_text(encoding="utf-8"))
-    except Exception:
-        return {
-            "version": "unknown",
-            "version_checker": "https://favnc.pages.dev/bss/whm.json",
-            "update_url": DEFAULT_UPDATE_URL,
-        }
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"Start/Stop stays on {primary.combo} (set in the main window)."))
 
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Hotkey", "Action", "Argument"])
+        hh = self.table.horizontalHeader()
+        hh.setSectionResizeMode(0, QHeaderView.Stretch)
+        hh.setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        hh.setSectionResizeMode(2, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table, stretch=1)
 
-def _extract_remote_version(payload: Any) -> Optional[str]:
-    if payload is None:
-        return None
-    if isinstance(payload, str):
-        return payload.strip()
-    if isinstance(payload, dict):
-        if isinstance(payload.get("version"), str):
-            return payload["version"].strip()
-        for v in payload.values():
-            if isinstance(v, str):
-                return v.strip()
-    return None
-
-
-def check_for_update(parent: QWidget) -> bool:
-    local_cfg = _read_version_json()
-    local_version = str(local_cfg.get("version", "unknown")).strip()
-    checker_url = str(local_cfg.get("version_checker", "")).strip()
-    update_url = str(local_cfg.get("update_url", DEFAULT_UPDATE_URL)).strip()
-
-    if not checker_url:
-        return True
-
-    try:
-        req = urllib.request.Request(
-            checker_url,
-            headers={"User-Agent": f"FavWhite/{local_version}"}
-        )
-        with urllib.request.urlopen(req, timeout=3.5) as resp:
-            raw = resp.read().decode("utf-8", errors="replace")
+        row = QHBoxLayout()
+        btn_add = QPushButton("Add")
+        btn_remove = QPushButton("Remove")
+        btn_add.clicked.connect(lambda: self._append(HotkeyBinding("", ACTION_TOGGLE_ITEM)))
+        btn_remove.clicked.connect(self._remove_selected)
+        row.addWidget(btn_add)
+        row.addWidget(btn_remove)
+        row.addStretch(1)
+        layout.addLayout(row)
 
-        data = json.loads(raw)
-        remote_version = _extract_remote_version(data)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self._accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
 
-        if not remote_version:
-            return True
+        for b in bindings:
+            self._append(b)
 
-        if remote_version.strip() != local_version:
-            QMessageBox.warning(
-                parent,
-                "Update required",
-                "This is the older version of the app. Please go install the updated version on "
-                "https://github.com/Kreativscripts/FavWhite"
-            )
-            QDesktopServices.openUrl(QUrl(update_url))
-            return False
+    def bindings(self) -> List[HotkeyBinding]:
+        return list(self._result)
+
+    def _append(self, b: HotkeyBinding) -> None:
+        r = self.table.rowCount()
+        self.table.insertRow(r)
 
-        return True
+        combo = QKeySequenceEdit()
+        combo.setKeySequence(b.combo)
+        self.table.setCellWidget(r, 0, combo)
 
-    except Exception:
-        return True
+        action = QComboBox()
+        action.addItems([a for a in ACTIONS if a != ACTION_TOGGLE])
+        action.setCurrentText(b.action)
+        self.table.setCellWidget(r, 1, action)
+
+        arg = QLineEdit(b.arg)
+        arg.setPlaceholderText(self.ARG_HINTS.get(b.action, ""))
+        action.currentTextChanged.connect(lambda a, w=arg: w.setPlaceholderText(self.ARG_HINTS.get(a, "")))
+        self.table.setCellWidget(r, 2, arg)
+
+    def _remove_selected(self) -> None:
+        rows = sorted({i.row() for i in self.table.selectedIndexes()}, reverse=True)
+        for r in rows:
+            self.table.removeRow(r)
+
+    def _accept(self) -> None:
+        out: List[HotkeyBinding] = []
+        for r in range(self.table.rowCount()):
+            combo = self.table.cellWidget(r, 0).keySequence().toString().strip()
+            action = self.table.cellWidget(r, 1).currentText()
+            arg = self.table.cellWidget(r, 2).text().strip()
+            if not combo:
+                continue
+            if action in self.ARG_HINTS and not arg:
+                QMessageBox.warning(self, "Invalid hotkey", f"{combo}: {action} needs a {self.ARG_HINTS[action]}.")
+                return
+            out.append(HotkeyBinding(combo, action, arg))
+
+        try:
+            compile_bindings([self._primary] + out)
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid hotkey", str(e))
+            return
+
+        self._result = out
+        self.accept()
 
 
 class MainWindow(QMainWindow):
+    # emitted from the hotkey listener thread, delivered on the GUI thread
+    hotkey_action = Signal(object)
+    # emitted from the config watcher thread with the reloaded config
+    config_changed = Signal(object)
+    # emitted from the update check thread with an UpdateResult
+    update_checked = Signal(object)
+    # emitted from the preload thread once PRELOAD_MODULES and pynput are imported
+    preloaded = Signal()
+
     def __init__(self) -> None:
         super().__init__()
 
-        ver = _read_version_json().get("version", "unknown")
+        ver = read_version_json().get("version", "unknown")
         self.setWindowTitle(f"FavWhite ({ver})")
         self.resize(900, 520)
         self.setMinimumSize(760, 420)
@@ -124,10 +246,20 @@ class MainWindow(QMainWindow):
 
         self._scheduler: MacroScheduler | None = None
         self._overlay: OverlayWindow | None = None
+        self._watcher: ConfigWatcher | None = None
         self._running: bool = False
 
         self._cfg = load_config()
-        self._items: List[MacroItem] = load_items(self._cfg)
+        try:
+            self._profiles: List[Profile] = load_profiles(self._cfg)
+        except ValueError as e:
+            # hand-edited favwhite.cfg: show the items fixed up, Save keeps them
+            QMessageBox.warning(self, "Invalid macro", f"favwhite.cfg: {e}\nOut-of-range values were adjusted.")
+            self._profiles = load_profiles(self._cfg, repair=True)
+        self._active_profile: str = str(self._cfg.get("active_profile") or "Default")
+        # every profile compiled at Start, so a switch while running is one apply_items()
+        self._prepared: Dict[str, PreparedItems] = {}
+        self._items: List[MacroItem] = list(self._profile(self._active_profile).items)
 
         root = QWidget()
         layout = QVBoxLayout(root)
@@ -136,7 +268,26 @@ class MainWindow(QMainWindow):
         lbl_header = QLabel("FavWhite Macro UI")
         lbl_header.setStyleSheet("font-weight: 600; font-size: 13px;")
         header_row.addWidget(lbl_header)
+        header_row.addSpacing(16)
+
+        header_row.addWidget(QLabel("Profile:"))
+        self.profile_box = QComboBox()
+        self.profile_box.setMinimumWidth(140)
+        self.profile_box.activated.connect(lambda _: self._switch_profile(self.profile_box.currentText()))
+        header_row.addWidget(self.profile_box)
+
+        self.btn_profile_save_as = QPushButton("Save as…")
+        self.btn_profile_save_as.clicked.connect(self._save_profile_as)
+        header_row.addWidget(self.btn_profile_save_as)
+
+        self.btn_profile_delete = QPushButton("Delete")
+        self.btn_profile_delete.clicked.connect(self._delete_profile)
+        header_row.addWidget(self.btn_profile_delete)
+
         header_row.addStretch(1)
+        # hotkey-to-last-input latency of the last hotkey stop
+        self.lbl_stop_latency = QLabel("")
+        header_row.addWidget(self.lbl_stop_latency)
         layout.addLayout(header_row)
 
         controls = QHBoxLayout()
@@ -149,32 +300,38 @@ class MainWindow(QMainWindow):
         self.btn_apply_hotkey = QPushButton("Apply hotkey")
         controls.addWidget(self.btn_apply_hotkey)
 
+        self.btn_hotkeys = QPushButton("More hotkeys…")
+        controls.addWidget(self.btn_hotkeys)
+
         controls.addSpacing(16)
 
+        tool_enabled, tool_delay = self._tool_settings(self._profile(self._active_profile))
+
         self.chk_tool_use = QCheckBox("Enable tool use")
-        self.chk_tool_use.setChecked(bool(self._cfg.get("tool_use", {}).get("enabled", False)))
+        self.chk_tool_use.setChecked(tool_enabled)
         controls.addWidget(self.chk_tool_use)
 
         controls.addWidget(QLabel("delay (ms):"))
         self.spin_tool_delay = QSpinBox()
         self.spin_tool_delay.setRange(10, 5000)
-        self.spin_tool_delay.setValue(int(self._cfg.get("tool_use", {}).get("interval_ms", 30)))
+        self.spin_tool_delay.setValue(tool_delay)
         controls.addWidget(self.spin_tool_delay)
 
         controls.addStretch(1)
         layout.addLayout(controls)
 
-        self.table = QTableWidget(0, 6)
-        self.table.setHorizontalHeaderLabels([
-            "Enabled",
-            "Name",
-            "Key",
-            "Interval (ms)",
-            "Jitter min (ms)",
-            "Jitter max (ms)"
-        ])
+        # the item list itself; edits are validated as they are made
+        self._model = ItemTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self._model)
+        install_delegates(self.table)
+        self.table.setEditTriggers(
+            QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked | QAbstractItemView.EditKeyPressed
+        )
 
         hh = self.table.horizontalHeader()
+        # size columns from a sample of rows, not every row
+        hh.setResizeContentsPrecision(100)
         hh.setSectionResizeMode(0, QHeaderView.ResizeToContents)
         hh.setSectionResizeMode(1, QHeaderView.Stretch)
         hh.setSectionResizeMode(2, QHeaderView.ResizeToContents)
@@ -182,7 +339,9 @@ class MainWindow(QMainWindow):
         hh.setSectionResizeMode(4, QHeaderView.ResizeToContents)
         hh.setSectionResizeMode(5, QHeaderView.ResizeToContents)
 
-        self.table.verticalHeader().setVisible(False)
+        vh = self.table.verticalHeader()
+        vh.setVisible(False)
+        vh.setSectionResizeMode(QHeaderView.Fixed)
         self.table.setAlternatingRowColors(True)
         self.table.setSortingEnabled(False)
 
@@ -192,20 +351,24 @@ class MainWindow(QMainWindow):
 
         self.btn_add = QPushButton("Add")
         self.btn_remove = QPushButton("Remove")
+        self.btn_preview = QPushButton("Preview")
         self.btn_save = QPushButton("Save")
         self.btn_start = QPushButton("Start")
         self.btn_stop = QPushButton("Stop")
 
         self.btn_add.clicked.connect(self._add_row)
         self.btn_remove.clicked.connect(self._remove_selected)
+        self.btn_preview.clicked.connect(self._preview)
         self.btn_save.clicked.connect(self._save)
         self.btn_start.clicked.connect(self._start)
         self.btn_stop.clicked.connect(self._stop)
         self.btn_apply_hotkey.clicked.connect(self._apply_hotkey)
+        self.btn_hotkeys.clicked.connect(self._edit_hotkeys)
 
         btn_row.addWidget(self.btn_add)
         btn_row.addWidget(self.btn_remove)
         btn_row.addStretch(1)
+        btn_row.addWidget(self.btn_preview)
         btn_row.addWidget(self.btn_save)
         btn_row.addWidget(self.btn_start)
         btn_row.addWidget(self.btn_stop)
@@ -216,18 +379,273 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(root)
 
         self._load_into_table()
+        self._sync_profile_box()
 
-        self._hotkey = GlobalHotkey(self._toggle_hotkey, self._cfg.get("hotkey", "Ctrl+Q"))
-        self._hotkey.start()
-
-    def _toggle_hotkey(self) -> None:
-        QTimer.singleShot(0, self._toggle_from_ui_thread)
+        self.hotkey_action.connect(self._on_hotkey_action)
+        self.config_changed.connect(self._on_config_changed)
+        self.update_checked.connect(self._on_update_checked)
+        self.preloaded.connect(self._on_preloaded)
+        try:
+            bindings = self._bindings()
+            compile_bindings(bindings)
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid hotkey", f"{e}\nOnly the Start/Stop hotkey is active.")
+            bindings = [HotkeyBinding(self._cfg.get("hotkey", "Ctrl+Q"), ACTION_TOGGLE)]
+        # started by finish_startup(), once pynput has been imported in the background
+        self._hotkey = GlobalHotkey(self._on_hotkey, bindings)
+
+    def finish_startup(self) -> None:
+        """Rest of startup, run once the window is shown: preloading, hotkey, update check."""
+        threading.Thread(target=self._preload, daemon=True).start()
+        self.check_for_update()
+
+    def _preload(self) -> None:
+        # import errors surface where the module is actually used
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+        try:
+            load_keyboard()
+        except Exception:
+            pass
+        self.preloaded.emit()
 
-    def _toggle_from_ui_thread(self) -> None:
-        if self._running:
+    @Slot()
+    def _on_preloaded(self) -> None:
+        try:
+            self._hotkey.start()
+        except Exception as e:
+            QMessageBox.warning(self, "Hotkey unavailable", f"The global hotkey could not be started: {e}")
+
+    def _extra_bindings(self) -> List[HotkeyBinding]:
+        return [HotkeyBinding.from_dict(d) for d in self._cfg.get("hotkeys", []) if isinstance(d, dict)]
+
+    def _profile_bindings(self) -> List[HotkeyBinding]:
+        return [HotkeyBinding(p.hotkey, ACTION_PROFILE, p.name) for p in self._profiles if p.hotkey]
+
+    def _bindings(self, primary: Optional[str] = None) -> List[HotkeyBinding]:
+        combo = primary or self._cfg.get("hotkey", "Ctrl+Q")
+        return [HotkeyBinding(combo, ACTION_TOGGLE)] + self._extra_bindings() + self._profile_bindings()
+
+    def _on_hotkey(self, binding: HotkeyBinding) -> None:
+        # listener thread: stopping or pausing must not wait for the Qt event
+        # loop, so act on the scheduler right here and leave the UI to the GUI thread
+        scheduler = self._scheduler
+        if scheduler is not None:
+            if binding.action in (ACTION_TOGGLE, ACTION_STOP):
+                scheduler.halt()
+            elif binding.action == ACTION_PAUSE:
+                scheduler.toggle_pause()
+        self.hotkey_action.emit(binding)
+
+    @Slot(object)
+    def _on_hotkey_action(self, binding: HotkeyBinding) -> None:
+        action = binding.action
+        if action == ACTION_TOGGLE:
+            if self._running:
+                # already halted by _on_hotkey
+                self._stop()
+            else:
+                self._start()
+        elif action == ACTION_STOP:
             self._stop()
+        elif action == ACTION_PAUSE:
+            if self._running:
+                # already paused or resumed by _on_hotkey
+                self._sync_paused()
+        elif action == ACTION_TOGGLE_ITEM:
+            self._toggle_item(binding.arg)
+        elif action == ACTION_TOOL_DELAY:
+            self._nudge_tool_delay(binding.arg)
+        elif action == ACTION_PROFILE:
+            self._switch_profile(binding.arg)
+
+    @Slot(int, int)
+    def _on_overlay_moved(self, x: int, y: int) -> None:
+        # next Start opens the overlay where it was left
+        self._cfg["overlay"] = {**self._cfg.get("overlay", {}), "x": x, "y": y}
+        save_config_async(self._cfg)
+
+    def _toggle_pause(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.toggle_pause()
+            self._sync_paused()
+
+    def _sync_paused(self) -> None:
+        if self._scheduler is not None and self._overlay is not None:
+            self._overlay.set_paused(self._scheduler.paused_at)
+
+    def check_for_update(self) -> None:
+        """Starts the update check in the background; the window stays usable meanwhile."""
+        UpdateChecker(self.update_checked.emit).start()
+
+    @Slot(object)
+    def _on_update_checked(self, result: UpdateResult) -> None:
+        if not result.update_available:
+            return
+        self._stop()
+        show_update_required(self, result)
+        self.close()
+
+    @Slot(object)
+    def _on_config_changed(self, cfg: dict) -> None:
+        # profiles and hotkeys are applied live; other settings are read on the next Start
+        if self._scheduler is None:
+            return
+        try:
+            profiles = load_profiles(cfg)
+            prepared = self._prepare_profiles(self._scheduler, profiles)
+        except ValueError as e:
+            QMessageBox.warning(self._overlay, "Invalid macro", f"favwhite.cfg changed but was not applied: {e}")
+            return
+
+        self._profiles = profiles
+        self._prepared = prepared
+        # the file is the config now, or the next save would write the old one
+        # back; only the overlay position belongs to this window
+        overlay = self._cfg.get("overlay", {})
+        cfg["overlay"] = {**cfg.get("overlay", {}), **{k: overlay[k] for k in ("x", "y") if k in overlay}}
+        self._cfg = cfg
+        self.hotkey_edit.setKeySequence(self._cfg.get("hotkey", "Ctrl+Q"))
+        self._rebind_hotkeys()
+        # the active profile may have changed along with its items
+        self._active_profile = ""
+        self._switch_profile(str(cfg.get("active_profile") or "Default"), persist=False)
+
+    def _profile(self, name: str) -> Optional[Profile]:
+        for p in self._profiles:
+            if p.name == name:
+                return p
+        return None
+
+    def _tool_settings(self, profile: Optional[Profile]) -> Tuple[bool, int]:
+        tool_use = profile.tool_use if profile is not None else {}
+        return bool(tool_use.get("enabled", False)), int(tool_use.get("interval_ms", 30))
+
+    @staticmethod
+    def _prepare_profiles(scheduler: MacroScheduler, profiles: List[Profile]) -> Dict[str, PreparedItems]:
+        prepared = {}
+        for p in profiles:
+            try:
+                prepared[p.name] = scheduler.prepare_items(p.items)
+            except ValueError as e:
+                raise ValueError(f"Profile {p.name}: {e}") from None
+        return prepared
+
+    def _sync_profile_box(self) -> None:
+        self.profile_box.clear()
+        self.profile_box.addItems([p.name for p in self._profiles])
+        self.profile_box.setCurrentText(self._active_profile)
+        self.btn_profile_delete.setEnabled(len(self._profiles) > 1)
+
+    def _stash_profile(self) -> None:
+        # table and tool widgets back into the active profile
+        p = self._profile(self._active_profile)
+        if p is None:
+            return
+        p.items = self._model.items()
+        p.tool_use = {"enabled": bool(self.chk_tool_use.isChecked()), "interval_ms": int(self.spin_tool_delay.value())}
+
+    def _show_profile(self, p: Profile) -> None:
+        self._items = list(p.items)
+        enabled, delay = self._tool_settings(p)
+        self.chk_tool_use.setChecked(enabled)
+        self.spin_tool_delay.setValue(delay)
+        self._load_into_table()
+
+    def _switch_profile(self, name: str, persist: bool = True) -> None:
+        """Makes `name` the active profile.
+
+        While running this is one apply_items() of the profile compiled at
+        Start plus the tool-use settings; the overlay relabels in place and
+        nothing is read from disk. Stopped, the table is kept in the profile
+        being left and the new one is loaded into it.
+        """
+        p = self._profile(name)
+        if p is None or name == self._active_profile:
+            return
+
+        if self._scheduler is not None:
+            prepared = self._prepared.get(name)
+            if prepared is None:
+                return
+            enabled, delay = self._tool_settings(p)
+            self._scheduler.apply_items(prepared)
+            self._scheduler.set_tool_use_interval_ms(delay)
+            if self._scheduler.tool_slot is not None:
+                self._scheduler.set_tool_use_enabled(enabled)
+            if self._overlay is not None:
+                self._overlay.apply_items(prepared.items)
         else:
-            self._start()
+            self._stash_profile()
+
+        self._active_profile = name
+        self._show_profile(p)
+        self._sync_profile_box()
+        write_profiles(self._cfg, self._profiles, name)
+        if persist:
+            save_config_async(self._cfg)
+
+    def _save_profile_as(self) -> None:
+        name, ok = QInputDialog.getText(self, "Save profile as", "Profile name:", text=self._active_profile)
+        name = name.strip()
+        if not ok or not name:
+            return
+
+        self._stash_profile()
+        current = self._profile(self._active_profile)
+        p = self._profile(name)
+        if p is None:
+            p = Profile(name)
+            self._profiles.append(p)
+        if p is not current:
+            p.items = list(current.items) if current is not None else self._model.items()
+            p.tool_use = dict(current.tool_use) if current is not None else {}
+
+        self._active_profile = name
+        self._sync_profile_box()
+        save_config_async(write_profiles(self._cfg, self._profiles, name))
+
+    def _delete_profile(self) -> None:
+        if len(self._profiles) <= 1:
+            return
+        answer = QMessageBox.question(self, "Delete profile", f"Delete profile '{self._active_profile}'?")
+        if answer != QMessageBox.Yes:
+            return
+
+        self._profiles = [p for p in self._profiles if p.name != self._active_profile]
+        p = self._profiles[0]
+        self._active_profile = p.name
+        self._show_profile(p)
+        self._sync_profile_box()
+        save_config_async(write_profiles(self._cfg, self._profiles, p.name))
+        self._rebind_hotkeys()
+
+    def _rebind_hotkeys(self) -> None:
+        try:
+            self._hotkey.set_bindings(self._bindings())
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid hotkey", str(e))
+
+    def _toggle_item(self, name: str) -> None:
+        r = self._model.find(name)
+        if r < 0:
+            return
+        enabled = not self._model.item(r).enabled
+        self._model.set_enabled(r, enabled)
+        if self._scheduler is not None and r < len(self._items):
+            self._scheduler.set_item_enabled(r, enabled)
+
+    def _nudge_tool_delay(self, step: str) -> None:
+        try:
+            delta = int(step)
+        except ValueError:
+            return
+        self.spin_tool_delay.setValue(self.spin_tool_delay.value() + delta)
+        if self._scheduler is not None:
+            self._scheduler.set_tool_use_interval_ms(self.spin_tool_delay.value())
 
     def _apply_hotkey(self) -> None:
         seq = self.hotkey_edit.keySequence().toString().strip()
@@ -235,107 +653,72 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Invalid hotkey", "Pick a hotkey first.")
             return
 
-        self._cfg["hotkey"] = seq
-        save_config(self._cfg)
-
         try:
-            self._hotkey.set_hotkey(seq)
-        except Exception:
-            QMessageBox.warning(self, "Hotkey failed", "Could not register that hotkey.")
+            self._hotkey.set_bindings(self._bindings(seq))
+        except ValueError as e:
+            QMessageBox.warning(self, "Hotkey failed", f"Could not register that hotkey: {e}")
             return
 
+        self._cfg["hotkey"] = seq
+        save_config_async(self._cfg)
+
         QMessageBox.information(self, "Hotkey saved", f"Hotkey set to: {seq}")
 
+    def _edit_hotkeys(self) -> None:
+        primary = HotkeyBinding(self._cfg.get("hotkey", "Ctrl+Q"), ACTION_TOGGLE)
+        dlg = HotkeyBindingsDialog(self._extra_bindings(), primary, self)
+        if dlg.exec() != QDialog.Accepted:
+            return
+
+        extra = dlg.bindings()
+        try:
+            self._hotkey.set_bindings([primary] + extra + self._profile_bindings())
+        except ValueError as e:
+            # clashes with a profile's hotkey
+            QMessageBox.warning(self, "Invalid hotkey", str(e))
+            return
+        self._cfg["hotkeys"] = [b.to_dict() for b in extra]
+        save_config_async(self._cfg)
+
     def closeEvent(self, event):
         try:
             self._hotkey.stop()
         except Exception:
             pass
         self._stop()
+        flush_config()
         event.accept()
 
     def _load_into_table(self) -> None:
-        self.table.setRowCount(0)
-        for it in self._items:
-            self._append_item(it)
-
-    def _append_item(self, it: MacroItem) -> None:
-        r = self.table.rowCount()
-        self.table.insertRow(r)
-
-        enabled = QCheckBox()
-        enabled.setChecked(it.enabled)
-        enabled.setStyleSheet("margin-left:10px;")
-        self.table.setCellWidget(r, 0, enabled)
-
-        self.table.setItem(r, 1, QTableWidgetItem(it.name))
-
-        key_box = QComboBox()
-        key_box.addItems(ALLOWED_KEYS)
-        key_box.setCurrentText(it.key if it.key in ALLOWED_KEYS else "2")
-        self.table.setCellWidget(r, 2, key_box)
-
-        self.table.setItem(r, 3, QTableWidgetItem(str(it.interval_ms)))
-        self.table.setItem(r, 4, QTableWidgetItem(str(it.jitter_min_ms)))
-        self.table.setItem(r, 5, QTableWidgetItem(str(it.jitter_max_ms)))
-
-    def _read_table_items(self) -> List[MacroItem]:
-        items: List[MacroItem] = []
-
-        for r in range(self.table.rowCount()):
-            enabled_widget = self.table.cellWidget(r, 0)
-            enabled = enabled_widget.isChecked() if isinstance(enabled_widget, QCheckBox) else True
-
-            name = self.table.item(r, 1).text().strip() if self.table.item(r, 1) else "Item"
-
-            key_widget = self.table.cellWidget(r, 2)
-            key = key_widget.currentText().strip() if isinstance(key_widget, QComboBox) else "2"
-            if key not in ALLOWED_KEYS:
-                key = "2"
-
-            def _int(col: int, default: int) -> int:
-                try:
-                    return int(self.table.item(r, col).text().strip())
-                except Exception:
-                    return default
+        self._model.set_items(self._items)
 
-            interval_ms = max(50, _int(3, 1000))
-            jmin = max(0, _int(4, 0))
-            jmax = max(jmin, _int(5, 0))
+    def _add_row(self) -> None:
+        r = self._model.append_item(MacroItem(name="NewItem", key="2", interval_ms=1000))
+        self.table.scrollTo(self._model.index(r, 1))
 
-            items.append(MacroItem(
-                name=name,
-                key=key,
-                interval_ms=interval_ms,
-                jitter_min_ms=jmin,
-                jitter_max_ms=jmax,
-                enabled=enabled
-            ))
+    def _remove_selected(self) -> None:
+        self._model.remove_rows(i.row() for i in self.table.selectionModel().selectedIndexes())
 
-        return items
+    def _plan(self, items: List[MacroItem]) -> Optional[Plan]:
+        from planner import plan_from_config
 
-    def _add_row(self) -> None:
-        self._append_item(MacroItem(name="NewItem", key="2", interval_ms=1000))
+        return plan_from_config(self._cfg, items)
 
-    def _remove_selected(self) -> None:
-        rows = sorted({i.row() for i in self.table.selectedIndexes()}, reverse=True)
-        for r in rows:
-            self.table.removeRow(r)
+    def _preview(self) -> None:
+        items = self._model.items()
+        minutes = int(self._cfg.get("planner", {}).get("preview_minutes", 5))
+        TimelinePreviewDialog(items, self._plan(items), minutes, self).exec()
 
     def _save(self) -> None:
-        self._items = self._read_table_items()
-
-        self._cfg["tool_use"] = {
-            "enabled": bool(self.chk_tool_use.isChecked()),
-            "interval_ms": int(self.spin_tool_delay.value()),
-        }
+        self._stash_profile()
+        self._items = self._model.items()
 
         seq = self.hotkey_edit.keySequence().toString().strip()
         if seq:
             self._cfg["hotkey"] = seq
 
-        cfg = write_items(self._cfg, self._items)
-        save_config(cfg)
+        cfg = write_profiles(self._cfg, self._profiles, self._active_profile)
+        save_config_async(cfg)
 
         QMessageBox.information(self, "Saved", "Saved into favwhite.cfg")
 
@@ -343,39 +726,85 @@ class MainWindow(QMainWindow):
         if self._running:
             return
 
-        self._items = self._read_table_items()
+        self._stash_profile()
+        self._items = self._model.items()
 
         tool_enabled = bool(self.chk_tool_use.isChecked())
         tool_delay = int(self.spin_tool_delay.value())
+        # the tool-use slot exists if any profile may switch clicking on
+        tool_slot = any(self._tool_settings(p)[0] for p in self._profiles)
 
         if not any(i.enabled for i in self._items) and not tool_enabled:
             QMessageBox.warning(self, "Nothing enabled", "Enable at least one macro item or enable tool use.")
             return
 
+        from input_send import set_backend
+        from overlay import OverlayWindow
+        from scheduler import scheduler_from_config
+
+        backend_name = str(self._cfg.get("input", {}).get("backend", "pynput"))
+        try:
+            backend = set_backend(backend_name)
+        except Exception as e:
+            QMessageBox.warning(self, "Input backend", f"Could not use input backend '{backend_name}': {e}")
+            return
+
         def on_stop():
             self._stop()
 
         self._overlay = OverlayWindow(
             self._items,
             on_stop=on_stop,
-            tool_use_enabled=tool_enabled,
-            tool_use_interval_ms=tool_delay
+            tool_use_enabled=tool_slot,
+            tool_use_interval_ms=tool_delay,
+            on_pause=self._toggle_pause,
+            settings=self._cfg.get("overlay", {}),
         )
+        self._overlay.moved.connect(self._on_overlay_moved)
+
+        try:
+            self._scheduler = scheduler_from_config(
+                self._cfg,
+                self._items,
+                backend,
+                # emitted from scheduler threads, delivered on the GUI thread
+                on_tick=self._overlay.state_changed.emit,
+                tool_use_enabled=tool_slot,
+                tool_use_interval_ms=tool_delay,
+            )
+            self._prepared = self._prepare_profiles(self._scheduler, self._profiles)
+        except ValueError as e:
+            # unknown key or bad item steps in favwhite.cfg
+            self._overlay.deleteLater()
+            self._overlay = None
+            self._scheduler = None
+            QMessageBox.warning(self, "Invalid macro", str(e))
+            return
+        if tool_slot:
+            self._scheduler.set_tool_use_enabled(tool_enabled)
 
-        def on_tick(snapshot):
-            if self._overlay:
-                self._overlay.set_state(snapshot)
+        self._overlay.set_state_store(self._scheduler.state_store)
+        if self._cfg.get("overlay", {}).get("show_late_p99", False):
+            self._overlay.set_metrics_fn(self._scheduler.metrics)
 
-        self._scheduler = MacroScheduler(
-            items=self._items,
-            send_fn=press_key,
-            on_tick=on_tick,
-            tool_use_enabled=tool_enabled,
-            tool_use_interval_ms=tool_delay,
-            tool_use_fn=click_left
-        )
+        plan = self._plan(self._items)
+        try:
+            self._scheduler.start(plan.offsets_s if plan else None)
+        except Exception as e:
+            self._scheduler.stop()
+            self._scheduler = None
+            self._overlay.deleteLater()
+            self._overlay = None
+            QMessageBox.warning(self, "Could not start", str(e))
+            return
 
-        self._scheduler.start()
+        reload_cfg = self._cfg.get("hot_reload", {})
+        if reload_cfg.get("enabled", True):
+            self._watcher = ConfigWatcher(
+                self.config_changed.emit,
+                interval_s=int(reload_cfg.get("poll_ms", 1000)) / 1000.0,
+            )
+            self._watcher.start()
 
         self._running = True
         self.hide()
@@ -385,8 +814,15 @@ class MainWindow(QMainWindow):
         if not self._running:
             return
 
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
         if self._scheduler:
             self._scheduler.stop()
+            latency = self._scheduler.halt_latency()
+            if latency is not None:
+                self.lbl_stop_latency.setText(f"Hotkey stop: last input {latency * 1000:0.2f} ms after the press")
             self._scheduler = None
 
         if self._overlay:
@@ -406,14 +842,10 @@ def main() -> None:
     if icon_path.exists():
         app.setWindowIcon(QIcon(str(icon_path)))
 
-    temp = QWidget()
-    temp.setWindowIcon(app.windowIcon())
-
-    if not check_for_update(temp):
-        return
-
     w = MainWindow()
     w.show()
+    # after the first paint
+    QTimer.singleShot(0, w.finish_startup)
     sys.exit(app.exec())
 
 
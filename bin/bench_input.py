@@ -0,0 +1,120 @@
+"""Per-event injection cost of each input backend.
+
+Times press, press_many (per key), key_down + key_up and click through the
+null and recording backends (or those named with --backend) and reports ns
+per event as JSON. Backends that can't be created here (pynput without a
+display) are reported as unavailable:
+
+    python bench_input.py --events 100000 --out bench_input.json
+
+The pynput backend sends real input, so it only runs when asked for with
+--backend pynput; focus a harmless window first.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from input_backends import BACKEND_NULL, BACKEND_RECORDING, BACKENDS, InputBackend, create_backend
+
+
+BATCH_SIZE = 4
+# backends that don't send real input
+DEFAULT_BACKENDS = [BACKEND_NULL, BACKEND_RECORDING]
+
+
+def _ns_per_event(fn: Callable[[], None], events: int) -> float:
+    t0 = time.perf_counter_ns()
+    fn()
+    return (time.perf_counter_ns() - t0) / events
+
+
+def bench_backend(backend: InputBackend, events: int) -> Dict[str, float]:
+    key = backend.resolve_key("2")
+    batch = [backend.resolve_key(k) for k in "2345"[:BATCH_SIZE]]
+    rounds = max(1, events // BATCH_SIZE)
+
+    def presses() -> None:
+        press = backend.press
+        for _ in range(events):
+            press(key)
+
+    def batches() -> None:
+        press_many = backend.press_many
+        for _ in range(rounds):
+            press_many(batch)
+
+    def holds() -> None:
+        down, up = backend.key_down, backend.key_up
+        for _ in range(events):
+            down(key)
+            up(key)
+
+    def clicks() -> None:
+        click = backend.click
+        for _ in range(events):
+            click(1)
+
+    def resolves() -> None:
+        resolve = backend.resolve_key
+        for _ in range(events):
+            resolve("2")
+
+    return {
+        "press_ns": _ns_per_event(presses, events),
+        "press_many_ns_per_key": _ns_per_event(batches, rounds * BATCH_SIZE),
+        "down_up_ns": _ns_per_event(holds, events),
+        "click_ns": _ns_per_event(clicks, events),
+        "resolve_key_ns": _ns_per_event(resolves, events),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--events", type=int, default=100_000, help="events per operation")
+    ap.add_argument(
+        "--backend",
+        action="append",
+        help=f"one of {', '.join(BACKENDS)}; default: {', '.join(DEFAULT_BACKENDS)} (pynput sends real input)",
+    )
+    ap.add_argument("--out", help="write JSON here instead of stdout")
+    args = ap.parse_args(argv)
+
+    results: Dict[str, Any] = {}
+    for name in args.backend or DEFAULT_BACKENDS:
+        try:
+            backend = create_backend(name)
+        except Exception as e:
+            results[name] = {"unavailable": f"{type(e).__name__}: {e}"}
+            print(f"{name:<10} unavailable ({type(e).__name__})", file=sys.stderr)
+            continue
+
+        res = bench_backend(backend, max(1, args.events))
+        results[name] = res
+        print(
+            f"{name:<10} press={res['press_ns']:8.0f}ns batch/key={res['press_many_ns_per_key']:8.0f}ns "
+            f"click={res['click_ns']:8.0f}ns",
+            file=sys.stderr,
+        )
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "events": args.events,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""Headless MacroScheduler benchmark (no Qt, no real input).
+
+Drives the scheduler with recording send/tool-use sinks and reports, per
+scenario and engine: fire-time error (actual vs. planned), CPU time per hour
+of schedule, and scheduler wakeups per second. Output is JSON so runs can be
+diffed between scheduler changes:
+
+    python bench_scheduler.py --duration 5 --out bench.json
+
+With --virtual the scheduler runs on a simulation.VirtualClock instead:
+--duration is then virtual seconds (an hour takes seconds), wake latency is
+modelled by --wake-latency-ms, and CPU time is the cost of the simulation.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from metrics import Histogram
+from models import MacroItem
+from scheduler import ENGINES, MacroScheduler, InputDispatcher, TOOL_USE_NAME
+from simulation import make_scheduler
+from storage import DEFAULT_CONFIG
+
+
+class RecordingSink:
+    """Stands in for press_key / click_left and timestamps every call."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.keys: List[Tuple[str, float]] = []
+        self.clicks: List[Tuple[int, float]] = []
+
+    def send(self, key: str) -> None:
+        t = time.monotonic()
+        with self._lock:
+            self.keys.append((key, t))
+
+    def send_batch(self, keys: List[str]) -> None:
+        t = time.monotonic()
+        with self._lock:
+            self.keys.extend((key, t) for key in keys)
+
+    def click(self, count: int = 1) -> None:
+        t = time.monotonic()
+        with self._lock:
+            self.clicks.append((count, t))
+
+
+def _default_items() -> List[MacroItem]:
+    # fixed rate + unique keys so every fire can be matched to its planned time
+    return [
+        MacroItem.from_dict({**d, "key": f"k{i}", "fixed_rate": True, "jitter_min_ms": 0, "jitter_max_ms": 0})
+        for i, d in enumerate(DEFAULT_CONFIG["items"])
+    ]
+
+
+def _random_items(n: int, seed: int) -> List[MacroItem]:
+    rng = random.Random(seed)
+    return [
+        MacroItem(name=f"item{i}", key=f"k{i}", interval_ms=rng.randint(50, 10_000), fixed_rate=True)
+        for i in range(n)
+    ]
+
+
+def scenarios(seed: int) -> List[Tuple[str, List[MacroItem], int]]:
+    """(name, items, tool_use_interval_ms or 0)."""
+    return [
+        ("default_4", _default_items(), 0),
+        ("items_100", _random_items(100, seed), 0),
+        ("items_1000", _random_items(1000, seed), 0),
+        ("items_2000", _random_items(2000, seed), 0),
+        ("tool_use_10ms", _default_items(), 10),
+        ("items_1000_tool_use_10ms", _random_items(1000, seed), 10),
+    ]
+
+
+def run_scenario(
+    items: List[MacroItem],
+    tool_use_ms: int,
+    engine: str,
+    duration_s: float,
+    dispatch: bool,
+    batch: bool = False,
+) -> Dict[str, Any]:
+    sink = RecordingSink()
+    sched = MacroScheduler(
+        items=items,
+        send_fn=sink.send,
+        tool_use_enabled=tool_use_ms > 0,
+        tool_use_interval_ms=tool_use_ms or 30,
+        tool_use_fn=sink.click,
+        engine=engine,
+        dispatcher=InputDispatcher(maxsize=4096) if dispatch else None,
+        batch_fn=sink.send_batch if batch else None,
+    )
+
+    cpu0 = time.process_time()
+    sched.start()
+    time.sleep(duration_s)
+    sched.stop()
+    cpu = time.process_time() - cpu0
+
+    states = sched.snapshot()
+    slot_by_key = {it.key: slot for slot, it in enumerate(items)}
+    fired: Dict[str, int] = {}
+    err = Histogram()
+    for key, t in sink.keys:
+        slot = slot_by_key[key]
+        k = fired.get(key, 0)
+        fired[key] = k + 1
+        planned = states[slot].started_monotonic + (k + 1) * items[slot].interval_ms / 1000.0
+        err.record(t - planned)
+
+    expected = sum(int(duration_s * 1000 // it.interval_ms) for it in items)
+    out: Dict[str, Any] = {
+        "engine": engine,
+        "items": len(items),
+        "duration_s": duration_s,
+        "fires": len(sink.keys),
+        "expected_fires": expected,
+        "fire_error_ms": err.summary_ms(),
+        "cpu_s_per_hour": cpu / duration_s * 3600.0,
+        "wakeups_per_s": sched.wakeups / duration_s,
+    }
+
+    if tool_use_ms > 0:
+        tool = states[sched.tool_slot]
+        out["tool_use"] = {
+            "interval_ms": tool_use_ms,
+            "configured_hz": tool.configured_hz,
+            "achieved_hz": sum(c for c, _ in sink.clicks) / duration_s,
+            "late_ms": sched.metrics()[sched.tool_slot]["late"],
+        }
+
+    stats = sched.dispatch_stats()
+    if stats is not None:
+        out["dispatch"] = {
+            "injections": stats.injected,
+            "dropped": stats.dropped,
+            "queue_latency_avg_ms": stats.queue_latency_avg_s * 1000.0,
+            "queue_latency_max_ms": stats.queue_latency_max_s * 1000.0,
+        }
+    return out
+
+
+def run_virtual_scenario(
+    items: List[MacroItem],
+    tool_use_ms: int,
+    engine: str,
+    duration_s: float,
+    seed: int,
+    wake_latency_ms: Tuple[float, float],
+) -> Dict[str, Any]:
+    sched, _ = make_scheduler(
+        items, seed=seed, engine=engine,
+        tool_use_interval_ms=tool_use_ms, wake_latency_ms=wake_latency_ms,
+    )
+    cpu0 = time.process_time()
+    timeline = sched.simulate(duration_s)
+    cpu = time.process_time() - cpu0
+
+    err = Histogram()
+    tool_err = Histogram()
+    clicks = 0
+    for rec in timeline:
+        if rec.name == TOOL_USE_NAME:
+            clicks += 1
+            tool_err.record(rec.actual - rec.planned)
+        else:
+            err.record(rec.actual - rec.planned)
+
+    out: Dict[str, Any] = {
+        "engine": engine,
+        "items": len(items),
+        "duration_s": duration_s,
+        "virtual": True,
+        "fires": len(timeline) - clicks,
+        "expected_fires": sum(int(duration_s * 1000 // it.interval_ms) for it in items),
+        "fire_error_ms": err.summary_ms(),
+        "cpu_s_per_hour": cpu / duration_s * 3600.0,
+        "wakeups_per_s": sched.wakeups / duration_s,
+    }
+    if tool_use_ms > 0:
+        out["tool_use"] = {
+            "interval_ms": tool_use_ms,
+            "configured_hz": 1000.0 / tool_use_ms,
+            "achieved_hz": clicks / duration_s,
+            "late_ms": tool_err.summary_ms(),
+        }
+    return out
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--duration", type=float, default=5.0, help="seconds per scenario and engine")
+    ap.add_argument("--engine", choices=ENGINES, action="append", help="default: all engines")
+    ap.add_argument("--scenario", action="append", help="run only these scenarios (by name)")
+    ap.add_argument("--dispatch", action="store_true", help="route input through an InputDispatcher")
+    ap.add_argument("--batch", action="store_true", help="send keys due together in one batch call")
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--virtual", action="store_true", help="run on a virtual clock (duration is virtual time)")
+    ap.add_argument("--wake-latency-ms", type=float, nargs=2, default=(0.0, 1.0), metavar=("MIN", "MAX"),
+                    help="modelled OS wake latency for --virtual")
+    ap.add_argument("--out", help="write JSON here instead of stdout")
+    args = ap.parse_args(argv)
+
+    results: List[Dict[str, Any]] = []
+    for name, items, tool_use_ms in scenarios(args.seed):
+        if args.scenario and name not in args.scenario:
+            continue
+        for engine in args.engine or ENGINES:
+            if args.virtual:
+                res = run_virtual_scenario(
+                    items, tool_use_ms, engine, args.duration, args.seed, tuple(args.wake_latency_ms)
+                )
+            else:
+                res = run_scenario(items, tool_use_ms, engine, args.duration, args.dispatch, args.batch)
+            res["scenario"] = name
+            results.append(res)
+            print(
+                f"{name:<26} {engine:<9} fires={res['fires']:<6} "
+                f"err p99={res['fire_error_ms']['p99']:7.2f}ms "
+                f"cpu/h={res['cpu_s_per_hour']:8.1f}s wakeups/s={res['wakeups_per_s']:7.1f}",
+                file=sys.stderr,
+            )
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""Runs the macro from favwhite.cfg without the GUI (no Qt is imported).
+
+Low-footprint mode for long unattended sessions: the scheduler, the global
+hotkeys and the config watcher run as in the app, and a status line is
+logged every --status seconds:
+
+    python headless.py --status 60 --log favwhite.log
+
+Hotkeys: the Start/Stop hotkey, a `stop` binding or Ctrl+C end the run, a
+`pause` binding pauses and resumes, `toggle_item`, `tool_delay` and profile
+hotkeys work as in the app.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from hotkey import (
+    GlobalHotkey, HotkeyBinding, compile_bindings,
+    ACTION_PAUSE, ACTION_PROFILE, ACTION_STOP, ACTION_TOGGLE, ACTION_TOGGLE_ITEM, ACTION_TOOL_DELAY,
+)
+from input_send import set_backend
+from planner import plan_from_config
+from models import Profile
+from scheduler import MacroScheduler, PreparedItems, scheduler_from_config
+from storage import ConfigWatcher, load_config, load_profiles
+
+
+log = logging.getLogger("favwhite.headless")
+
+
+def _bindings(cfg: Dict[str, Any], profiles: List[Profile]) -> List[HotkeyBinding]:
+    primary = HotkeyBinding(str(cfg.get("hotkey", "Ctrl+Q")), ACTION_TOGGLE)
+    extra = [HotkeyBinding.from_dict(d) for d in cfg.get("hotkeys", []) if isinstance(d, dict)]
+    extra += [HotkeyBinding(p.hotkey, ACTION_PROFILE, p.name) for p in profiles if p.hotkey]
+    try:
+        compile_bindings([primary] + extra)
+    except ValueError as e:
+        log.warning("invalid hotkey (%s); only %s is active", e, primary.combo)
+        return [primary]
+    return [primary] + extra
+
+
+def format_status(scheduler: MacroScheduler, started: float) -> str:
+    now = time.monotonic()
+    parts = [f"up {int(now - started)}s"]
+    if scheduler.paused:
+        parts.append("PAUSED")
+    # a paused schedule stands still
+    at = scheduler.paused_at or now
+    for slot, (name, st) in enumerate(zip(scheduler.slot_names, scheduler.snapshot())):
+        if slot == scheduler.tool_slot:
+            parts.append(f"{name}: {st.uses} clicks ({st.achieved_hz:0.1f}/s)")
+        elif st.next_fire_monotonic > 0.0:
+            parts.append(f"{name}: {st.uses} uses, next {max(0.0, st.next_fire_monotonic - at):0.1f}s")
+        else:
+            parts.append(f"{name}: {st.uses} uses, off")
+    ds = scheduler.dispatch_stats()
+    if ds is not None and (ds.dropped or ds.coalesced):
+        parts.append(f"dispatch dropped {ds.dropped}, coalesced {ds.coalesced}")
+    return " | ".join(parts)
+
+
+class HeadlessRunner:
+    """One run of the configured macro; run() blocks until stopped."""
+
+    def __init__(self, cfg: Dict[str, Any], status_interval_s: float = 60.0, hotkeys: bool = True) -> None:
+        self._cfg = cfg
+        self._status_interval_s = status_interval_s
+        self._profiles = load_profiles(cfg)
+        self._active = str(cfg.get("active_profile") or "Default")
+        active = self._profile(self._active)
+        self._items = list(active.items)
+
+        self._tool_delay = int(active.tool_use.get("interval_ms", 30))
+        tool_slot = any(p.tool_use.get("enabled", False) for p in self._profiles)
+        backend = set_backend(str(cfg.get("input", {}).get("backend", "pynput")))
+        self._scheduler = scheduler_from_config(
+            cfg,
+            self._items,
+            backend,
+            tool_use_enabled=tool_slot,
+            tool_use_interval_ms=self._tool_delay,
+        )
+        # all profiles compiled up front; a switch is one apply_items()
+        self._prepared = self._prepare(self._profiles)
+        if tool_slot:
+            self._scheduler.set_tool_use_enabled(bool(active.tool_use.get("enabled", False)))
+        self._enabled = [it.enabled for it in self._items]
+
+        # hotkey listener and config watcher both switch profiles
+        self._switch_lock = threading.Lock()
+        self._done = threading.Event()
+        self._hotkey: Optional[GlobalHotkey] = (
+            GlobalHotkey(self._on_hotkey, _bindings(cfg, self._profiles)) if hotkeys else None
+        )
+        self._watcher: Optional[ConfigWatcher] = None
+        reload_cfg = cfg.get("hot_reload", {})
+        if reload_cfg.get("enabled", True):
+            self._watcher = ConfigWatcher(self._on_config_changed, int(reload_cfg.get("poll_ms", 1000)) / 1000.0)
+
+    def request_stop(self) -> None:
+        self._done.set()
+
+    def _profile(self, name: str) -> Profile:
+        for p in self._profiles:
+            if p.name == name:
+                return p
+        return self._profiles[0]
+
+    def _prepare(self, profiles: List[Profile]) -> Dict[str, PreparedItems]:
+        prepared = {}
+        for p in profiles:
+            try:
+                prepared[p.name] = self._scheduler.prepare_items(p.items)
+            except ValueError as e:
+                raise ValueError(f"profile {p.name}: {e}") from None
+        return prepared
+
+    def switch_profile(self, name: str) -> bool:
+        """Swaps in a profile compiled at startup. Returns False for an unknown name."""
+        with self._switch_lock:
+            prepared = self._prepared.get(name)
+            if prepared is None:
+                return False
+            tool_use = self._profile(name).tool_use
+            self._scheduler.apply_items(prepared)
+            self._tool_delay = int(tool_use.get("interval_ms", 30))
+            self._scheduler.set_tool_use_interval_ms(self._tool_delay)
+            if self._scheduler.tool_slot is not None:
+                self._scheduler.set_tool_use_enabled(bool(tool_use.get("enabled", False)))
+            self._active = name
+            self._items = prepared.items
+            self._enabled = [it.enabled for it in prepared.items]
+            return True
+
+    def run(self, duration_s: Optional[float] = None) -> None:
+        """Blocks until stopped; whatever was started is stopped again, also if starting fails."""
+        started = time.monotonic()
+        try:
+            plan = plan_from_config(self._cfg, self._items)
+            self._scheduler.start(plan.offsets_s if plan else None)
+            if self._hotkey is not None:
+                try:
+                    self._hotkey.start()
+                except Exception as e:
+                    # no pynput or no display here: run on, Ctrl+C still stops
+                    log.warning("global hotkeys unavailable: %s", e)
+                    self._hotkey = None
+            if self._watcher is not None:
+                self._watcher.start()
+
+            log.info("running profile %s: %s", self._active, ", ".join(self._scheduler.slot_names))
+            while not self._done.is_set():
+                timeout = self._status_interval_s
+                if duration_s is not None:
+                    left = duration_s - (time.monotonic() - started)
+                    if left <= 0.0:
+                        break
+                    timeout = min(timeout, left)
+                if not self._done.wait(timeout):
+                    log.info(format_status(self._scheduler, started))
+        finally:
+            if self._watcher is not None:
+                self._watcher.stop()
+            if self._hotkey is not None:
+                self._hotkey.stop()
+            self._scheduler.stop()
+            log.info("stopped: %s", format_status(self._scheduler, started))
+
+    def _on_hotkey(self, binding: HotkeyBinding) -> None:
+        # listener thread: the scheduler calls are thread-safe; the item list,
+        # enabled flags and tool delay are replaced by profile switches from the
+        # config watcher, so they are only used under _switch_lock
+        action = binding.action
+        if action in (ACTION_TOGGLE, ACTION_STOP):
+            self._scheduler.halt()
+            self._done.set()
+        elif action == ACTION_PAUSE:
+            log.info("paused" if self._scheduler.toggle_pause() else "resumed")
+        elif action == ACTION_TOGGLE_ITEM:
+            with self._switch_lock:
+                for slot, it in enumerate(self._items):
+                    if it.name == binding.arg:
+                        self._enabled[slot] = not self._enabled[slot]
+                        self._scheduler.set_item_enabled(slot, self._enabled[slot])
+                        log.info("%s %s", it.name, "on" if self._enabled[slot] else "off")
+                        break
+        elif action == ACTION_TOOL_DELAY:
+            try:
+                step = int(binding.arg)
+            except ValueError:
+                return
+            with self._switch_lock:
+                self._tool_delay = max(10, self._tool_delay + step)
+                self._scheduler.set_tool_use_interval_ms(self._tool_delay)
+                log.info("tool use every %d ms", self._tool_delay)
+        elif action == ACTION_PROFILE:
+            if self.switch_profile(binding.arg):
+                log.info("profile %s", binding.arg)
+
+    def _on_config_changed(self, cfg: Dict[str, Any]) -> None:
+        try:
+            profiles = load_profiles(cfg)
+            prepared = self._prepare(profiles)
+        except ValueError as e:
+            log.warning("favwhite.cfg changed but was not applied: %s", e)
+            return
+        with self._switch_lock:
+            self._profiles = profiles
+            self._prepared = prepared
+        active = str(cfg.get("active_profile") or "Default")
+        self.switch_profile(active)
+        log.info("reloaded %d profiles from favwhite.cfg, active: %s", len(profiles), active)
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--status", type=float, default=60.0, help="seconds between status lines")
+    ap.add_argument("--duration", type=float, help="stop after this many seconds")
+    ap.add_argument("--backend", help="input backend, overrides input.backend in favwhite.cfg")
+    ap.add_argument("--no-hotkeys", action="store_true", help="don't listen for global hotkeys")
+    ap.add_argument("--log", help="append status lines to this file instead of stderr")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(
+        filename=args.log,
+        level=logging.INFO,
+        format="%(asctime)s %(message)s",
+    )
+
+    cfg = load_config()
+    if args.backend:
+        cfg["input"] = {**cfg.get("input", {}), "backend": args.backend}
+
+    try:
+        runner = HeadlessRunner(cfg, max(1.0, args.status), hotkeys=not args.no_hotkeys)
+    except Exception as e:
+        # bad key or step (ValueError), or the input backend can't load here
+        log.error("could not start: %s", e)
+        return 2
+
+    # Ctrl+C and service stops end the run cleanly
+    signal.signal(signal.SIGINT, lambda *_: runner.request_stop())
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda *_: runner.request_stop())
+
+    try:
+        runner.run(args.duration)
+    except Exception as e:
+        # run() has stopped the scheduler again
+        log.error("could not start: %s", e)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
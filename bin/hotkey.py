@@ -1,118 +1,208 @@
 from __future__ import annotations
 
-import time
-from typing import Callable, Optional, Set
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+# binding actions
+ACTION_TOGGLE = "toggle"            # start / stop
+ACTION_STOP = "stop"
+ACTION_PAUSE = "pause"
+ACTION_PROFILE = "profile"          # arg: profile name
+ACTION_TOGGLE_ITEM = "toggle_item"  # arg: item name
+ACTION_TOOL_DELAY = "tool_delay"    # arg: signed ms step, e.g. "+5" or "-5"
+ACTIONS = (ACTION_TOGGLE, ACTION_STOP, ACTION_PAUSE, ACTION_PROFILE, ACTION_TOGGLE_ITEM, ACTION_TOOL_DELAY)
+
+# modifier mask bits
+MOD_CTRL = 1
+MOD_ALT = 2
+MOD_SHIFT = 4
+MOD_WIN = 8
+
+_MOD_NAMES = {
+    "ctrl": MOD_CTRL,
+    "control": MOD_CTRL,
+    "alt": MOD_ALT,
+    "shift": MOD_SHIFT,
+    "win": MOD_WIN,
+    "windows": MOD_WIN,
+    "meta": MOD_WIN,
+    "super": MOD_WIN,
+}
+
+# pynput.keyboard, imported by load_keyboard() (at the latest when a listener starts):
+# bindings can be compiled and edited without loading pynput
+keyboard: Any = None
+_MOD_KEYS: Dict[Any, int] = {}
+_MOD_KEY_NAMES = {
+    "ctrl": MOD_CTRL, "ctrl_l": MOD_CTRL, "ctrl_r": MOD_CTRL,
+    "alt": MOD_ALT, "alt_l": MOD_ALT, "alt_r": MOD_ALT, "alt_gr": MOD_ALT,
+    "shift": MOD_SHIFT, "shift_l": MOD_SHIFT, "shift_r": MOD_SHIFT,
+    "cmd": MOD_WIN, "cmd_l": MOD_WIN, "cmd_r": MOD_WIN,
+}
 
-from pynput import keyboard
 
+def load_keyboard() -> Any:
+    """Imports pynput.keyboard (once). Call it off the GUI thread to make start() cheap."""
+    global keyboard
+    if keyboard is None:
+        from pynput import keyboard as kb
 
-_MOD_ALIASES = {
-    "ctrl": {keyboard.Key.ctrl, keyboard.Key.ctrl_l, keyboard.Key.ctrl_r},
-    "alt": {keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r, keyboard.Key.alt_gr},
-    "shift": {keyboard.Key.shift, keyboard.Key.shift_l, keyboard.Key.shift_r},
-    "win": {keyboard.Key.cmd, keyboard.Key.cmd_l, keyboard.Key.cmd_r},
-    "meta": {keyboard.Key.cmd, keyboard.Key.cmd_l, keyboard.Key.cmd_r},
-    "super": {keyboard.Key.cmd, keyboard.Key.cmd_l, keyboard.Key.cmd_r},
-}
+        for name, bit in _MOD_KEY_NAMES.items():
+            key = getattr(kb.Key, name, None)
+            if key is not None:
+                _MOD_KEYS[key] = bit
+        keyboard = kb
+    return keyboard
 
+
+# combo spelling -> pynput Key name
 _SPECIAL_KEYS = {
-    "space": keyboard.Key.space,
-    "tab": keyboard.Key.tab,
-    "enter": keyboard.Key.enter,
-    "return": keyboard.Key.enter,
-    "esc": keyboard.Key.esc,
-    "escape": keyboard.Key.esc,
+    "space": "space",
+    "tab": "tab",
+    "enter": "enter",
+    "return": "enter",
+    "esc": "esc",
+    "escape": "esc",
+    "backspace": "backspace",
+    "del": "delete",
+    "delete": "delete",
+    "ins": "insert",
+    "insert": "insert",
+    "home": "home",
+    "end": "end",
+    "pgup": "page_up",
+    "pageup": "page_up",
+    "pgdown": "page_down",
+    "pagedown": "page_down",
+    "up": "up",
+    "down": "down",
+    "left": "left",
+    "right": "right",
+    "pause": "pause",
 }
 
 
+@dataclass
+class HotkeyBinding:
+    combo: str
+    action: str
+    arg: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> "HotkeyBinding":
+        return HotkeyBinding(
+            combo=str(d.get("combo", "")),
+            action=str(d.get("action", ACTION_TOGGLE)),
+            arg=str(d.get("arg", "")),
+        )
+
+
 def _norm_piece(s: str) -> str:
     return (s or "").strip().lower()
 
 
-def _parse_hotkey(seq: str) -> tuple[Set[keyboard.Key], Optional[str], Optional[keyboard.Key]]:
-    """
-    Returns: (required_mod_keys, required_char, required_special_key)
-    required_char is for normal keys like 'q' or '7'
-    required_special_key is for Key.space, Key.enter, etc
-    """
-    s = (seq or "").strip()
-    if not s:
-        s = "Ctrl+Q"
-
-    parts = [_norm_piece(p) for p in s.split("+") if _norm_piece(p)]
+def compile_combo(seq: str) -> Tuple[int, str]:
+    """"Ctrl+Shift+F8" -> (modifier mask, main key token). Raises ValueError."""
+    parts = [_norm_piece(p) for p in (seq or "").split("+") if _norm_piece(p)]
     if not parts:
-        parts = ["ctrl", "q"]
-
-    required_mods: Set[keyboard.Key] = set()
-    main = parts[-1]
-    mods = parts[:-1]
+        raise ValueError("empty hotkey")
 
-    for m in mods:
-        if m in ("control",):
-            m = "ctrl"
-        if m in ("windows",):
-            m = "win"
-        required_mods |= _MOD_ALIASES.get(m, set())
+    mask = 0
+    for m in parts[:-1]:
+        bit = _MOD_NAMES.get(m)
+        if bit is None:
+            raise ValueError(f"unknown modifier {m!r} in {seq!r}")
+        mask |= bit
 
+    main = parts[-1]
+    if main in _MOD_NAMES:
+        raise ValueError(f"{seq!r} has no main key")
     if main in _SPECIAL_KEYS:
-        return required_mods, None, _SPECIAL_KEYS[main]
-
+        return mask, _SPECIAL_KEYS[main]
     if len(main) == 1:
-        return required_mods, main, None
-
-    # F-keys like F8
-    if main.startswith("f") and main[1:].isdigit():
-        try:
-            n = int(main[1:])
-            return required_mods, None, getattr(keyboard.Key, f"f{n}")
-        except Exception:
-            pass
-
-    # fallback: treat unknown as char first char
-    return required_mods, main[:1], None
+        return mask, main
+    if main.startswith("f") and main[1:].isdigit() and 1 <= int(main[1:]) <= 24:
+        return mask, main
+    raise ValueError(f"unknown key {main!r} in {seq!r}")
+
+
+def _key_token(key: Any) -> Optional[str]:
+    """Token for a pressed pynput key, matching compile_combo()'s main key."""
+    if isinstance(key, keyboard.Key):
+        return key.name
+    if isinstance(key, keyboard.KeyCode):
+        # prefer the virtual key for letters and digits: with Ctrl or Shift held
+        # the reported char is a control character or the shifted symbol
+        vk = key.vk
+        if vk is not None and (0x30 <= vk <= 0x39 or 0x41 <= vk <= 0x5A):
+            return chr(vk).lower()
+        ch = key.char
+        if ch and ch.isprintable():
+            return ch.lower()
+    return None
+
+
+def compile_bindings(bindings: List[HotkeyBinding]) -> Dict[Tuple[int, str], HotkeyBinding]:
+    """Lookup table keyed by (modifier mask, main key). Raises ValueError on bad or duplicate combos."""
+    table: Dict[Tuple[int, str], HotkeyBinding] = {}
+    for b in bindings:
+        if b.action not in ACTIONS:
+            raise ValueError(f"{b.combo}: unknown action {b.action!r}")
+        key = compile_combo(b.combo)
+        other = table.get(key)
+        if other is not None:
+            raise ValueError(f"{b.combo} is bound twice ({other.action} and {b.action})")
+        table[key] = b
+    return table
 
 
 class GlobalHotkey:
-    def __init__(self, callback: Callable[[], None], hotkey_sequence: str = "Ctrl+Q") -> None:
-        self._callback = callback
-        self._listener: Optional[keyboard.Listener] = None
+    """Global keyboard listener dispatching to a table of bindings.
 
-        self._pressed: Set[object] = set()
-        self._debounce_until = 0.0
+    Each key press costs one dict lookup on (held modifier mask, key), however
+    many bindings there are. A binding fires once per press; auto-repeat is
+    ignored until the key is released. callback runs on the listener thread.
+    """
 
-        self._mods: Set[keyboard.Key] = set()
-        self._main_char: Optional[str] = None
-        self._main_special: Optional[keyboard.Key] = None
+    def __init__(self, callback: Callable[[HotkeyBinding], None], bindings: List[HotkeyBinding]) -> None:
+        self._callback = callback
+        self._listener: Optional[Any] = None
 
-        self.set_hotkey(hotkey_sequence)
+        self._table: Dict[Tuple[int, str], HotkeyBinding] = {}
+        self._mods_down: Dict[Any, int] = {}
+        self._mask = 0
+        self._down: Set[str] = set()
 
-    def set_hotkey(self, hotkey_sequence: str) -> None:
-        self._mods, self._main_char, self._main_special = _parse_hotkey(hotkey_sequence)
+        self.set_bindings(bindings)
 
-        if self._listener is not None:
-            self.stop()
-            self.start()
+    def set_bindings(self, bindings: List[HotkeyBinding]) -> None:
+        """Replaces the table. Raises ValueError (and keeps the old one) on bad bindings."""
+        # a single reference swap, so the listener never sees a half-built table
+        self._table = compile_bindings(bindings)
 
     def start(self) -> None:
         if self._listener is not None:
             return
+        kb = load_keyboard()
 
         def on_press(key):
             try:
-                self._pressed.add(key)
-                self._maybe_fire()
+                self._on_press(key)
             except Exception:
                 # don't crash the listener thread
                 pass
 
         def on_release(key):
             try:
-                if key in self._pressed:
-                    self._pressed.remove(key)
+                self._on_release(key)
             except Exception:
                 pass
 
-        self._listener = keyboard.Listener(on_press=on_press, on_release=on_release)
+        self._listener = kb.Listener(on_press=on_press, on_release=on_release)
         self._listener.start()
 
     def stop(self) -> None:
@@ -122,29 +212,34 @@ class GlobalHotkey:
         except Exception:
             pass
         self._listener = None
-        self._pressed.clear()
-
-    def _mods_satisfied(self) -> bool:
-        if not self._mods:
-            return True
-        return any(m in self._pressed for m in self._mods)
-
-    def _main_satisfied(self) -> bool:
-        if self._main_special is not None:
-            return self._main_special in self._pressed
-
-        if self._main_char is not None:
-            for k in self._pressed:
-                if isinstance(k, keyboard.KeyCode) and k.char:
-                    if k.char.lower() == self._main_char.lower():
-                        return True
-        return False
-
-    def _maybe_fire(self) -> None:
-        now = time.monotonic()
-        if now < self._debounce_until:
+        self._mods_down.clear()
+        self._mask = 0
+        self._down.clear()
+
+    def _on_press(self, key) -> None:
+        bit = _MOD_KEYS.get(key)
+        if bit is not None:
+            self._mods_down[key] = bit
+            self._mask |= bit
+            return
+
+        token = _key_token(key)
+        if token is None or token in self._down:
+            return
+        self._down.add(token)
+
+        binding = self._table.get((self._mask, token))
+        if binding is not None:
+            self._callback(binding)
+
+    def _on_release(self, key) -> None:
+        if self._mods_down.pop(key, None) is not None:
+            mask = 0
+            for bit in self._mods_down.values():
+                mask |= bit
+            self._mask = mask
             return
 
-        if self._mods_satisfied() and self._main_satisfied():
-            self._debounce_until = now + 0.35
-            self._callback()
+        token = _key_token(key)
+        if token is not None:
+            self._down.discard(token)
@@ -0,0 +1,203 @@
+"""Input injection backends used by input_send.
+
+A backend turns key names into opaque handles once (resolve_key) and then
+injects with them. Importing this module never touches the OS: the pynput
+backend imports pynput only when it is created, so the scheduler stack can
+be imported and measured without a display.
+
+Backends are created by name from BACKENDS; register_backend() adds more
+(e.g. a faster native SendInput backend) without touching callers.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+
+BACKEND_PYNPUT = "pynput"
+BACKEND_NULL = "null"
+BACKEND_RECORDING = "recording"
+
+# key names accepted besides single characters
+KEY_NAMES = {
+    "enter": "enter",
+    "esc": "esc",
+    "escape": "esc",
+    "tab": "tab",
+    "space": "space",
+    "shift": "shift",
+    "ctrl": "ctrl",
+    "control": "ctrl",
+    "alt": "alt",
+    "backspace": "backspace",
+    "delete": "delete",
+    "up": "up",
+    "down": "down",
+    "left": "left",
+    "right": "right",
+    "home": "home",
+    "end": "end",
+    "pageup": "page_up",
+    "pagedown": "page_down",
+}
+
+
+def normalize_key(key_str: str) -> str:
+    """Canonical key name: a single character or a KEY_NAMES value. Raises ValueError."""
+    k = key_str.strip().lower()
+    if len(k) == 1:
+        return k
+    name = KEY_NAMES.get(k)
+    if name is None:
+        raise ValueError(f"unknown key: {key_str!r}")
+    return name
+
+
+class InputBackend:
+    """Interface for input injection; handles come from this backend's resolve_key()."""
+
+    name = ""
+
+    def resolve_key(self, key_str: str) -> Any:
+        return normalize_key(key_str)
+
+    def press(self, handle: Any) -> None:
+        raise NotImplementedError
+
+    def press_many(self, handles: List[Any]) -> None:
+        for h in handles:
+            self.press(h)
+
+    def key_down(self, handle: Any) -> None:
+        raise NotImplementedError
+
+    def key_up(self, handle: Any) -> None:
+        raise NotImplementedError
+
+    def click(self, count: int = 1) -> None:
+        raise NotImplementedError
+
+
+class NullBackend(InputBackend):
+    """Accepts everything and injects nothing (dry runs, overhead baselines)."""
+
+    name = BACKEND_NULL
+
+    def press(self, handle: Any) -> None:
+        pass
+
+    def press_many(self, handles: List[Any]) -> None:
+        pass
+
+    def key_down(self, handle: Any) -> None:
+        pass
+
+    def key_up(self, handle: Any) -> None:
+        pass
+
+    def click(self, count: int = 1) -> None:
+        pass
+
+
+class RecordingBackend(InputBackend):
+    """Timestamps every event into a ring buffer of the last `capacity` events.
+
+    Events are (timestamp, kind, arg) with kind "press", "down", "up" or
+    "click"; a press_many() records one "press" per key with one timestamp.
+    """
+
+    name = BACKEND_RECORDING
+
+    def __init__(self, capacity: int = 4096, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._events: Deque[Tuple[float, str, Any]] = deque(maxlen=max(1, int(capacity)))
+        self._lock = threading.Lock()
+
+    def events(self) -> List[Tuple[float, str, Any]]:
+        with self._lock:
+            return list(self._events)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+
+    def _record(self, kind: str, arg: Any) -> None:
+        t = self._clock()
+        with self._lock:
+            self._events.append((t, kind, arg))
+
+    def press(self, handle: Any) -> None:
+        self._record("press", handle)
+
+    def press_many(self, handles: List[Any]) -> None:
+        t = self._clock()
+        with self._lock:
+            self._events.extend((t, "press", h) for h in handles)
+
+    def key_down(self, handle: Any) -> None:
+        self._record("down", handle)
+
+    def key_up(self, handle: Any) -> None:
+        self._record("up", handle)
+
+    def click(self, count: int = 1) -> None:
+        self._record("click", max(1, int(count)))
+
+
+class PynputBackend(InputBackend):
+    """Injects through pynput controllers (needs a display on Linux)."""
+
+    name = BACKEND_PYNPUT
+
+    def __init__(self) -> None:
+        from pynput.keyboard import Controller as KeyboardController, Key
+        from pynput.mouse import Controller as MouseController, Button
+
+        self._keyboard = KeyboardController()
+        self._mouse = MouseController()
+        self._button = Button.left
+        self._keys = {name: getattr(Key, name) for name in set(KEY_NAMES.values())}
+
+    def resolve_key(self, key_str: str) -> Any:
+        k = normalize_key(key_str)
+        return self._keys.get(k, k)
+
+    def press(self, handle: Any) -> None:
+        self._keyboard.press(handle)
+        self._keyboard.release(handle)
+
+    def press_many(self, handles: List[Any]) -> None:
+        kb = self._keyboard
+        for h in handles:
+            kb.press(h)
+            kb.release(h)
+
+    def key_down(self, handle: Any) -> None:
+        self._keyboard.press(handle)
+
+    def key_up(self, handle: Any) -> None:
+        self._keyboard.release(handle)
+
+    def click(self, count: int = 1) -> None:
+        self._mouse.click(self._button, max(1, int(count)))
+
+
+BACKENDS: Dict[str, Callable[[], InputBackend]] = {
+    BACKEND_PYNPUT: PynputBackend,
+    BACKEND_NULL: NullBackend,
+    BACKEND_RECORDING: RecordingBackend,
+}
+
+
+def register_backend(name: str, factory: Callable[[], InputBackend]) -> None:
+    BACKENDS[name] = factory
+
+
+def create_backend(name: str) -> InputBackend:
+    """Creates a backend by name. Raises ValueError for unknown names; pynput may raise on import."""
+    factory = BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"unknown input backend: {name!r} (expected one of {', '.join(BACKENDS)})")
+    return factory()
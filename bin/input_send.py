@@ -1,53 +1,28 @@
+"""The process-wide input backend, chosen once from favwhite.cfg.
+
+The scheduler is given the backend's own methods (see scheduler_from_config),
+so nothing is sent through this module.
+"""
 from __future__ import annotations
 
-from pynput.keyboard import Controller as KeyboardController, Key
-from pynput.mouse import Controller as MouseController, Button
-
-_keyboard = KeyboardController()
-_mouse = MouseController()
-
-_SPECIAL = {
-    "enter": Key.enter,
-    "esc": Key.esc,
-    "escape": Key.esc,
-    "tab": Key.tab,
-    "space": Key.space,
-    "shift": Key.shift,
-    "ctrl": Key.ctrl,
-    "control": Key.ctrl,
-    "alt": Key.alt,
-    "backspace": Key.backspace,
-    "delete": Key.delete,
-    "up": Key.up,
-    "down": Key.down,
-    "left": Key.left,
-    "right": Key.right,
-    "home": Key.home,
-    "end": Key.end,
-    "pageup": Key.page_up,
-    "pagedown": Key.page_down,
-}
-
-
-def _normalize_key(s: str) -> str:
-    return s.strip().lower()
-
-
-def press_key(key_str: str) -> None:
-    """Sends a key press to the OS."""
-    k = _normalize_key(key_str)
-    special = _SPECIAL.get(k)
-    if special is not None:
-        _keyboard.press(special)
-        _keyboard.release(special)
-        return
-
-    if len(k) == 1:
-        _keyboard.press(k)
-        _keyboard.release(k)
-        return
-
-
-def click_left() -> None:
-    """Tool use: left click once."""
-    _mouse.click(Button.left, 1)
+from typing import Optional
+
+from input_backends import InputBackend, create_backend
+
+
+_backend: Optional[InputBackend] = None
+
+
+def set_backend(backend: str | InputBackend) -> InputBackend:
+    """Selects the backend by name (input.backend in favwhite.cfg) or instance.
+
+    Asking again for the active backend's name returns the same instance, so
+    handles it resolved stay valid.
+    """
+    global _backend
+    if isinstance(backend, str):
+        if _backend is not None and _backend.name == backend:
+            return _backend
+        backend = create_backend(backend)
+    _backend = backend
+    return _backend
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Any, Iterable, List, Optional
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtWidgets import QComboBox, QSpinBox, QStyledItemDelegate
+
+from models import MacroItem
+
+
+ALLOWED_KEYS = ["2", "3", "4", "5", "6", "7"]
+
+COL_ENABLED = 0
+COL_NAME = 1
+COL_KEY = 2
+COL_INTERVAL = 3
+COL_JITTER_MIN = 4
+COL_JITTER_MAX = 5
+
+HEADERS = ["Enabled", "Name", "Key", "Interval (ms)", "Jitter min (ms)", "Jitter max (ms)"]
+
+MIN_INTERVAL_MS = 50
+MAX_MS = 3_600_000
+
+# column -> MacroItem field, for the integer columns
+_INT_FIELDS = {
+    COL_INTERVAL: "interval_ms",
+    COL_JITTER_MIN: "jitter_min_ms",
+    COL_JITTER_MAX: "jitter_max_ms",
+}
+
+
+def fix_item(it: MacroItem) -> MacroItem:
+    """it within the limits setData() enforces: key from ALLOWED_KEYS, interval >= 50 ms, ordered jitter."""
+    key = it.key if it.key in ALLOWED_KEYS else ALLOWED_KEYS[0]
+    interval_ms = max(MIN_INTERVAL_MS, min(MAX_MS, it.interval_ms))
+    jmin = max(0, min(MAX_MS, it.jitter_min_ms))
+    jmax = max(jmin, min(MAX_MS, it.jitter_max_ms))
+    if (key, interval_ms, jmin, jmax) == (it.key, it.interval_ms, it.jitter_min_ms, it.jitter_max_ms):
+        return it
+    return replace(it, key=key, interval_ms=interval_ms, jitter_min_ms=jmin, jitter_max_ms=jmax)
+
+
+class ItemTableModel(QAbstractTableModel):
+    """The macro item table, backed by the MacroItem list itself.
+
+    Edits are validated in setData() and stored as a new MacroItem; items
+    loaded with set_items() or append_item() are brought within the same
+    limits (fix_item), so items() is always a valid list, ready for the
+    scheduler. Rejected input leaves the cell as it was. Fields without a column (steps, fixed_rate,
+    ...) are carried along untouched.
+    """
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._items: List[MacroItem] = []
+
+    def items(self) -> List[MacroItem]:
+        return list(self._items)
+
+    def item(self, row: int) -> MacroItem:
+        return self._items[row]
+
+    def set_items(self, items: Iterable[MacroItem]) -> None:
+        self.beginResetModel()
+        self._items = [fix_item(it) for it in items]
+        self.endResetModel()
+
+    def append_item(self, it: MacroItem) -> int:
+        r = len(self._items)
+        self.beginInsertRows(QModelIndex(), r, r)
+        self._items.append(fix_item(it))
+        self.endInsertRows()
+        return r
+
+    def remove_rows(self, rows: Iterable[int]) -> None:
+        # from the bottom, so earlier rows keep their index
+        for r in sorted(set(rows), reverse=True):
+            if 0 <= r < len(self._items):
+                self.beginRemoveRows(QModelIndex(), r, r)
+                del self._items[r]
+                self.endRemoveRows()
+
+    def find(self, name: str) -> int:
+        """Row of the first item called name, or -1."""
+        for r, it in enumerate(self._items):
+            if it.name == name:
+                return r
+        return -1
+
+    def set_enabled(self, row: int, enabled: bool) -> None:
+        self._set(row, replace(self._items[row], enabled=enabled), COL_ENABLED, COL_ENABLED)
+
+    def _set(self, row: int, it: MacroItem, first_col: int, last_col: int) -> None:
+        self._items[row] = it
+        self.dataChanged.emit(self.index(row, first_col), self.index(row, last_col))
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(HEADERS):
+            return HEADERS[section]
+        return None
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        f = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == COL_ENABLED:
+            return f | Qt.ItemIsUserCheckable
+        return f | Qt.ItemIsEditable
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        it = self._items[index.row()]
+        col = index.column()
+
+        if col == COL_ENABLED:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if it.enabled else Qt.Unchecked
+            return None
+        if role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+
+        if col == COL_NAME:
+            return it.name
+        if col == COL_KEY:
+            return it.key
+        return getattr(it, _INT_FIELDS[col])
+
+    def setData(self, index: QModelIndex, value: Any, role: int = Qt.EditRole) -> bool:
+        if not index.isValid():
+            return False
+        r, col = index.row(), index.column()
+        it = self._items[r]
+
+        if col == COL_ENABLED:
+            if role != Qt.CheckStateRole:
+                return False
+            self.set_enabled(r, Qt.CheckState(value) == Qt.Checked)
+            return True
+        if role != Qt.EditRole:
+            return False
+
+        if col == COL_NAME:
+            name = str(value).strip()
+            if not name:
+                return False
+            self._set(r, replace(it, name=name), col, col)
+            return True
+
+        if col == COL_KEY:
+            key = str(value).strip()
+            if key not in ALLOWED_KEYS:
+                return False
+            self._set(r, replace(it, key=key), col, col)
+            return True
+
+        try:
+            n = int(str(value).strip())
+        except ValueError:
+            return False
+
+        if col == COL_INTERVAL:
+            if not MIN_INTERVAL_MS <= n <= MAX_MS:
+                return False
+            self._set(r, replace(it, interval_ms=n), col, col)
+        elif col == COL_JITTER_MIN:
+            if not 0 <= n <= MAX_MS:
+                return False
+            # the range stays ordered: max follows a min raised above it
+            self._set(r, replace(it, jitter_min_ms=n, jitter_max_ms=max(n, it.jitter_max_ms)), col, COL_JITTER_MAX)
+        else:
+            if not it.jitter_min_ms <= n <= MAX_MS:
+                return False
+            self._set(r, replace(it, jitter_max_ms=n), col, col)
+        return True
+
+
+class KeyDelegate(QStyledItemDelegate):
+    """Key column: a combo box of ALLOWED_KEYS, only while the cell is being edited."""
+
+    def createEditor(self, parent, option, index):
+        box = QComboBox(parent)
+        box.addItems(ALLOWED_KEYS)
+        # commit as soon as a key is picked
+        box.activated.connect(lambda _: self.commitData.emit(box))
+        return box
+
+    def setEditorData(self, editor: QComboBox, index: QModelIndex) -> None:
+        key = index.data(Qt.EditRole)
+        if key in ALLOWED_KEYS:
+            editor.setCurrentText(key)
+
+    def setModelData(self, editor: QComboBox, model, index: QModelIndex) -> None:
+        model.setData(index, editor.currentText(), Qt.EditRole)
+
+
+class MsDelegate(QStyledItemDelegate):
+    """Millisecond columns: a spin box limited to what setData() accepts."""
+
+    def __init__(self, minimum: int, parent=None, min_from: Optional[int] = None) -> None:
+        super().__init__(parent)
+        self._minimum = minimum
+        # column whose value is the lower bound instead (jitter max >= jitter min)
+        self._min_from = min_from
+
+    def createEditor(self, parent, option, index):
+        spin = QSpinBox(parent)
+        lo = self._minimum
+        if self._min_from is not None:
+            lo = max(lo, int(index.siblingAtColumn(self._min_from).data(Qt.EditRole) or 0))
+        spin.setRange(lo, MAX_MS)
+        spin.setSingleStep(50)
+        return spin
+
+    def setEditorData(self, editor: QSpinBox, index: QModelIndex) -> None:
+        editor.setValue(int(index.data(Qt.EditRole) or 0))
+
+    def setModelData(self, editor: QSpinBox, model, index: QModelIndex) -> None:
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.EditRole)
+
+
+def install_delegates(view) -> None:
+    """Sets the column delegates of ItemTableModel on a QTableView."""
+    view.setItemDelegateForColumn(COL_KEY, KeyDelegate(view))
+    view.setItemDelegateForColumn(COL_INTERVAL, MsDelegate(MIN_INTERVAL_MS, view))
+    view.setItemDelegateForColumn(COL_JITTER_MIN, MsDelegate(0, view))
+    view.setItemDelegateForColumn(COL_JITTER_MAX, MsDelegate(0, view, min_from=COL_JITTER_MIN))
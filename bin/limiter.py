@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+
+
+# acquire() priorities: item keys (and sequence actions) win over tool-use clicks
+PRIORITY_KEY = 0
+PRIORITY_CLICK = 1
+
+
+@dataclass
+class LimiterStats:
+    granted: int = 0
+    deferred: int = 0
+    dropped: int = 0
+    defer_total_s: float = 0.0
+    defer_max_s: float = 0.0
+
+
+class OutputLimiter:
+    """Token bucket shared by every input event a MacroScheduler sends.
+
+    rate_hz tokens refill per second up to `burst`; each event costs one token
+    (a tool-use injection of N clicks costs N). min_spacing_ms is the least
+    time between two events, on top of the rate.
+
+    Keys are never refused: acquire() reserves their tokens, letting the
+    bucket go into debt, and returns how long the caller must hold the event
+    back (backpressure). Clicks are only granted when a token is free now and
+    no key is owed one, otherwise they are dropped, so keys win whenever the
+    two contend. Thread-safe; callers pass their own clock reading.
+    """
+
+    def __init__(self, rate_hz: float = 50.0, burst: int = 10, min_spacing_ms: float = 0.0) -> None:
+        if rate_hz <= 0:
+            raise ValueError("limiter rate_hz must be positive")
+        self._rate = float(rate_hz)
+        self._burst = max(1.0, float(burst))
+        self._spacing = max(0.0, float(min_spacing_ms)) / 1000.0
+
+        self._lock = threading.Lock()
+        self._tokens = self._burst
+        self._updated: float | None = None
+        # time of the last granted (or reserved) event
+        self._last = float("-inf")
+        self._stats = LimiterStats()
+
+    @property
+    def min_spacing_s(self) -> float:
+        return self._spacing
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tokens = self._burst
+            self._updated = None
+            self._last = float("-inf")
+            self._stats = LimiterStats()
+
+    def acquire(self, now: float, priority: int = PRIORITY_KEY, cost: int = 1) -> float:
+        """Seconds to hold the event back (0.0: send now), or -1.0 if it is dropped."""
+        with self._lock:
+            if self._updated is not None:
+                self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            earliest = self._last + self._spacing
+            s = self._stats
+
+            if priority != PRIORITY_KEY:
+                if self._tokens < cost or now < earliest:
+                    s.dropped += 1
+                    return -1.0
+                self._tokens -= cost
+                self._last = now
+                s.granted += 1
+                return 0.0
+
+            at = max(now, earliest)
+            if self._tokens < cost:
+                at = max(at, now + (cost - self._tokens) / self._rate)
+            self._tokens -= cost
+            self._last = at
+            s.granted += 1
+            delay = at - now
+            if delay > 0.0:
+                s.deferred += 1
+                s.defer_total_s += delay
+                s.defer_max_s = max(s.defer_max_s, delay)
+            return delay
+
+    def stats(self) -> LimiterStats:
+        with self._lock:
+            s = self._stats
+            return LimiterStats(s.granted, s.deferred, s.dropped, s.defer_total_s, s.defer_max_s)
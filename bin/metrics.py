@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from array import array
+from typing import Dict
+
+
+# Log-linear buckets: values (in microseconds) below 2**SUB_BITS get one bucket
+# each, above that every power of two is split into 2**SUB_BITS buckets, so the
+# relative error stays under ~6% across the whole range.
+SUB_BITS = 4
+_SUB = 1 << SUB_BITS
+MAX_EXP = 27  # up to 2**(SUB_BITS + MAX_EXP) us, ~2147 s; anything larger lands in the last bucket
+BUCKETS = _SUB + MAX_EXP * _SUB
+
+
+def _bucket(us: int) -> int:
+    if us < _SUB:
+        return us if us > 0 else 0
+    shift = us.bit_length() - (SUB_BITS + 1)
+    idx = _SUB + shift * _SUB + ((us >> shift) - _SUB)
+    return idx if idx < BUCKETS else BUCKETS - 1
+
+
+def _bucket_value(idx: int) -> int:
+    """Midpoint of a bucket in microseconds."""
+    if idx < _SUB:
+        return idx
+    shift, rem = divmod(idx - _SUB, _SUB)
+    low = (_SUB + rem) << shift
+    return low + ((1 << shift) >> 1)
+
+
+class Histogram:
+    """Fixed-memory latency histogram (seconds in, seconds out).
+
+    Recording is a couple of integer ops and one array increment, cheap enough
+    to leave on for whole sessions. Percentiles are approximate to the bucket
+    width; max is exact.
+    """
+
+    __slots__ = ("_counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self._counts = array("q", bytes(8 * BUCKETS))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        if seconds < 0.0:
+            seconds = 0.0
+        self._counts[_bucket(int(seconds * 1_000_000))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def reset(self) -> None:
+        self._counts = array("q", bytes(8 * BUCKETS))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def percentile(self, p: float) -> float:
+        if self.count <= 0:
+            return 0.0
+        rank = max(1, int(self.count * p / 100.0 + 0.5))
+        seen = 0
+        for idx, n in enumerate(self._counts):
+            if n:
+                seen += n
+                if seen >= rank:
+                    return min(_bucket_value(idx) / 1_000_000, self.max)
+        return self.max
+
+    def summary_ms(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": (self.total / self.count) * 1000.0 if self.count else 0.0,
+            "p50": self.percentile(50) * 1000.0,
+            "p95": self.percentile(95) * 1000.0,
+            "p99": self.percentile(99) * 1000.0,
+            "max": self.max * 1000.0,
+        }
+
+
+class ItemMetrics:
+    """Per-item timing: lateness vs. plan, injection duration, inter-fire interval.
+
+    defer holds how long the output limiter held back an event (its count is
+    the number of deferred events); dropped counts events it refused.
+    """
+
+    __slots__ = ("late", "inject", "interval", "defer", "dropped")
+
+    def __init__(self) -> None:
+        self.late = Histogram()
+        self.inject = Histogram()
+        self.interval = Histogram()
+        self.defer = Histogram()
+        self.dropped = 0
+
+    def reset(self) -> None:
+        self.late.reset()
+        self.inject.reset()
+        self.interval.reset()
+        self.defer.reset()
+        self.dropped = 0
+
+    def summary_ms(self) -> Dict[str, Dict[str, float]]:
+        return {
+            "late": self.late.summary_ms(),
+            "inject": self.inject.summary_ms(),
+            "interval": self.interval.summary_ms(),
+            "defer": self.defer.summary_ms(),
+            "limiter": {"deferred": self.defer.count, "dropped": self.dropped},
+        }
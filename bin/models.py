@@ -1,6 +1,17 @@
 from __future__ import annotations
-from dataclasses import dataclass, asdict
-from typing import Any, Dict
+from dataclasses import dataclass, asdict, field, replace
+from typing import Any, Dict, List, Tuple
+
+
+# What a fixed-rate item does when one or more whole deadlines were missed
+# (stall, system sleep, GC pause):
+#   skip     - drop the missed fires and rejoin the grid at the next slot
+#   coalesce - fire once now, then rejoin the grid at the next slot
+#   burst    - fire every missed deadline back-to-back to catch up
+MISSED_SKIP = "skip"
+MISSED_COALESCE = "coalesce"
+MISSED_BURST = "burst"
+MISSED_POLICIES = (MISSED_SKIP, MISSED_COALESCE, MISSED_BURST)
 
 
 @dataclass
@@ -11,17 +22,92 @@ class MacroItem:
     jitter_min_ms: int = 0
     jitter_max_ms: int = 0
     enabled: bool = True
+    fixed_rate: bool = False
+    missed_policy: str = MISSED_COALESCE
+    # optional multi-step sequence (see sequence.py); replaces the single key press
+    steps: List[Dict[str, Any]] = field(default_factory=list)
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
     @staticmethod
-    def from_dict(d: Dict[str, Any]) -> "MacroItem":
-        return MacroItem(
+    def from_dict(d: Dict[str, Any], repair: bool = False) -> "MacroItem":
+        """Parses one config item. Raises ValueError for what check_item() refuses; repair clamps it instead."""
+        policy = str(d.get("missed_policy", MISSED_COALESCE)).strip().lower()
+        if policy not in MISSED_POLICIES:
+            policy = MISSED_COALESCE
+
+        steps = d.get("steps") or []
+        if not isinstance(steps, list):
+            steps = []
+
+        it = MacroItem(
             name=str(d.get("name", "Item")),
             key=str(d.get("key", "2")),
             interval_ms=int(d.get("interval_ms", 1000)),
             jitter_min_ms=int(d.get("jitter_min_ms", 0)),
             jitter_max_ms=int(d.get("jitter_max_ms", 0)),
             enabled=bool(d.get("enabled", True)),
+            fixed_rate=bool(d.get("fixed_rate", False)),
+            missed_policy=policy,
+            steps=[dict(x) for x in steps if isinstance(x, dict)],
+        )
+        if repair:
+            jmin = max(0, it.jitter_min_ms)
+            return replace(it, interval_ms=max(1, it.interval_ms), jitter_min_ms=jmin,
+                           jitter_max_ms=max(jmin, it.jitter_max_ms))
+        check_item(it)
+        return it
+
+
+def check_item(it: MacroItem) -> None:
+    """Raises ValueError for timing the scheduler can't run (it divides by the interval)."""
+    if it.interval_ms <= 0:
+        raise ValueError(f"{it.name}: interval_ms must be above 0, got {it.interval_ms}")
+    if it.jitter_min_ms < 0:
+        raise ValueError(f"{it.name}: jitter_min_ms must not be negative, got {it.jitter_min_ms}")
+    if it.jitter_max_ms < it.jitter_min_ms:
+        raise ValueError(
+            f"{it.name}: jitter_max_ms ({it.jitter_max_ms}) is below jitter_min_ms ({it.jitter_min_ms})"
         )
+
+
+@dataclass
+class Profile:
+    """A named setup: items, tool-use settings and an optional hotkey that switches to it."""
+
+    name: str
+    items: List[MacroItem] = field(default_factory=list)
+    # "enabled" / "interval_ms"; missing keys fall back to favwhite.cfg's tool_use
+    tool_use: Dict[str, Any] = field(default_factory=dict)
+    hotkey: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "items": [i.to_dict() for i in self.items],
+            "tool_use": dict(self.tool_use),
+            "hotkey": self.hotkey,
+        }
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any], repair: bool = False) -> "Profile":
+        items = d.get("items") or []
+        tool_use = d.get("tool_use") or {}
+        return Profile(
+            name=str(d.get("name", "")).strip(),
+            items=[MacroItem.from_dict(x, repair) for x in items if isinstance(x, dict)] if isinstance(items, list) else [],
+            tool_use=dict(tool_use) if isinstance(tool_use, dict) else {},
+            hotkey=str(d.get("hotkey", "") or "").strip(),
+        )
+
+
+def item_keys(items: List[MacroItem]) -> List[Tuple[str, int]]:
+    """Identity of each item across config reloads: (name, n-th item with that name)."""
+    seen: Dict[str, int] = {}
+    keys = []
+    for it in items:
+        n = seen.get(it.name, 0)
+        seen[it.name] = n + 1
+        keys.append((it.name, n))
+    return keys
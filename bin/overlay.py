@@ -1,106 +1,144 @@
 from __future__ import annotations
 
 import time
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from PySide6.QtCore import Qt, QTimer, QPoint
-from PySide6.QtGui import QGuiApplication
-from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QFrame
+from PySide6.QtCore import Qt, QTimer, QPoint, QPointF, QRect, QRectF, QEvent, Signal, Slot
+from PySide6.QtGui import (
+    QColor, QFont, QFontMetrics, QGuiApplication, QPainter, QPen, QRegion, QStaticText, QTransform
 )
+from PySide6.QtWidgets import QWidget
 
 from models import MacroItem
-from scheduler import ItemState
+from state_store import StateStore, StateView
+
+
+DEFAULT_REFRESH_HZ = 10
+DEFAULT_MAX_ROWS = 12
+
+_MARGIN = 10      # transparent border around the card
+_PAD = 10         # inside the card
+_BTN_H = 28
+_BTN_GAP = 6
+_MIN_WIDTH = 240
+_MAX_WIDTH = 560
+
+_CARD_BG = QColor(20, 20, 24, 220)
+_CARD_BORDER = QColor(255, 255, 255, 30)
+_BTN_BG = QColor(255, 255, 255, 35)
+_BTN_HOVER = QColor(255, 255, 255, 55)
+_BTN_BORDER = QColor(255, 255, 255, 45)
+_TEXT = QColor(255, 255, 255)
+_SCROLL = QColor(255, 255, 255, 70)
 
 
 class OverlayWindow(QWidget):
+    """Always-on-top status card for a running scheduler, painted as one widget.
+
+    The scheduler signals state_changed (safe to emit from its threads; Qt
+    queues it to the GUI thread) only when something fired; the overlay then
+    copies the scheduler's StateStore into its own StateView without locking.
+    Countdowns are computed locally from the last known deadline. Each row is
+    a cached QStaticText whose glyph layout is only redone when its text
+    changes, and only the rows that changed are repainted; rendering stops
+    while the overlay is hidden or minimised.
+
+    Settings come from favwhite.cfg's "overlay" section: x / y / opacity /
+    always_on_top, refresh_hz (countdown updates per second), max_rows (more
+    items scroll with the mouse wheel) and compact (shorter rows).
+    apply_items() follows a config reload or a profile switch in place.
+    While paused (set_paused) the countdowns are frozen at the pause time and
+    the overlay doesn't render at all.
+    """
+
+    state_changed = Signal()
+    # new top-left corner after the user dragged the overlay
+    moved = Signal(int, int)
+
     def __init__(
         self,
         items: List[MacroItem],
         on_stop,
         tool_use_enabled: bool = False,
-        tool_use_interval_ms: int = 30
+        tool_use_interval_ms: int = 30,
+        on_pause=None,
+        settings: Optional[Dict[str, Any]] = None,
     ) -> None:
         super().__init__()
 
+        settings = settings or {}
         self._items = items
         self._on_stop = on_stop
+        self._on_pause = on_pause
+        # monotonic time the scheduler was paused at, None while running
+        self._paused_at: Optional[float] = None
         self._drag_pos: QPoint | None = None
+        self._dragged = False
 
         self._tool_use_enabled = tool_use_enabled
         self._tool_use_interval_ms = tool_use_interval_ms
 
+        self._start_pos = QPoint(int(settings.get("x", 40)), int(settings.get("y", 40)))
+        self._compact = bool(settings.get("compact", False))
+        self._max_rows = max(1, int(settings.get("max_rows", DEFAULT_MAX_ROWS)))
+        refresh_hz = max(1.0, min(60.0, float(settings.get("refresh_hz", DEFAULT_REFRESH_HZ))))
+
+        # optional "late p99" column, refreshed once a second
+        self._metrics_fn: Optional[Callable[[], List[Dict[str, Dict[str, float]]]]] = None
+        self._late_p99: Dict[int, float] = {}
+
         self.setWindowTitle("FavWhite Overlay")
-        self.setWindowFlags(
-            Qt.Tool |
-            Qt.FramelessWindowHint |
-            Qt.WindowStaysOnTopHint
-        )
+        flags = Qt.Tool | Qt.FramelessWindowHint
+        if settings.get("always_on_top", True):
+            flags |= Qt.WindowStaysOnTopHint
+        self.setWindowFlags(flags)
         self.setAttribute(Qt.WA_TranslucentBackground, True)
+        self.setWindowOpacity(max(0.2, min(1.0, float(settings.get("opacity", 0.95)))))
+        self.setMouseTracking(True)
+
+        self._font = QFont(self.font())
+        self._font.setPixelSize(11 if self._compact else 12)
+        self._title_font = QFont(self._font)
+        self._title_font.setPixelSize(12 if self._compact else 13)
+        self._title_font.setWeight(QFont.DemiBold)
+        self._fm = QFontMetrics(self._font)
+        self._line_h = self._fm.height() + (2 if self._compact else 6)
+        self._title_h = QFontMetrics(self._title_font).height() + 8
+
+        self._title = self._static("FavWhite — Running", self._title_font)
+        self._buttons: List[Tuple[str, QStaticText, Callable[[], None]]] = []
+        if on_pause is not None:
+            self._buttons.append(("pause", self._static("Pause", self._font), self._on_pause_clicked))
+        self._buttons.append(("stop", self._static("Stop", self._font), self._on_stop_clicked))
+        self._hover: Optional[str] = None
+        self._pressed: Optional[str] = None
+
+        # rows: tool use first (if any), then the items in slot order
+        self._tool_slot = len(items) if tool_use_enabled else None
+        self._order: List[int] = []
+        self._names: Dict[int, str] = {}
+        # per-slot text and its laid-out QStaticText, built when first shown
+        self._texts: Dict[int, str] = {}
+        self._statics: Dict[int, QStaticText] = {}
+        self._scroll = 0
+        self._set_rows(items)
 
-        self._labels: Dict[str, QLabel] = {}
-
-        root = QVBoxLayout()
-        root.setContentsMargins(10, 10, 10, 10)
-
-        card = QFrame()
-        card.setStyleSheet("""
-            QFrame {
-                background: rgba(20, 20, 24, 220);
-                border: 1px solid rgba(255,255,255,30);
-                border-radius: 12px;
-            }
-            QLabel { color: #ffffff; font-size: 12px; }
-            QPushButton {
-                color: #ffffff;
-                background: rgba(255,255,255,35);
-                border: 1px solid rgba(255,255,255,45);
-                padding: 6px 10px;
-                border-radius: 10px;
-            }
-            QPushButton:hover { background: rgba(255,255,255,55); }
-        """)
-
-        v = QVBoxLayout(card)
-
-        title = QLabel("FavWhite — Running")
-        title.setStyleSheet("font-size: 13px; font-weight: 600;")
-        v.addWidget(title)
-
-        if self._tool_use_enabled:
-            lbl = QLabel(f"Tool use [LClick] — every {self._tool_use_interval_ms}ms — uses: 0")
-            self._labels["Tool use"] = lbl
-            v.addWidget(lbl)
-
-        for it in items:
-            lbl = QLabel(f"{it.name} [{it.key}] — next: ---, uses: 0")
-            self._labels[it.name] = lbl
-            v.addWidget(lbl)
-
-        row = QHBoxLayout()
-        stop_btn = QPushButton("Stop")
-        stop_btn.clicked.connect(self._on_stop_clicked)
-        row.addStretch(1)
-        row.addWidget(stop_btn)
-        v.addLayout(row)
-
-        root.addWidget(card)
-        self.setLayout(root)
-
-        self._latest_state: Dict[str, ItemState] = {}
+        self._store: Optional[StateStore] = None
+        self._view = StateView()
+        self.state_changed.connect(self._on_state_changed)
 
         self._timer = QTimer(self)
-        self._timer.setInterval(100)
+        self._timer.setInterval(int(round(1000.0 / refresh_hz)))
         self._timer.timeout.connect(self._render)
-        self._timer.start()
+
+        self._metrics_timer: Optional[QTimer] = None
 
         QTimer.singleShot(0, self._apply_start_pos)
 
     def _apply_start_pos(self) -> None:
-        x = 1784
-        y = 233
+        x, y = self._start_pos.x(), self._start_pos.y()
 
-        screen = QGuiApplication.primaryScreen()
+        screen = QGuiApplication.screenAt(self._start_pos) or QGuiApplication.primaryScreen()
         if screen:
             geo = screen.availableGeometry()
             x = max(geo.left(), min(x, geo.right() - self.width()))
@@ -108,29 +146,281 @@ class OverlayWindow(QWidget):
 
         self.move(x, y)
 
-    def set_state(self, states: Dict[str, ItemState]) -> None:
-        self._latest_state = states
+    @staticmethod
+    def _static(text: str, font: QFont) -> QStaticText:
+        st = QStaticText(text)
+        st.setTextFormat(Qt.PlainText)
+        st.setPerformanceHint(QStaticText.AggressiveCaching)
+        st.prepare(QTransform(), font)
+        return st
+
+    def _set_rows(self, items: List[MacroItem]) -> None:
+        self._order = ([self._tool_slot] if self._tool_slot is not None else []) + list(range(len(items)))
+        self._names = {slot: it.name for slot, it in enumerate(items)}
+        if self._tool_slot is not None:
+            self._names[self._tool_slot] = "Tool use"
+        self._texts.clear()
+        self._statics.clear()
+        self._late_p99 = {}
+        self._scroll = max(0, min(self._scroll, len(self._order) - self._max_rows))
+        self._layout()
+
+    def _initial_text(self, slot: int) -> str:
+        if slot == self._tool_slot:
+            return f"Tool use [LClick] — every {self._tool_use_interval_ms}ms — uses: 0"
+        it = self._items[slot]
+        return f"{it.name} [{it.key}] — next: ---, uses: 0"
+
+    def _layout(self) -> None:
+        # fixed width from the longest name, so changing numbers never resize the window
+        sample = "Tool use [LClick] — 000.0 clicks/s, uses: 000000"
+        widest = self._fm.horizontalAdvance(sample)
+        suffix = " · 0000.0s · 000000" if self._compact else " — next: 0000.0s, uses: 000000"
+        for name in self._names.values():
+            widest = max(widest, self._fm.horizontalAdvance(name + suffix))
+            if widest >= _MAX_WIDTH:
+                break
+        self._content_w = max(_MIN_WIDTH, min(_MAX_WIDTH, widest + 8))
+
+        rows = min(len(self._order), self._max_rows)
+        self._rows_top = _MARGIN + _PAD + self._title_h
+        self._btn_top = self._rows_top + rows * self._line_h + _BTN_GAP
+        w = self._content_w + 2 * (_MARGIN + _PAD)
+        h = self._btn_top + _BTN_H + _PAD + _MARGIN
+        self.setFixedSize(w, h)
+        self._layout_buttons()
+
+    def _layout_buttons(self) -> None:
+        self._btn_rects: Dict[str, QRect] = {}
+        right = _MARGIN + _PAD + self._content_w
+        for key, st, _ in reversed(self._buttons):
+            bw = int(st.size().width()) + 20
+            self._btn_rects[key] = QRect(right - bw, self._btn_top, bw, _BTN_H)
+            right -= bw + _BTN_GAP
+
+    def _row_rect(self, i: int) -> QRect:
+        """Rect of the i-th visible row."""
+        return QRect(_MARGIN + _PAD, self._rows_top + i * self._line_h, self._content_w, self._line_h)
+
+    def _rows_rect(self) -> QRect:
+        rows = min(len(self._order), self._max_rows)
+        return QRect(_MARGIN + _PAD, self._rows_top, self._content_w + _PAD, rows * self._line_h)
+
+    def _visible(self) -> List[int]:
+        return self._order[self._scroll:self._scroll + self._max_rows]
+
+    def _set_text(self, slot: int, text: str) -> bool:
+        if self._texts.get(slot) == text and slot in self._statics:
+            return False
+        self._texts[slot] = text
+        shown = self._fm.elidedText(text, Qt.ElideRight, self._content_w)
+        st = self._statics.get(slot)
+        if st is None:
+            self._statics[slot] = self._static(shown, self._font)
+        else:
+            st.setText(shown)
+            st.prepare(QTransform(), self._font)
+        return True
+
+    def apply_items(self, items: List[MacroItem]) -> None:
+        """Follows MacroScheduler.apply_items(): same slot order, tool use moving to the end."""
+        if self._tool_slot is not None:
+            self._tool_slot = len(items)
+        self._items = items
+        self._set_rows(items)
+        self.update()
+        self._on_state_changed()
+
+    def set_paused(self, paused_at: Optional[float]) -> None:
+        """Shows the schedule frozen at paused_at (MacroScheduler.paused_at), or running again with None."""
+        self._paused_at = paused_at
+        self._title.setText("FavWhite — Paused" if paused_at is not None else "FavWhite — Running")
+        self._title.prepare(QTransform(), self._title_font)
+        for key, st, _ in self._buttons:
+            if key == "pause":
+                st.setText("Resume" if paused_at is not None else "Pause")
+                st.prepare(QTransform(), self._font)
+        self._layout_buttons()
+        self.update()
+        # one render with the frozen (or resumed) countdowns, then idle or tick again
+        if self._rendering():
+            self._render()
+        self._sync_timers()
+
+    def set_metrics_fn(self, metrics_fn: Callable[[], List[Dict[str, Dict[str, float]]]]) -> None:
+        """Enables the "late p99" column, fed from MacroScheduler.metrics()."""
+        self._metrics_fn = metrics_fn
+        if self._metrics_timer is None:
+            self._metrics_timer = QTimer(self)
+            self._metrics_timer.setInterval(1000)
+            self._metrics_timer.timeout.connect(self._refresh_metrics)
+        self._sync_timers()
+
+    def set_state_store(self, store: StateStore) -> None:
+        """Binds the scheduler's state store (MacroScheduler.state_store)."""
+        self._store = store
+        self._view = StateView()
+        self._on_state_changed()
+
+    @Slot()
+    def _on_state_changed(self) -> None:
+        if self._rendering():
+            self._render()
+
+    def _rendering(self) -> bool:
+        return self.isVisible() and not self.isMinimized()
+
+    def _sync_timers(self) -> None:
+        active = self._rendering() and self._paused_at is None
+        for t in (self._timer, self._metrics_timer):
+            if t is None:
+                continue
+            if active and not t.isActive():
+                t.start()
+            elif not active and t.isActive():
+                t.stop()
+        if active:
+            self._render()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._sync_timers()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._sync_timers()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self._sync_timers()
+
+    def _refresh_metrics(self) -> None:
+        self._late_p99 = {slot: m["late"]["p99"] for slot, m in enumerate(self._metrics_fn())}
+        self._render()
+
+    def _row_text(self, slot: int, view: StateView, now: float) -> str:
+        uses = view.uses[slot]
+        if slot == self._tool_slot:
+            if view.next_fire[slot] <= 0.0:
+                # switched off by the active profile
+                return f"Tool use · off · {uses}" if self._compact else f"Tool use [LClick] — off, uses: {uses}"
+            hz = view.achieved_hz(slot, now)
+            if self._compact:
+                return f"Tool use · {hz:0.1f}/s · {uses}"
+            return f"Tool use [LClick] — {hz:0.1f} clicks/s, uses: {uses}"
+
+        remaining = max(0.0, view.next_fire[slot] - now)
+        if self._compact:
+            text = f"{self._names[slot]} · {remaining:0.1f}s · {uses}"
+        else:
+            text = f"{self._names[slot]} — next: {remaining:0.1f}s, uses: {uses}"
+        late = self._late_p99.get(slot)
+        if late is not None:
+            text += f" · p99 {late:0.1f}ms" if self._compact else f", late p99: {late:0.1f}ms"
+        return text
 
     def _render(self) -> None:
-        now = time.monotonic()
-        for name, lbl in self._labels.items():
-            st = self._latest_state.get(name)
-            if st is None:
+        """Updates the visible rows' texts and repaints the ones that changed."""
+        if self._store is None:
+            return
+        view = self._view
+        self._store.read_into(view)
+
+        now = self._paused_at if self._paused_at is not None else time.monotonic()
+        dirty = QRegion()
+        for i, slot in enumerate(self._visible()):
+            if slot >= view.size:
                 continue
+            if self._set_text(slot, self._row_text(slot, view, now)):
+                dirty = dirty.united(self._row_rect(i))
+        if not dirty.isEmpty():
+            self.update(dirty)
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing, True)
+        clip = event.rect()
+
+        card = QRectF(self.rect().adjusted(_MARGIN, _MARGIN, -_MARGIN, -_MARGIN)).adjusted(0.5, 0.5, -0.5, -0.5)
+        p.setPen(QPen(_CARD_BORDER, 1))
+        p.setBrush(_CARD_BG)
+        p.drawRoundedRect(card, 12, 12)
+
+        p.setPen(_TEXT)
+        if clip.top() < self._rows_top:
+            p.setFont(self._title_font)
+            p.drawStaticText(QPointF(_MARGIN + _PAD, _MARGIN + _PAD), self._title)
+
+        p.setFont(self._font)
+        text_dy = (self._line_h - self._fm.height()) / 2.0
+        for i, slot in enumerate(self._visible()):
+            r = self._row_rect(i)
+            if not r.intersects(clip):
+                continue
+            st = self._statics.get(slot)
+            if st is None:
+                self._set_text(slot, self._initial_text(slot))
+                st = self._statics[slot]
+            p.drawStaticText(QPointF(r.left(), r.top() + text_dy), st)
 
-            remaining = max(0.0, st.next_fire_monotonic - now)
+        if len(self._order) > self._max_rows:
+            self._paint_scrollbar(p)
 
-            if name == "Tool use":
-                lbl.setText(f"Tool use [LClick] — next: {remaining:0.1f}s, uses: {st.uses}")
-            else:
-                lbl.setText(f"{name} — next: {remaining:0.1f}s, uses: {st.uses}")
+        if clip.bottom() >= self._btn_top:
+            for key, st, _ in self._buttons:
+                r = QRectF(self._btn_rects[key]).adjusted(0.5, 0.5, -0.5, -0.5)
+                p.setPen(QPen(_BTN_BORDER, 1))
+                p.setBrush(_BTN_HOVER if key in (self._hover, self._pressed) else _BTN_BG)
+                p.drawRoundedRect(r, 10, 10)
+                size = st.size()
+                p.setPen(_TEXT)
+                p.drawStaticText(
+                    QPointF(r.center().x() - size.width() / 2.0, r.center().y() - size.height() / 2.0), st
+                )
+        p.end()
+
+    def _paint_scrollbar(self, p: QPainter) -> None:
+        area = self._rows_rect()
+        n = len(self._order)
+        h = max(12.0, area.height() * self._max_rows / n)
+        y = area.top() + (area.height() - h) * self._scroll / max(1, n - self._max_rows)
+        p.setPen(Qt.NoPen)
+        p.setBrush(_SCROLL)
+        p.drawRoundedRect(QRectF(area.right() - 4, y, 3, h), 1.5, 1.5)
+
+    def wheelEvent(self, event):
+        hidden = len(self._order) - self._max_rows
+        dy = event.angleDelta().y()
+        if hidden <= 0 or dy == 0:
+            return
+        # at least one row per event, also for fine-grained touchpad deltas
+        steps = -dy // 120 or (-1 if dy > 0 else 1)
+        scroll = max(0, min(hidden, self._scroll + steps * (1 if self._compact else 3)))
+        if scroll != self._scroll:
+            self._scroll = scroll
+            self.update(self._rows_rect())
+            self._render()
+        event.accept()
+
+    def _button_at(self, pos: QPoint) -> Optional[str]:
+        for key, r in self._btn_rects.items():
+            if r.contains(pos):
+                return key
+        return None
 
     def _on_stop_clicked(self) -> None:
         self._on_stop()
 
+    def _on_pause_clicked(self) -> None:
+        self._on_pause()
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
-            self._drag_pos = event.globalPosition().toPoint()
+            self._pressed = self._button_at(event.position().toPoint())
+            if self._pressed is None:
+                self._drag_pos = event.globalPosition().toPoint()
+                self._dragged = False
         super().mousePressEvent(event)
 
     def mouseMoveEvent(self, event):
@@ -138,8 +428,31 @@ class OverlayWindow(QWidget):
             delta = event.globalPosition().toPoint() - self._drag_pos
             self.move(self.pos() + delta)
             self._drag_pos = event.globalPosition().toPoint()
+            self._dragged = True
+        else:
+            hover = self._button_at(event.position().toPoint())
+            if hover != self._hover:
+                self._hover = hover
+                self.update(QRect(0, self._btn_top, self.width(), _BTN_H))
         super().mouseMoveEvent(event)
 
     def mouseReleaseEvent(self, event):
+        pressed, self._pressed = self._pressed, None
+        if pressed is not None:
+            self.update(QRect(0, self._btn_top, self.width(), _BTN_H))
+            if pressed == self._button_at(event.position().toPoint()):
+                for key, _, on_click in self._buttons:
+                    if key == pressed:
+                        # after this handler: Stop closes (and may delete) the overlay
+                        QTimer.singleShot(0, on_click)
+                        break
+        if self._drag_pos is not None and self._dragged:
+            self.moved.emit(self.x(), self.y())
         self._drag_pos = None
         super().mouseReleaseEvent(event)
+
+    def leaveEvent(self, event):
+        if self._hover is not None:
+            self._hover = None
+            self.update(QRect(0, self._btn_top, self.width(), _BTN_H))
+        super().leaveEvent(event)
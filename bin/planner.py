@@ -0,0 +1,170 @@
+"""Phase-offset planner: staggers item start times so fires don't collide.
+
+Two items with periods Pa and Pb (ms) and first fires at phases a and b
+come closest, over their whole hyperperiod, at a distance of
+min(d, g - d) where g = gcd(Pa, Pb) and d = (b - a) mod g. The planner uses
+that closed form instead of walking the hyperperiod, and places items
+greedily (shortest period first), giving each the phase with the fewest
+already placed items closer than min_spacing_ms, then the largest minimum
+gap to them (ties: the later phase).
+
+The search is bounded: fewer phases are tried per item as the item count
+grows, a phase is dropped as soon as one gap shows it can't win, and
+planning stops after budget_ms. Items not reached by then keep their
+interval as first delay and the plan is marked incomplete.
+
+Jitter is modelled as a window: an item fires at its nominal period plus
+the mean jitter, and its jitter range is subtracted from every gap it is
+part of. Jitter accumulates, so jittered items drift away from the plan
+over time; jitter-free items keep it exactly.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from math import gcd
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import MacroItem
+
+
+DEFAULT_MIN_SPACING_MS = 100
+DEFAULT_RESOLUTION_MS = 10
+# planning time on Start (it runs on the GUI thread)
+DEFAULT_BUDGET_MS = 250
+# phase candidates tried per item (fewer when there are many items)
+MAX_CANDIDATES = 1000
+CANDIDATE_BUDGET = 500_000
+
+
+@dataclass
+class Plan:
+    """First-fire delay per item position (seconds; disabled items keep their interval)."""
+
+    offsets_s: List[float]
+    # smallest gap between any two fires over the hyperperiod, None with < 2 items
+    # (between the planned items only when not complete)
+    min_gap_ms: Optional[float]
+    min_spacing_ms: float
+    # False when the time budget ran out before every item was placed
+    complete: bool = True
+
+    @property
+    def feasible(self) -> bool:
+        return self.min_gap_ms is None or self.min_gap_ms >= self.min_spacing_ms
+
+
+def nominal_period_ms(it: MacroItem) -> int:
+    if it.jitter_max_ms > 0 and it.jitter_max_ms >= it.jitter_min_ms:
+        return max(1, int(it.interval_ms + round((it.jitter_min_ms + it.jitter_max_ms) / 2)))
+    return max(1, int(it.interval_ms))
+
+
+def _width_ms(it: MacroItem) -> float:
+    if it.jitter_max_ms > 0 and it.jitter_max_ms >= it.jitter_min_ms:
+        return float(it.jitter_max_ms - it.jitter_min_ms)
+    return 0.0
+
+
+def plan_offsets(
+    items: List[MacroItem],
+    min_spacing_ms: float = DEFAULT_MIN_SPACING_MS,
+    resolution_ms: int = DEFAULT_RESOLUTION_MS,
+    budget_ms: Optional[float] = DEFAULT_BUDGET_MS,
+) -> Plan:
+    """Picks a first-fire delay in (0, interval] for every enabled item.
+
+    The delay defaults to the full interval (the unplanned behaviour); the
+    planner only moves it earlier, in resolution_ms steps, when that leaves
+    fewer items within min_spacing_ms or widens the minimum gap. Deterministic for the same items, as long
+    as budget_ms (None: no limit) isn't reached.
+    """
+    offsets = [it.interval_ms / 1000.0 for it in items]
+    slots = [i for i, it in enumerate(items) if it.enabled]
+    if len(slots) < 2:
+        return Plan(offsets, None, float(min_spacing_ms))
+
+    slots.sort(key=lambda i: (nominal_period_ms(items[i]), i))
+    n_candidates = max(4, min(MAX_CANDIDATES, CANDIDATE_BUDGET // (len(slots) * len(slots))))
+    resolution_ms = max(1, int(resolution_ms))
+    give_up = None if budget_ms is None else time.perf_counter() + budget_ms / 1000.0
+
+    # (period, phase, half window) of items placed so far
+    placed: List[Tuple[int, int, float]] = []
+    min_gap = float("inf")
+
+    for slot in slots:
+        if give_up is not None and time.perf_counter() > give_up:
+            # the rest keep their interval
+            return Plan(offsets, min_gap if len(placed) > 1 else None, float(min_spacing_ms), complete=False)
+
+        it = items[slot]
+        period = nominal_period_ms(it)
+        half = _width_ms(it) / 2.0
+        first = max(1, int(it.interval_ms))
+
+        if not placed:
+            best_phase, best_gap = first, float("inf")
+        else:
+            # gcd and window per placed item don't depend on the phase tried
+            others = [(gcd(p, period), ph, h + half) for p, ph, h in placed]
+            step = max(resolution_ms, first // n_candidates)
+            # fewest items closer than min_spacing_ms, then the largest minimum gap
+            best_phase, best_close, best_gap = first, len(others) + 1, float("-inf")
+            for phase in range(first, 0, -step):
+                close, gap = 0, float("inf")
+                for g, ph, w in others:
+                    d = (phase - ph) % g
+                    e = min(d, g - d) - w
+                    if e < min_spacing_ms:
+                        close += 1
+                    if e < gap:
+                        gap = e
+                    # close only grows and gap only shrinks: this phase can't win any more
+                    if close > best_close or (close == best_close and gap <= best_gap):
+                        break
+                else:
+                    best_phase, best_close, best_gap = phase, close, gap
+
+        placed.append((period, best_phase, half))
+        offsets[slot] = best_phase / 1000.0
+        min_gap = min(min_gap, best_gap)
+
+    return Plan(offsets, min_gap, float(min_spacing_ms))
+
+
+def plan_from_config(cfg: Dict[str, Any], items: List[MacroItem]) -> Optional[Plan]:
+    """plan_offsets() with favwhite.cfg's "planner" settings; None when the planner is off."""
+    planner_cfg = cfg.get("planner", {})
+    if not planner_cfg.get("enabled", True):
+        return None
+    return plan_offsets(
+        items,
+        min_spacing_ms=float(planner_cfg.get("min_spacing_ms", DEFAULT_MIN_SPACING_MS)),
+        resolution_ms=int(planner_cfg.get("resolution_ms", DEFAULT_RESOLUTION_MS)),
+        budget_ms=float(planner_cfg.get("budget_ms", DEFAULT_BUDGET_MS)),
+    )
+
+
+def preview_timeline(
+    items: List[MacroItem],
+    offsets_s: Optional[List[float]],
+    duration_s: float,
+) -> List[Tuple[float, int]]:
+    """Nominal (time_s from start, slot) fires of enabled items, in time order.
+
+    Built in bulk from each item's arithmetic progression, not by stepping a
+    scheduler; jitter is taken at its mean.
+    """
+    fires: List[Tuple[float, int]] = []
+    for slot, it in enumerate(items):
+        if not it.enabled:
+            continue
+        period = nominal_period_ms(it) / 1000.0
+        first = offsets_s[slot] if offsets_s is not None else it.interval_ms / 1000.0
+        if first > duration_s:
+            continue
+        n = int((duration_s - first) // period) + 1
+        fires.extend((first + k * period, slot) for k in range(n))
+    fires.sort()
+    return fires
@@ -1,116 +1,1343 @@
 from __future__ import annotations
 
+import heapq
 import random
 import time
 import threading
-from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
 
-from models import MacroItem
+from limiter import LimiterStats, OutputLimiter, PRIORITY_CLICK, PRIORITY_KEY
+from metrics import Histogram, ItemMetrics
+from models import MacroItem, MISSED_BURST, MISSED_SKIP, check_item, item_keys
+from sequence import ACTION_CLICK, ACTION_DOWN, ACTION_PRESS, ACTION_UP, CompiledSequence, compile_steps
+from state_store import StateStore, StateView
+
+
+ENGINE_DEADLINE = "deadline"
+ENGINE_POLLING = "polling"
+ENGINES = (ENGINE_DEADLINE, ENGINE_POLLING)
+
+TOOL_USE_NAME = "Tool use"
+
+# burst policy: at most this many missed fires are replayed, older ones are dropped
+MAX_BURST_CATCHUP = 10
+
+# The tool-use loop sleeps on the stop event until this close to its deadline
+# and yields for the rest: OS timer granularity (~15.6 ms by default on
+# Windows) would otherwise swallow 10-30 ms click intervals.
+TOOL_USE_SPIN_S = 0.002
+TOOL_USE_TICK_S = 0.1
+
+# legacy polling engine tick
+POLLING_TICK_S = 0.05
+
+# InputDispatcher behaviour when its queue is full
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_BLOCK = "block"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK, OVERFLOW_COALESCE)
 
 
 @dataclass
 class ItemState:
+    """Allocated copy of one StateStore slot, for snapshot() callers."""
+
     uses: int = 0
     next_fire_monotonic: float = 0.0
     last_fire_monotonic: float = 0.0
+    started_monotonic: float = 0.0
+    configured_hz: float = 0.0
+    achieved_hz: float = 0.0
+    missed: int = 0
+
+
+@dataclass
+class DispatchStats:
+    submitted: int = 0
+    injected: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    queue_latency_total_s: float = 0.0
+    queue_latency_max_s: float = 0.0
+    inject_total_s: float = 0.0
+    inject_max_s: float = 0.0
+    # jobs discarded by halt() or flush()
+    flushed: int = 0
+    last_inject_done_monotonic: float = 0.0
+
+    @property
+    def queue_latency_avg_s(self) -> float:
+        return self.queue_latency_total_s / self.injected if self.injected else 0.0
+
+    @property
+    def inject_avg_s(self) -> float:
+        return self.inject_total_s / self.injected if self.injected else 0.0
+
+
+class InputDispatcher:
+    """Performs OS input injection on its own worker thread.
+
+    The scheduler only enqueues (fn, arg) jobs, so a slow or blocked injection
+    can't stall timing or snapshot() readers. The queue is bounded; when it is
+    full the oldest job is dropped or (block) the producer waits. With
+    coalesce, a job identical to one still pending is merged into it, and a
+    full queue falls back to dropping the oldest. Latency from enqueue to
+    injection is recorded separately from the injection itself, into every
+    histogram passed with the job (a batch records into each of its items).
+
+    halt() discards the queue and stops the worker before its next injection
+    without waiting for it, so it is safe to call from a hotkey thread.
+    """
+
+    def __init__(self, maxsize: int = 64, overflow: str = OVERFLOW_DROP_OLDEST) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown dispatch overflow policy: {overflow!r}")
+
+        self._maxsize = max(1, int(maxsize))
+        self._overflow = overflow
+        # (fn, arg, enqueued_monotonic, histograms for the injection time)
+        self._queue: Deque[Tuple[Callable[[Any], None], Any, float, Tuple[Histogram, ...]]] = deque()
+        self._cond = threading.Condition()
+        self._stats = DispatchStats()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._queue.clear()
+            self._cond.notify_all()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    @property
+    def joined(self) -> bool:
+        """True when no worker is running, so no injection can be in flight."""
+        return self._thread is None
+
+    def halt(self) -> None:
+        """Drops every pending job and stops injecting; doesn't join (stop() does)."""
+        with self._cond:
+            self._running = False
+            self._stats.flushed += len(self._queue)
+            self._queue.clear()
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Drops every pending job but keeps running (pause)."""
+        with self._cond:
+            self._stats.flushed += len(self._queue)
+            self._queue.clear()
+            self._cond.notify_all()
+
+    def submit(self, fn: Callable[[Any], None], arg: Any, inject_hists: Tuple[Histogram, ...] = ()) -> bool:
+        """Queues one injection. Returns False if it was dropped or merged."""
+        with self._cond:
+            if not self._running:
+                return False
+            self._stats.submitted += 1
+
+            if self._overflow == OVERFLOW_COALESCE:
+                for qfn, qarg, _, _ in self._queue:
+                    if qfn is fn and qarg == arg:
+                        self._stats.coalesced += 1
+                        return False
+
+            if len(self._queue) >= self._maxsize:
+                if self._overflow == OVERFLOW_BLOCK:
+                    while self._running and len(self._queue) >= self._maxsize:
+                        self._cond.wait()
+                    if not self._running:
+                        return False
+                else:
+                    self._queue.popleft()
+                    self._stats.dropped += 1
+
+            self._queue.append((fn, arg, time.monotonic(), inject_hists))
+            self._cond.notify_all()
+            return True
+
+    def stats(self) -> DispatchStats:
+        with self._cond:
+            return replace(self._stats)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                fn, arg, enqueued, inject_hists = self._queue.popleft()
+                # wake a producer blocked on a full queue
+                self._cond.notify_all()
+
+            # halted while this job was being taken off the queue
+            if not self._running:
+                return
+
+            started = time.monotonic()
+            try:
+                fn(arg)
+            except Exception:
+                # a failed injection must not kill the worker
+                pass
+            done = time.monotonic()
+
+            with self._cond:
+                s = self._stats
+                s.injected += 1
+                s.queue_latency_total_s += started - enqueued
+                s.queue_latency_max_s = max(s.queue_latency_max_s, started - enqueued)
+                s.inject_total_s += done - started
+                s.inject_max_s = max(s.inject_max_s, done - started)
+                s.last_inject_done_monotonic = done
+            for h in inject_hists:
+                h.record(done - started)
+
+
+@dataclass
+class FireRecord:
+    slot: int
+    name: str
+    planned: float
+    actual: float
+
+
+class _Timer:
+    """Heap payload: one per enabled item (item=None is the tool-use timer)."""
+
+    __slots__ = ("item", "slot", "metrics", "sequence", "handle", "run", "cancelled")
+
+    def __init__(
+        self,
+        item: Optional[MacroItem],
+        slot: int,
+        metrics: ItemMetrics,
+        sequence: Optional[CompiledSequence] = None,
+        handle: Any = None,
+    ) -> None:
+        self.item = item
+        self.slot = slot
+        self.metrics = metrics
+        self.sequence = sequence
+        # resolved key for send_fn (None for sequences and tool use)
+        self.handle = handle
+        # the _SeqRun in flight, if any
+        self.run: Optional[_SeqRun] = None
+        # set_item_enabled(False): dropped from the heap when next popped
+        self.cancelled = False
+
+
+@dataclass(frozen=True)
+class PreparedItems:
+    """An item list with keys resolved and sequences compiled (MacroScheduler.prepare_items)."""
+
+    items: List[MacroItem]
+    handles: List[Any]
+    sequences: List[Optional[CompiledSequence]]
+    keys: List[Tuple[str, int]]
+
+
+class _SeqRun:
+    """Heap payload: one running pass over a timer's sequence (next action at idx)."""
+
+    __slots__ = ("timer", "start", "idx")
+
+    def __init__(self, timer: _Timer, start: float) -> None:
+        self.timer = timer
+        self.start = start
+        self.idx = 0
+
+    def deadline(self) -> float:
+        return self.start + self.timer.sequence.actions[self.idx][0]
+
+
+def _configured_hz(it: MacroItem) -> float:
+    mean_jitter = (it.jitter_min_ms + it.jitter_max_ms) / 2000.0 if it.jitter_max_ms > 0 else 0.0
+    return 1.0 / ((it.interval_ms / 1000.0) + mean_jitter)
 
 
 class MacroScheduler:
-    """Runs MacroItem timers in a background thread (+ optional tool-use click loop)."""
+    """Runs MacroItem timers in a background thread (+ optional tool-use click loop).
+
+    The default "deadline" engine keeps timers in a heap and sleeps until the
+    earliest one is due; tool use gets its own fixed-rate thread, so sub-50 ms
+    click intervals never delay a key item. The "polling" engine is the
+    original fixed 50 ms tick, kept for comparison. Input is never sent while
+    the scheduler lock is held; with a dispatcher it is only enqueued.
+    """
 
     def __init__(
         self,
         items: List[MacroItem],
         send_fn: Callable[[str], None],
-        on_tick: Optional[Callable[[Dict[str, ItemState]], None]] = None,
+        # called from scheduler threads whenever the state store changed
+        # (a fire; tool use at most every TOOL_USE_TICK_S)
+        on_tick: Optional[Callable[[], None]] = None,
         tool_use_enabled: bool = False,
         tool_use_interval_ms: int = 30,
-        tool_use_fn: Optional[Callable[[], None]] = None,
+        tool_use_fn: Optional[Callable[[int], None]] = None,
+        engine: str = ENGINE_DEADLINE,
+        tool_use_clicks: int = 1,
+        dispatcher: Optional[InputDispatcher] = None,
+        # a sleeper that advances clock (simulation.VirtualClock) lets simulate()
+        # run in virtual time; default: wait on the stop event
+        clock: Callable[[], float] = time.monotonic,
+        sleeper: Optional[Callable[[float], None]] = None,
+        rng: Optional[random.Random] = None,
+        # sequence actions; click_fn defaults to tool_use_fn
+        key_down_fn: Optional[Callable[[str], None]] = None,
+        key_up_fn: Optional[Callable[[str], None]] = None,
+        click_fn: Optional[Callable[[int], None]] = None,
+        # keys are resolved once here (a bad key raises ValueError naming the
+        # item) and the send functions get the resolved handles
+        resolve_fn: Optional[Callable[[str], Any]] = None,
+        # key items due in the same pass go out as one batch_fn(handles) call
+        batch_fn: Optional[Callable[[List[Any]], None]] = None,
+        # caps everything sent: deferred keys wait on the sending thread, refused
+        # clicks are dropped (both counted in metrics()); with a minimum spacing
+        # keys aren't batched
+        limiter: Optional[OutputLimiter] = None,
     ) -> None:
+        if engine not in ENGINES:
+            raise ValueError(f"unknown scheduler engine: {engine!r}")
+
         self._items = items
         self._send_fn = send_fn
+        self._key_down_fn = key_down_fn
+        self._key_up_fn = key_up_fn
+        self._click_fn = click_fn if click_fn is not None else tool_use_fn
+        self._resolve_fn = resolve_fn
+        self._batch_fn = batch_fn
+        # per item position; raises ValueError for bad timing, keys or steps before anything runs
+        for it in items:
+            check_item(it)
+        self._handles: List[Any] = [None if it.steps else self._resolve(it, it.key) for it in items]
+        self._sequences: List[Optional[CompiledSequence]] = [self._compile(it) for it in items]
+        # key handles pressed by a sequence and not yet released (scheduler lock)
+        self._held: Dict[Any, int] = {}
+        # keys released directly while the dispatcher worker may still have been
+        # injecting their key down; stop() releases them again once it is joined
+        self._released_early: Set[Any] = set()
         self._on_tick = on_tick
+        self._engine = engine
+        self._dispatcher = dispatcher
+        self._limiter = limiter
+
+        self._clock = clock
+        self._sleeper = sleeper
+        self._rng = rng if rng is not None else random.Random()
 
         self._tool_use_enabled = tool_use_enabled
         self._tool_use_interval_ms = max(10, int(tool_use_interval_ms))
         self._tool_use_fn = tool_use_fn
+        self._tool_use_clicks = max(1, int(tool_use_clicks))
+        self._tool_timer: Optional[_Timer] = None
+        # set_tool_use_enabled(); the slot and thread stay, clicking stops
+        self._tool_active = True
 
         self._lock = threading.Lock()
-        self._states: Dict[str, ItemState] = {i.name: ItemState() for i in items}
 
-        # add tool-use state (for overlay display if desired)
+        # one slot per item position, plus one for tool use (for overlay display)
+        self._names: List[str] = [i.name for i in items]
+        self._tool_slot: Optional[int] = None
         if self._tool_use_enabled:
-            self._states["Tool use"] = ItemState()
+            self._tool_slot = len(self._names)
+            self._names.append(TOOL_USE_NAME)
+        self._store = StateStore(len(self._names))
+
+        # histograms are fixed-size, so these stay on for the whole session
+        self._metrics: List[ItemMetrics] = [ItemMetrics() for _ in self._names]
+
+        self._timers: List[_Timer] = []
+        self._timer_by_slot: Dict[int, _Timer] = {}
+        # (deadline, seq, timer or sequence run); seq breaks ties without comparing payloads
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._seq = 0
+
+        # loop iterations across scheduler threads (benchmarks report wakeups/s)
+        self._wakeups = 0
+        # set by simulate() to collect every fire
+        self._timeline: Optional[List[FireRecord]] = None
+
+        # halt(): checked before every send, without the lock
+        self._halted = False
+        self._halted_at: Optional[float] = None
+        self._last_inject = 0.0
+
+        # pause(): clock time it was paused at; the loops idle until _unpaused is set
+        self._paused_at: Optional[float] = None
+        self._unpaused = threading.Event()
+        self._unpaused.set()
 
         self._stop = threading.Event()
+        # wakes the key loop early when the heap changed from another thread
+        self._wake = threading.Event()
         self._thread: Optional[threading.Thread] = None
+        self._tool_thread: Optional[threading.Thread] = None
 
-    def start(self) -> None:
+    @property
+    def engine(self) -> str:
+        return self._engine
+
+    @property
+    def wakeups(self) -> int:
+        return self._wakeups
+
+    @property
+    def state_store(self) -> StateStore:
+        """Item state by position, tool use in the slot after the last item.
+
+        Readers such as the overlay copy it with read_into() without taking
+        the scheduler lock.
+        """
+        return self._store
+
+    @property
+    def slot_names(self) -> List[str]:
+        """Display name per state slot: item names in order, then "Tool use"."""
+        return list(self._names)
+
+    @property
+    def tool_slot(self) -> Optional[int]:
+        return self._tool_slot
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    @property
+    def paused_at(self) -> Optional[float]:
+        """Clock time pause() was called at, None while not paused."""
+        return self._paused_at
+
+    def start(self, offsets: Optional[List[float]] = None) -> None:
+        """Starts the threads. offsets: first-fire delay in seconds per item
+        position (see planner.plan_offsets); default is each item's interval."""
         self._stop.clear()
-        now = time.monotonic()
-        with self._lock:
-            for it in self._items:
-                st = self._states[it.name]
-                st.uses = 0
-                st.last_fire_monotonic = 0.0
-                st.next_fire_monotonic = now + (it.interval_ms / 1000.0)
-
-            if self._tool_use_enabled and "Tool use" in self._states:
-                st = self._states["Tool use"]
-                st.uses = 0
-                st.last_fire_monotonic = 0.0
-                st.next_fire_monotonic = now + (self._tool_use_interval_ms / 1000.0)
-
-        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._wake.clear()
+        self._halted = False
+        self._halted_at = None
+        self._paused_at = None
+        self._unpaused.set()
+        if self._dispatcher is not None:
+            self._dispatcher.start()
+        if self._limiter is not None:
+            self._limiter.reset()
+
+        self._reset_run(offsets)
+
+        if self._engine == ENGINE_DEADLINE:
+            self._thread = threading.Thread(target=self._run_loop, daemon=True)
+            if self._tool_timer is not None:
+                self._tool_thread = threading.Thread(target=self._run_tool_loop, daemon=True)
+        else:
+            self._thread = threading.Thread(target=self._run_polling_loop, daemon=True)
+
         self._thread.start()
+        if self._tool_thread is not None:
+            self._tool_thread.start()
+
+    def halt(self) -> None:
+        """Emergency stop from any thread: no input is sent after this returns.
+
+        Never blocks, so the hotkey listener can call it: a flag checked before
+        every send stops injection, the dispatcher queue is dropped and held
+        keys are released. stop() still has to join the threads afterwards; it
+        releases those keys once more, in case the dispatcher worker was still
+        injecting a key down when halt() released it.
+        """
+        if self._halted_at is None:
+            self._halted_at = self._clock()
+        self._halted = True
+        self._stop.set()
+        self._wake.set()
+        self._unpaused.set()
+        if self._dispatcher is not None:
+            self._dispatcher.halt()
+        self._release_held()
+
+    def halt_latency(self) -> Optional[float]:
+        """Seconds from halt() to the end of the last injection after it (0.0 if none).
+
+        None if this run wasn't halted. Key releases done by halt() itself
+        don't count.
+        """
+        if self._halted_at is None:
+            return None
+        last = self._last_inject
+        if self._dispatcher is not None:
+            last = max(last, self._dispatcher.stats().last_inject_done_monotonic)
+        return max(0.0, last - self._halted_at)
 
     def stop(self) -> None:
         self._stop.set()
-        if self._thread and self._thread.is_alive():
-            self._thread.join(timeout=1.0)
+        self._wake.set()
+        self._unpaused.set()
+        for t in (self._thread, self._tool_thread):
+            if t and t.is_alive():
+                t.join(timeout=1.0)
+        self._tool_thread = None
+
+        if self._dispatcher is not None:
+            self._dispatcher.stop()
+        self._release_held()
+        with self._lock:
+            again, self._released_early = self._released_early, set()
+        for key in again:
+            try:
+                self._key_up_fn(key)
+            except Exception:
+                pass
+
+    def simulate(self, duration_s: float, offsets: Optional[List[float]] = None) -> List[FireRecord]:
+        """Runs the schedule for duration_s of clock time on the calling thread.
+
+        Needs an injected sleeper that advances the injected clock, and no
+        dispatcher. Key and tool-use timers are interleaved in deadline order
+        instead of running on their own threads. While paused (from a send or
+        the sleeper) it sleeps in POLLING_TICK_S steps. Returns every fire in order.
+        """
+        if self._sleeper is None:
+            raise ValueError("simulate() needs an injected sleeper that advances the clock")
+        if self._dispatcher is not None:
+            raise ValueError("simulate() sends directly; don't pass a dispatcher")
+
+        self._stop.clear()
+        self._halted = False
+        self._halted_at = None
+        self._paused_at = None
+        self._unpaused.set()
+        if self._limiter is not None:
+            self._limiter.reset()
+        self._reset_run(offsets)
+        timeline: List[FireRecord] = []
+        self._timeline = timeline
+        end = self._clock() + duration_s
+        try:
+            if self._engine == ENGINE_POLLING:
+                while self._clock() < end:
+                    self._wakeups += 1
+                    self._step_polling(self._clock())
+                    self._sleeper(POLLING_TICK_S)
+                return timeline
+
+            tool = self._tool_timer
+            while True:
+                if self._paused_at is not None:
+                    # like the threads idling on _unpaused; only the sleeper can resume() here
+                    self._sleeper(POLLING_TICK_S)
+                    if self._clock() >= end:
+                        break
+                    continue
+                next_key = self._heap[0][0] if self._heap else float("inf")
+                next_tool = self._store.next_fire[tool.slot] if tool is not None and self._tool_active else float("inf")
+                deadline = min(next_key, next_tool)
+                if deadline > end:
+                    break
+
+                wait = deadline - self._clock()
+                if wait > 0.0:
+                    self._sleeper(wait)
+                self._wakeups += 1
+
+                if next_tool <= next_key:
+                    self._step_tool(self._clock())
+                else:
+                    self._step_keys(self._clock())
+            return timeline
+        finally:
+            self._timeline = None
+
+    def pause(self) -> bool:
+        """Freezes every countdown; nothing is sent until resume(). Returns False if already paused.
+
+        Pending dispatcher jobs and events the limiter is holding back are
+        dropped, and keys held by sequences are released; a sequence run
+        resumes where it was. The threads keep running, idle on an event.
+        Cheap and callable from any thread, like resume().
+        """
+        with self._lock:
+            if self._paused_at is not None:
+                return False
+            self._paused_at = self._clock()
+            self._unpaused.clear()
+        if self._dispatcher is not None:
+            self._dispatcher.flush()
+        self._release_held()
+        self._wake.set()
+        return True
+
+    def resume(self) -> bool:
+        """Continues after pause() with each item's remaining time. Returns False if not paused.
+
+        Every pending deadline and sequence run is shifted by the paused time;
+        counters are kept.
+        """
+        with self._lock:
+            if self._paused_at is None:
+                return False
+            shift = self._clock() - self._paused_at
+            self._paused_at = None
+
+            s = self._store
+            s.begin_write()
+            for slot in range(s.size):
+                if s.next_fire[slot] > 0.0:
+                    s.next_fire[slot] += shift
+                if s.last_fire[slot] > 0.0:
+                    s.last_fire[slot] += shift
+                # achieved_hz leaves the paused time out
+                s.started[slot] += shift
+            # a uniform shift keeps the heap ordered
+            for _, _, entry in self._heap:
+                if isinstance(entry, _SeqRun):
+                    entry.start += shift
+            self._heap[:] = [(deadline + shift, seq, entry) for deadline, seq, entry in self._heap]
+            s.end_write()
+            self._unpaused.set()
+        self._wake.set()
+        return True
+
+    def toggle_pause(self) -> bool:
+        """pause() or resume(). Returns whether it is paused now."""
+        if not self.resume():
+            self.pause()
+        return self.paused
+
+    def _now(self) -> float:
+        # "now" on the schedule: a paused schedule stands still
+        paused_at = self._paused_at
+        return paused_at if paused_at is not None else self._clock()
+
+    def set_item_enabled(self, slot: int, enabled: bool) -> None:
+        """Enables or disables an item while running; it first fires one interval after enabling.
+
+        A sequence run already in progress still finishes.
+        """
+        if not 0 <= slot < len(self._items):
+            raise ValueError(f"no item in slot {slot}")
+        with self._lock:
+            timer = self._timer_by_slot.get(slot)
+            if enabled == (timer is not None):
+                return
+
+            self._store.begin_write()
+            if timer is not None:
+                timer.cancelled = True
+                del self._timer_by_slot[slot]
+                if timer in self._timers:
+                    self._timers.remove(timer)
+                self._store.next_fire[slot] = 0.0
+            else:
+                it = self._items[slot]
+                timer = self._new_timer(slot)
+                self._timer_by_slot[slot] = timer
+                self._timers.append(timer)
+                self._store.next_fire[slot] = self._now() + it.interval_ms / 1000.0
+                if self._engine != ENGINE_POLLING:
+                    self._push(timer)
+            self._store.end_write()
+        self._wake.set()
+
+    @property
+    def tool_use_enabled(self) -> bool:
+        return self._tool_slot is not None and self._tool_active
+
+    def set_tool_use_enabled(self, enabled: bool) -> None:
+        """Starts or stops clicking while running (profile switch); the next click is one interval away.
+
+        Only for a scheduler created with tool_use_enabled, which owns the tool-use slot.
+        """
+        slot = self._tool_slot
+        if slot is None:
+            raise ValueError("this scheduler was created without tool use")
+        with self._lock:
+            if enabled == self._tool_active:
+                return
+            self._tool_active = enabled
+            self._store.begin_write()
+            self._store.next_fire[slot] = self._now() + self._tool_use_interval_ms / 1000.0 if enabled else 0.0
+            self._store.end_write()
+
+    def set_tool_use_interval_ms(self, interval_ms: int) -> None:
+        """Changes the tool-use delay while running, from the next click on."""
+        with self._lock:
+            self._tool_use_interval_ms = max(10, int(interval_ms))
+            slot = self._tool_slot
+            if slot is not None:
+                self._store.begin_write()
+                self._store.configured_hz[slot] = self._tool_use_clicks * 1000.0 / self._tool_use_interval_ms
+                self._store.end_write()
+
+    def prepare_items(self, items: List[MacroItem]) -> PreparedItems:
+        """Checks, resolves and compiles items for apply_items() ahead of time. Raises ValueError."""
+        for it in items:
+            check_item(it)
+        return PreparedItems(
+            list(items),
+            [None if it.steps else self._resolve(it, it.key) for it in items],
+            [self._compile(it) for it in items],
+            item_keys(items),
+        )
+
+    def apply_items(self, items: "List[MacroItem] | PreparedItems") -> None:
+        """Replaces the item list while running (or stopped), changing only what differs.
+
+        Items are matched by name (the n-th item of a name to the n-th one
+        again). A matched item keeps its counters, metrics and pending
+        deadline; a new interval or jitter applies from the deadline after
+        that one, but never later than one new interval from now. New items
+        first fire one interval after this call; removed items stop, though a
+        sequence run already in progress still finishes. Slots are renumbered
+        to the new order, tool use moving to the end.
+
+        With PreparedItems (profiles switch this way) nothing is compiled
+        here; the swap is a single pass under the scheduler lock.
+
+        Raises ValueError (and changes nothing) for bad keys or steps.
+        """
+        prepared = items if isinstance(items, PreparedItems) else self.prepare_items(items)
+        items, handles, sequences = prepared.items, prepared.handles, prepared.sequences
+        # everything that can fail is worked out before the store is opened for writing
+        rates = [_configured_hz(it) for it in items]
+        firsts = [it.interval_ms / 1000.0 for it in items]
+        longest = [(it.interval_ms + max(0, it.jitter_max_ms)) / 1000.0 for it in items]
+
+        now = self._now()
+        with self._lock:
+            old_slots = dict(zip(item_keys(self._items), range(len(self._items))))
+            srcs = [old_slots.get(key) for key in prepared.keys]
+            s = self._store
+            old = StateView()
+            s.read_into(old)
+            old_items = self._items
+            old_metrics = self._metrics
+            old_by_slot = self._timer_by_slot
+
+            names = [it.name for it in items]
+            tool_slot = None
+            if self._tool_slot is not None:
+                tool_slot = len(names)
+                names.append(TOOL_USE_NAME)
+            metrics = [ItemMetrics() if src is None else old_metrics[src] for src in srcs]
+            if tool_slot is not None:
+                metrics.append(old_metrics[self._tool_slot])
+
+            timers: List[_Timer] = []
+            by_slot: Dict[int, _Timer] = {}
+            s.begin_write()
+            try:
+                s.resize(len(names))
+                self._items, self._handles, self._sequences = items, handles, sequences
+                # _reset_slot() must reset the new slot's metrics, not the old one's
+                self._metrics = metrics
+
+                for slot, (src, it) in enumerate(zip(srcs, items)):
+                    prev = old_by_slot.get(src) if src is not None else None
+                    if src is None:
+                        self._reset_slot(slot, now, firsts[slot])
+                    else:
+                        self._copy_slot(old, src, slot)
+                        if prev is None:
+                            # was disabled: its next_fire is 0.0 or long past, so it
+                            # starts over like set_item_enabled(), keeping its counters
+                            s.next_fire[slot] = now + firsts[slot]
+                        elif it != old_items[src]:
+                            s.next_fire[slot] = min(s.next_fire[slot], now + longest[slot])
+                    s.configured_hz[slot] = rates[slot]
+                    if not it.enabled:
+                        s.next_fire[slot] = 0.0
+
+                    if prev is not None and it == old_items[src] and it.enabled:
+                        # unchanged: keep the timer and its place in the heap
+                        prev.item = it
+                        prev.slot = slot
+                        prev.metrics = metrics[slot]
+                        timer = prev
+                    else:
+                        timer = None
+                        if it.enabled:
+                            timer = _Timer(it, slot, metrics[slot], sequences[slot], handles[slot])
+                            if self._engine != ENGINE_POLLING:
+                                self._push(timer)
+                    if timer is not None:
+                        timers.append(timer)
+                        by_slot[slot] = timer
+
+                kept = set(map(id, timers))
+                for prev in old_by_slot.values():
+                    if id(prev) not in kept:
+                        prev.cancelled = True
+
+                if tool_slot is not None:
+                    self._copy_slot(old, self._tool_slot, tool_slot)
+                    if self._tool_timer is not None:
+                        self._tool_timer.slot = tool_slot
+                        self._tool_timer.metrics = metrics[tool_slot]
+                        if self._engine == ENGINE_POLLING:
+                            timers.append(self._tool_timer)
+
+                self._names = names
+                self._tool_slot = tool_slot
+                self._timers = timers
+                self._timer_by_slot = by_slot
+            finally:
+                # never leave the version odd: readers would spin on it
+                s.end_write()
+        self._wake.set()
+
+    def metrics(self) -> List[Dict[str, Dict[str, float]]]:
+        """Timing percentiles in ms per slot: [{"late"|"inject"|"interval": {...}}].
+
+        Read without the lock; a summary may be off by the fires recorded
+        while it was being computed.
+        """
+        return [m.summary_ms() for m in self._metrics]
+
+    def dispatch_stats(self) -> Optional[DispatchStats]:
+        return self._dispatcher.stats() if self._dispatcher is not None else None
+
+    def limiter_stats(self) -> Optional[LimiterStats]:
+        return self._limiter.stats() if self._limiter is not None else None
+
+    def snapshot(self) -> List[ItemState]:
+        """Per-slot ItemState copies. Allocates; hot readers should use state_store."""
+        view = StateView()
+        self._store.read_into(view)
+        now = self._clock()
+        return [
+            ItemState(
+                view.uses[i], view.next_fire[i], view.last_fire[i],
+                view.started[i], view.configured_hz[i], view.achieved_hz(i, now), view.missed[i],
+            )
+            for i in range(view.size)
+        ]
+
+    def _compile(self, it: MacroItem) -> Optional[CompiledSequence]:
+        if not it.steps:
+            return None
+        try:
+            seq = compile_steps(it.steps)
+        except ValueError as e:
+            raise ValueError(f"{it.name}: {e}") from None
+
+        needs = {action for _, action, _ in seq.actions}
+        if needs & {ACTION_DOWN, ACTION_UP} and (self._key_down_fn is None or self._key_up_fn is None):
+            raise ValueError(f"{it.name}: holding keys needs key_down_fn and key_up_fn")
+        if ACTION_CLICK in needs and self._click_fn is None:
+            raise ValueError(f"{it.name}: clicks need click_fn")
+        if self._resolve_fn is None:
+            return seq
+        return CompiledSequence(
+            tuple((t, a, arg if a == ACTION_CLICK else self._resolve(it, arg)) for t, a, arg in seq.actions),
+            seq.duration_s,
+        )
+
+    def _resolve(self, it: MacroItem, key: str) -> Any:
+        if self._resolve_fn is None:
+            return key
+        try:
+            return self._resolve_fn(key)
+        except ValueError as e:
+            raise ValueError(f"{it.name}: {e}") from None
+
+    def _reset_run(self, offsets: Optional[List[float]] = None) -> None:
+        if offsets is not None and len(offsets) != len(self._items):
+            raise ValueError(f"expected {len(self._items)} offsets, got {len(offsets)}")
+        self._wakeups = 0
+        now = self._clock()
+        with self._lock:
+            self._store.begin_write()
+            try:
+                self._heap.clear()
+                self._timers.clear()
+                self._timer_by_slot.clear()
+                self._tool_timer = None
+                for slot, it in enumerate(self._items):
+                    self._reset_slot(slot, now, offsets[slot] if offsets is not None else it.interval_ms / 1000.0)
+                    self._store.configured_hz[slot] = _configured_hz(it)
+                    if it.enabled:
+                        timer = self._new_timer(slot)
+                        self._timers.append(timer)
+                        self._timer_by_slot[slot] = timer
+                    else:
+                        # as set_item_enabled(False) leaves it
+                        self._store.next_fire[slot] = 0.0
+
+                slot = self._tool_slot
+                if slot is not None:
+                    self._reset_slot(slot, now, self._tool_use_interval_ms / 1000.0)
+                    if not self._tool_active:
+                        self._store.next_fire[slot] = 0.0
+                    # uses counts clicks, so achieved_hz reads as clicks/s
+                    self._store.configured_hz[slot] = self._tool_use_clicks * 1000.0 / self._tool_use_interval_ms
+                    if self._tool_use_fn:
+                        self._tool_timer = _Timer(None, slot, self._metrics[slot])
+                        if self._engine == ENGINE_POLLING:
+                            self._timers.append(self._tool_timer)
+
+                # the polling engine scans _timers itself; its heap only holds sequence runs
+                if self._engine != ENGINE_POLLING:
+                    for timer in self._timers:
+                        self._push(timer)
+            finally:
+                self._store.end_write()
+
+    def _copy_slot(self, src_view: StateView, src: int, dst: int) -> None:
+        s = self._store
+        s.uses[dst] = src_view.uses[src]
+        s.missed[dst] = src_view.missed[src]
+        s.next_fire[dst] = src_view.next_fire[src]
+        s.last_fire[dst] = src_view.last_fire[src]
+        s.started[dst] = src_view.started[src]
+        s.configured_hz[dst] = src_view.configured_hz[src]
+
+    def _new_timer(self, slot: int) -> _Timer:
+        return _Timer(self._items[slot], slot, self._metrics[slot], self._sequences[slot], self._handles[slot])
+
+    def _reset_slot(self, slot: int, now: float, first_delay: float) -> None:
+        s = self._store
+        s.uses[slot] = 0
+        s.missed[slot] = 0
+        s.last_fire[slot] = 0.0
+        s.started[slot] = now
+        s.next_fire[slot] = now + first_delay
+        self._metrics[slot].reset()
+
+    def _push(self, timer: _Timer) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (self._store.next_fire[timer.slot], self._seq, timer))
+
+    def _push_run(self, run: _SeqRun) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (run.deadline(), self._seq, run))
 
-    def snapshot(self) -> Dict[str, ItemState]:
+    def _wait(self, timeout: Optional[float]) -> None:
+        if self._sleeper is None or timeout is None:
+            self._stop.wait(timeout)
+        else:
+            self._sleeper(timeout)
+
+    def _item_delay(self, it: MacroItem) -> float:
+        jitter = 0.0
+        if it.jitter_max_ms > 0 and it.jitter_max_ms >= it.jitter_min_ms:
+            jitter_ms = self._rng.randint(it.jitter_min_ms, it.jitter_max_ms)
+            jitter = jitter_ms / 1000.0
+        return (it.interval_ms / 1000.0) + jitter
+
+    def _emit(self, timer: _Timer) -> bool:
+        if timer.item is None:
+            return self._send(
+                self._tool_use_fn, self._tool_use_clicks, (timer.metrics,), PRIORITY_CLICK, self._tool_use_clicks
+            )
+        return self._send(self._send_fn, timer.handle, (timer.metrics,))
+
+    def _emit_due(self, due: List[_Timer]) -> None:
+        """Sends due timers in order; simultaneous key items go as one batch."""
+        batch = self._batch_fn is not None and len(due) > 1
+        if batch and self._limiter is not None and self._limiter.min_spacing_s > 0.0:
+            batch = False
+        if not batch:
+            for timer in due:
+                self._emit(timer)
+            return
+
+        keys = [t for t in due if t.item is not None]
+        if len(keys) > 1:
+            self._send(
+                self._batch_fn,
+                [t.handle for t in keys],
+                tuple(t.metrics for t in keys),
+                cost=len(keys),
+            )
+        elif keys:
+            self._emit(keys[0])
+        for timer in due:
+            if timer.item is None:
+                self._emit(timer)
+
+    def _send(
+        self,
+        fn: Callable[[Any], None],
+        arg: Any,
+        metrics: Tuple[ItemMetrics, ...],
+        priority: int = PRIORITY_KEY,
+        cost: int = 1,
+    ) -> bool:
+        """Sends one event (or batch) through the limiter. Returns False if it wasn't sent."""
+        if self._halted or self._paused_at is not None:
+            return False
+        if self._limiter is not None:
+            delay = self._limiter.acquire(self._clock(), priority, cost)
+            if delay < 0.0:
+                for m in metrics:
+                    m.dropped += 1
+                return False
+            if delay > 0.0:
+                for m in metrics:
+                    m.defer.record(delay)
+                self._wait(delay)
+                # pause() or halt() may have come in while the limiter held it back
+                if self._stop.is_set() or self._halted or self._paused_at is not None:
+                    return False
+
+        if self._dispatcher is not None:
+            self._dispatcher.submit(fn, arg, tuple(m.inject for m in metrics))
+        else:
+            started = self._clock()
+            fn(arg)
+            self._last_inject = done = self._clock()
+            for m in metrics:
+                m.inject.record(done - started)
+        return True
+
+    def _emit_action(self, action: str, arg: Any, metrics: ItemMetrics) -> None:
+        ms = (metrics,)
+        if action == ACTION_PRESS:
+            self._send(self._send_fn, arg, ms)
+        elif action == ACTION_DOWN:
+            if self._send(self._key_down_fn, arg, ms):
+                with self._lock:
+                    self._held[arg] = self._held.get(arg, 0) + 1
+                    late = self._halted or self._paused_at is not None
+                if late:
+                    # pause()/halt() ran between the check in _send and here and
+                    # couldn't see this key yet
+                    self._release_held()
+        elif action == ACTION_UP:
+            if self._send(self._key_up_fn, arg, ms):
+                with self._lock:
+                    n = self._held.get(arg, 0) - 1
+                    if n > 0:
+                        self._held[arg] = n
+                    else:
+                        self._held.pop(arg, None)
+        elif action == ACTION_CLICK:
+            self._send(self._click_fn, arg, ms, cost=max(1, int(arg)))
+
+    def _release_held(self) -> None:
         with self._lock:
-            return {
-                k: ItemState(v.uses, v.next_fire_monotonic, v.last_fire_monotonic)
-                for k, v in self._states.items()
-            }
+            held, self._held = self._held, {}
+        # while the dispatcher runs (pause), the releases queue behind a key
+        # down it may still be injecting; after halt()/stop() they go directly
+        queue = self._dispatcher is not None and not self._stop.is_set()
+        if held and not queue and self._dispatcher is not None and not self._dispatcher.joined:
+            # halt() doesn't wait for the worker's current injection
+            with self._lock:
+                self._released_early.update(held)
+        for key in held:
+            if queue:
+                self._dispatcher.submit(self._key_up_fn, key)
+                continue
+            try:
+                self._key_up_fn(key)
+            except Exception:
+                pass
+
+    def _record_fire(self, timer: _Timer, planned: float, now: float) -> None:
+        last = self._store.last_fire[timer.slot]
+        timer.metrics.late.record(now - planned)
+        if last > 0.0:
+            timer.metrics.interval.record(now - last)
+        if self._timeline is not None:
+            self._timeline.append(FireRecord(timer.slot, self._names[timer.slot], planned, now))
+
+    def _fire(self, timer: _Timer, now: float) -> bool:
+        """Advances timer state for a due fire (lock held, inside a store write).
+
+        Returns whether to send.
+        """
+        s = self._store
+        i = timer.slot
+        it = timer.item
+        if timer.run is not None:
+            # previous sequence run still going: this fire is missed, not queued
+            s.missed[i] += 1
+            if it.fixed_rate:
+                period = it.interval_ms / 1000.0
+                planned = s.next_fire[i]
+                s.next_fire[i] = planned + max(0, int((now - planned) // period)) * period + self._item_delay(it)
+            else:
+                s.next_fire[i] = now + self._item_delay(it)
+            return False
+
+        if it is None:
+            self._record_fire(timer, s.next_fire[i], now)
+            s.uses[i] += self._tool_use_clicks
+            s.last_fire[i] = now
+            s.next_fire[i] = now + (self._tool_use_interval_ms / 1000.0)
+            return True
+
+        if not it.fixed_rate:
+            self._record_fire(timer, s.next_fire[i], now)
+            s.uses[i] += 1
+            s.last_fire[i] = now
+            s.next_fire[i] = now + self._item_delay(it)
+            return True
+
+        # Fixed rate: the next deadline is anchored to the previous *planned*
+        # time, so tick lateness and send cost don't accumulate as drift.
+        planned = s.next_fire[i]
+        period = it.interval_ms / 1000.0
+        missed = int((now - planned) // period) if now > planned else 0
+
+        if missed and it.missed_policy == MISSED_BURST:
+            dropped = max(0, missed - MAX_BURST_CATCHUP)
+            s.missed[i] += dropped
+            planned += dropped * period
+            missed = 0
+
+        fire = not (missed and it.missed_policy == MISSED_SKIP)
+        if fire:
+            self._record_fire(timer, planned, now)
+            s.uses[i] += 1
+            s.last_fire[i] = now
+
+        # skip / coalesce: rejoin the grid at the first slot after now
+        s.missed[i] += missed if fire else missed + 1
+        s.next_fire[i] = planned + missed * period + self._item_delay(it)
+        return fire
+
+    def _start_run(self, timer: _Timer, now: float) -> None:
+        """Starts a run of the item's compiled steps (lock held).
+
+        Every action of the run is its own heap entry, so holds and waits
+        never block the thread and runs of different items interleave. A fire
+        that comes due while the previous run is still going counts as missed.
+        """
+        timer.run = _SeqRun(timer, now)
+        self._push_run(timer.run)
+
+    def _advance_run(self, run: _SeqRun, actions: List[Tuple[str, Any, ItemMetrics]]) -> None:
+        """Collects the run's next action and requeues the run (lock held)."""
+        timer = run.timer
+        _, action, arg = timer.sequence.actions[run.idx]
+        actions.append((action, arg, timer.metrics))
+        run.idx += 1
+        if run.idx < len(timer.sequence.actions):
+            self._push_run(run)
+        else:
+            timer.run = None
+
+    def _step_keys(self, now: float) -> Tuple[bool, Optional[float]]:
+        """Fires every due key timer and sequence action. Returns (fired, next deadline or None)."""
+        due = []
+        actions: List[Tuple[str, Any, ItemMetrics]] = []
+        with self._lock:
+            heap = self._heap
+            if heap and heap[0][0] <= now and self._paused_at is None:
+                self._store.begin_write()
+                while heap and heap[0][0] <= now:
+                    _, _, entry = heapq.heappop(heap)
+                    if isinstance(entry, _SeqRun):
+                        self._advance_run(entry, actions)
+                        continue
+                    if entry.cancelled:
+                        continue
+                    if self._fire(entry, now):
+                        if entry.sequence is not None:
+                            # first action is at offset 0, so it usually runs in this pass
+                            self._start_run(entry, now)
+                        else:
+                            due.append(entry)
+                    self._push(entry)
+                self._store.end_write()
+
+            next_deadline = heap[0][0] if heap else None
+
+        self._emit_due(due)
+        for action, arg, metrics in actions:
+            self._emit_action(action, arg, metrics)
+        return bool(due or actions), next_deadline
+
+    def _step_tool(self, now: float) -> None:
+        timer = self._tool_timer
+        s = self._store
+        with self._lock:
+            if self._paused_at is not None or not self._tool_active:
+                return
+            deadline = s.next_fire[timer.slot]
+        period = self._tool_use_interval_ms / 1000.0
+
+        self._record_fire(timer, deadline, now)
+        sent = self._emit(timer)
+
+        # fixed rate; after a stall, coalesce and rejoin the grid
+        missed = int((self._clock() - deadline) // period)
+        with self._lock:
+            i = timer.slot
+            s.begin_write()
+            if sent:
+                s.uses[i] += self._tool_use_clicks
+            s.missed[i] += missed
+            s.last_fire[i] = now
+            # set_tool_use_enabled() (or resume()) may have rescheduled the
+            # slot while this click was out; don't write the old grid back
+            if self._tool_active and s.next_fire[i] == deadline:
+                s.next_fire[i] = deadline + (missed + 1) * period
+            s.end_write()
+
+    def _step_polling(self, now: float) -> bool:
+        with self._lock:
+            if self._paused_at is not None:
+                return False
+            # macro keys first, then the tool-use click
+            due = []
+            actions: List[Tuple[str, Any, ItemMetrics]] = []
+            next_fire = self._store.next_fire
+            self._store.begin_write()
+            for timer in self._timers:
+                if timer.item is None and not self._tool_active:
+                    continue
+                if now >= next_fire[timer.slot] and self._fire(timer, now):
+                    if timer.sequence is not None:
+                        self._start_run(timer, now)
+                    else:
+                        due.append(timer)
+
+            # sequence actions run at tick resolution here
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                self._advance_run(heapq.heappop(heap)[2], actions)
+            self._store.end_write()
+
+        self._emit_due(due)
+        for action, arg, metrics in actions:
+            self._emit_action(action, arg, metrics)
+        return bool(due or actions)
 
     def _run_loop(self) -> None:
-        tick_sleep = 0.05
+        if self._on_tick is not None:
+            self._on_tick()
+
         while not self._stop.is_set():
-            now = time.monotonic()
+            if not self._unpaused.is_set():
+                self._unpaused.wait()
+                continue
+            self._wakeups += 1
+            fired, next_deadline = self._step_keys(self._clock())
+
+            if fired and self._on_tick is not None:
+                self._on_tick()
+
+            timeout = None if next_deadline is None else max(0.0, next_deadline - self._clock())
+            if self._sleeper is not None and timeout is not None:
+                self._sleeper(timeout)
+            else:
+                self._wake.wait(timeout)
+                self._wake.clear()
 
+    def _run_tool_loop(self) -> None:
+        store = self._store
+        timer = self._tool_timer
+        # the key loop only ticks when a key fires, so the click loop reports
+        # its own progress, at most every TOOL_USE_TICK_S
+        last_tick = 0.0
+
+        while not self._stop.is_set():
+            if not self._unpaused.is_set():
+                self._unpaused.wait()
+                continue
+            if not self._tool_active:
+                self._stop.wait(TOOL_USE_TICK_S)
+                continue
+            self._wakeups += 1
             with self._lock:
-                # Macro keys
-                for it in self._items:
-                    if not it.enabled:
-                        continue
+                # apply_items() may move the slot and resize the store
+                deadline = store.next_fire[timer.slot]
+            remaining = deadline - self._clock()
+            if self._sleeper is not None and remaining > 0.0:
+                self._sleeper(remaining)
+                continue
+            if remaining > TOOL_USE_SPIN_S:
+                self._stop.wait(remaining - TOOL_USE_SPIN_S)
+                continue
+            while self._clock() < deadline:
+                time.sleep(0)
+            if self._stop.is_set():
+                break
+
+            self._step_tool(self._clock())
+
+            now = self._clock()
+            if self._on_tick is not None and now - last_tick >= TOOL_USE_TICK_S:
+                last_tick = now
+                self._on_tick()
+
+    def _run_polling_loop(self) -> None:
+        while not self._stop.is_set():
+            if not self._unpaused.is_set():
+                self._unpaused.wait()
+                continue
+            self._wakeups += 1
+            fired = self._step_polling(self._clock())
+
+            if fired and self._on_tick is not None:
+                self._on_tick()
 
-                    st = self._states[it.name]
-                    if now >= st.next_fire_monotonic:
-                        self._send_fn(it.key)
-                        st.uses += 1
-                        st.last_fire_monotonic = now
+            if self._sleeper is not None:
+                self._sleeper(POLLING_TICK_S)
+            else:
+                time.sleep(POLLING_TICK_S)
 
-                        jitter = 0.0
-                        if it.jitter_max_ms > 0 and it.jitter_max_ms >= it.jitter_min_ms:
-                            jitter_ms = random.randint(it.jitter_min_ms, it.jitter_max_ms)
-                            jitter = jitter_ms / 1000.0
 
-                        st.next_fire_monotonic = now + (it.interval_ms / 1000.0) + jitter
+def scheduler_from_config(
+    cfg: Dict[str, Any],
+    items: List[MacroItem],
+    backend: Any,
+    on_tick: Optional[Callable[[], None]] = None,
+    tool_use_enabled: bool = False,
+    tool_use_interval_ms: int = 30,
+) -> MacroScheduler:
+    """A MacroScheduler wired to an input backend (input_backends.InputBackend)
+    with the engine, dispatch and limiter settings from favwhite.cfg.
 
-                # Tool use click
-                if self._tool_use_enabled and self._tool_use_fn and "Tool use" in self._states:
-                    st = self._states["Tool use"]
-                    if now >= st.next_fire_monotonic:
-                        self._tool_use_fn()
-                        st.uses += 1
-                        st.last_fire_monotonic = now
-                        st.next_fire_monotonic = now + (self._tool_use_interval_ms / 1000.0)
+    Raises ValueError for bad settings, keys or steps.
+    """
+    dispatch_cfg = cfg.get("dispatch", {})
+    dispatcher = None
+    if dispatch_cfg.get("enabled", True):
+        dispatcher = InputDispatcher(
+            maxsize=int(dispatch_cfg.get("queue_size", 64)),
+            overflow=str(dispatch_cfg.get("overflow", OVERFLOW_DROP_OLDEST)),
+        )
 
-            if self._on_tick is not None:
-                self._on_tick(self.snapshot())
+    limiter_cfg = cfg.get("limiter", {})
+    limiter = None
+    if limiter_cfg.get("enabled", False):
+        limiter = OutputLimiter(
+            rate_hz=float(limiter_cfg.get("rate_hz", 50)),
+            burst=int(limiter_cfg.get("burst", 10)),
+            min_spacing_ms=float(limiter_cfg.get("min_spacing_ms", 0)),
+        )
 
-            time.sleep(tick_sleep)
+    return MacroScheduler(
+        items=items,
+        send_fn=backend.press,
+        on_tick=on_tick,
+        tool_use_enabled=tool_use_enabled,
+        tool_use_interval_ms=tool_use_interval_ms,
+        tool_use_fn=backend.click,
+        engine=str(cfg.get("scheduler", {}).get("engine", ENGINE_DEADLINE)),
+        tool_use_clicks=int(cfg.get("tool_use", {}).get("clicks_per_injection", 1)),
+        dispatcher=dispatcher,
+        key_down_fn=backend.key_down,
+        key_up_fn=backend.key_up,
+        click_fn=backend.click,
+        resolve_fn=backend.resolve_key,
+        batch_fn=backend.press_many,
+        limiter=limiter,
+    )
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+
+# Flat timeline actions
+ACTION_PRESS = "press"   # tap: press + release
+ACTION_DOWN = "down"
+ACTION_UP = "up"
+ACTION_CLICK = "click"
+
+# Step ops accepted in favwhite.cfg ("steps": [{"op": ..., ...}, ...])
+#   press   {"key"}          tap a key
+#   down    {"key"}          press and keep holding
+#   release {"key"}          release a key held by "down"
+#   hold    {"key", "ms"}    press, hold for ms, release (the sequence waits)
+#   click   {"count"=1}      left click
+#   wait    {"ms"}           pause before the next step
+STEP_OPS = ("press", "down", "release", "hold", "click", "wait")
+
+
+@dataclass(frozen=True)
+class CompiledSequence:
+    """Steps flattened into (offset_s, action, arg) sorted by offset.
+
+    arg is the key for press/down/up and the click count for click.
+    """
+
+    actions: Tuple[Tuple[float, str, Any], ...]
+    duration_s: float
+
+    def keys(self) -> List[str]:
+        return sorted({arg for _, action, arg in self.actions if action != ACTION_CLICK})
+
+
+def _ms(step: Dict[str, Any], idx: int) -> float:
+    try:
+        ms = float(step.get("ms", 0))
+    except (TypeError, ValueError):
+        raise ValueError(f"step {idx + 1}: 'ms' must be a number")
+    if ms < 0:
+        raise ValueError(f"step {idx + 1}: 'ms' must not be negative")
+    return ms / 1000.0
+
+
+def _key(step: Dict[str, Any], idx: int) -> str:
+    key = str(step.get("key", "")).strip()
+    if not key:
+        raise ValueError(f"step {idx + 1}: '{step.get('op')}' needs a key")
+    return key
+
+
+def compile_steps(steps: List[Dict[str, Any]]) -> CompiledSequence:
+    """Compiles config steps into a CompiledSequence. Raises ValueError on bad steps.
+
+    Holds and waits become offsets, not sleeps, so the scheduler can run many
+    sequences interleaved on one thread. Keys still held at the end are
+    released there.
+    """
+    t = 0.0
+    actions: List[Tuple[float, str, Any]] = []
+    held: Dict[str, int] = {}
+
+    for idx, step in enumerate(steps):
+        if not isinstance(step, dict):
+            raise ValueError(f"step {idx + 1}: expected an object")
+        op = str(step.get("op", "")).strip().lower()
+
+        if op == "press":
+            actions.append((t, ACTION_PRESS, _key(step, idx)))
+        elif op == "down":
+            key = _key(step, idx)
+            if key in held:
+                raise ValueError(f"step {idx + 1}: '{key}' is already held")
+            held[key] = idx
+            actions.append((t, ACTION_DOWN, key))
+        elif op == "release":
+            key = _key(step, idx)
+            if held.pop(key, None) is None:
+                raise ValueError(f"step {idx + 1}: '{key}' is not held")
+            actions.append((t, ACTION_UP, key))
+        elif op == "hold":
+            key = _key(step, idx)
+            if key in held:
+                raise ValueError(f"step {idx + 1}: '{key}' is already held")
+            actions.append((t, ACTION_DOWN, key))
+            t += _ms(step, idx)
+            actions.append((t, ACTION_UP, key))
+        elif op == "click":
+            try:
+                count = max(1, int(step.get("count", 1)))
+            except (TypeError, ValueError):
+                raise ValueError(f"step {idx + 1}: 'count' must be an integer")
+            actions.append((t, ACTION_CLICK, count))
+        elif op == "wait":
+            t += _ms(step, idx)
+        else:
+            raise ValueError(f"step {idx + 1}: unknown op {op!r} (expected one of {', '.join(STEP_OPS)})")
+
+    for key in held:
+        actions.append((t, ACTION_UP, key))
+
+    if not actions:
+        raise ValueError("sequence has no actions")
+
+    return CompiledSequence(tuple(actions), t)
@@ -0,0 +1,204 @@
+"""Deterministic virtual-time runs of MacroScheduler.
+
+Runs a full schedule as fast as the CPU allows and produces the exact fire
+timeline (item, planned time, actual time) for a seed, so configs can be
+checked offline and engine changes compared bit-for-bit:
+
+    python simulation.py --hours 8 --seed 1 --out timeline.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from limiter import OutputLimiter
+from models import MacroItem
+from planner import plan_offsets
+from scheduler import ENGINE_DEADLINE, ENGINES, FireRecord, MacroScheduler
+from storage import DEFAULT_CONFIG, load_items, resolve_cfg_path
+
+
+class VirtualClock:
+    """Clock + sleeper pair for MacroScheduler(clock=..., sleeper=...).
+
+    sleep() advances time by the requested amount plus a wake latency drawn
+    uniformly from wake_latency_ms, modelling OS timer slack. advance() moves
+    time without latency, e.g. from a sink modelling injection cost.
+    """
+
+    def __init__(
+        self,
+        start: float = 1000.0,
+        wake_latency_ms: Tuple[float, float] = (0.0, 0.0),
+        seed: int = 0,
+    ) -> None:
+        self._now = float(start)
+        self._lat_lo = max(0.0, wake_latency_ms[0]) / 1000.0
+        self._lat_hi = max(self._lat_lo, wake_latency_ms[1] / 1000.0)
+        self._rng = random.Random(seed)
+
+    def now(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        latency = self._rng.uniform(self._lat_lo, self._lat_hi) if self._lat_hi > 0.0 else 0.0
+        self._now += max(0.0, seconds) + latency
+
+    def advance(self, seconds: float) -> None:
+        self._now += max(0.0, seconds)
+
+
+def make_scheduler(
+    items: List[MacroItem],
+    seed: int = 0,
+    engine: str = ENGINE_DEADLINE,
+    tool_use_interval_ms: int = 0,
+    tool_use_clicks: int = 1,
+    wake_latency_ms: Tuple[float, float] = (0.0, 0.0),
+    inject_ms: float = 0.0,
+    limiter: Optional[OutputLimiter] = None,
+) -> Tuple[MacroScheduler, VirtualClock]:
+    """A MacroScheduler on a VirtualClock whose sends cost inject_ms of virtual time."""
+    clock = VirtualClock(wake_latency_ms=wake_latency_ms, seed=seed + 1)
+    inject_s = max(0.0, inject_ms) / 1000.0
+
+    def send(_key: str) -> None:
+        clock.advance(inject_s)
+
+    def click(_count: int) -> None:
+        clock.advance(inject_s)
+
+    sched = MacroScheduler(
+        items=items,
+        send_fn=send,
+        tool_use_enabled=tool_use_interval_ms > 0,
+        tool_use_interval_ms=tool_use_interval_ms or 30,
+        tool_use_fn=click,
+        engine=engine,
+        tool_use_clicks=tool_use_clicks,
+        clock=clock.now,
+        sleeper=clock.sleep,
+        rng=random.Random(seed),
+        limiter=limiter,
+    )
+    return sched, clock
+
+
+def simulate(
+    items: List[MacroItem],
+    duration_s: float,
+    seed: int = 0,
+    offsets: Optional[List[float]] = None,
+    **kwargs: Any,
+) -> List[FireRecord]:
+    """Fire timeline of `items` over duration_s virtual seconds.
+
+    The same arguments always give the same timeline: jitter and wake latency
+    come from RNGs seeded with `seed`. offsets go to MacroScheduler.simulate()
+    (see planner.plan_offsets), kwargs to make_scheduler().
+    """
+    sched, _ = make_scheduler(items, seed=seed, **kwargs)
+    return sched.simulate(duration_s, offsets)
+
+
+def summarize(timeline: List[FireRecord]) -> Dict[str, Dict[str, Any]]:
+    """Per-slot fire count and lateness, keyed "<slot>:<name>"."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for rec in timeline:
+        s = out.setdefault(f"{rec.slot}:{rec.name}", {"fires": 0, "late_max_ms": 0.0, "late_total_ms": 0.0})
+        late_ms = (rec.actual - rec.planned) * 1000.0
+        s["fires"] += 1
+        s["late_total_ms"] += late_ms
+        s["late_max_ms"] = max(s["late_max_ms"], late_ms)
+    for s in out.values():
+        s["late_mean_ms"] = s.pop("late_total_ms") / s["fires"]
+    return out
+
+
+def _load_cfg(path: Optional[str]) -> Dict[str, Any]:
+    # read-only: load_config() would (re)write favwhite.cfg
+    p = Path(path) if path else resolve_cfg_path()
+    if p.exists():
+        with p.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    if path:
+        raise FileNotFoundError(path)
+    return dict(DEFAULT_CONFIG)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--config", help="favwhite.cfg to simulate (default: the app's config)")
+    ap.add_argument("--hours", type=float, default=1.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--engine", choices=ENGINES, default=ENGINE_DEADLINE)
+    ap.add_argument("--wake-latency-ms", type=float, nargs=2, default=(0.0, 0.0), metavar=("MIN", "MAX"))
+    ap.add_argument("--inject-ms", type=float, default=0.0, help="virtual cost of each injection")
+    ap.add_argument("--no-tool-use", action="store_true", help="ignore tool_use even if enabled in the config")
+    ap.add_argument("--plan", action="store_true", help="stagger first fires with the phase planner")
+    ap.add_argument("--limit", action="store_true", help="apply the config's output limiter even if disabled")
+    ap.add_argument("--format", choices=("csv", "summary"), default="summary")
+    ap.add_argument("--out", help="write here instead of stdout")
+    args = ap.parse_args(argv)
+
+    cfg = _load_cfg(args.config)
+    tool = cfg.get("tool_use", {})
+    tool_ms = int(tool.get("interval_ms", 30)) if tool.get("enabled") and not args.no_tool_use else 0
+
+    items = load_items(cfg)
+    offsets = None
+    if args.plan:
+        planner_cfg = cfg.get("planner", {})
+        offsets = plan_offsets(
+            items,
+            float(planner_cfg.get("min_spacing_ms", 100)),
+            int(planner_cfg.get("resolution_ms", 10)),
+            # the time budget would make the plan depend on how fast this machine is
+            budget_ms=None,
+        ).offsets_s
+
+    limiter = None
+    limiter_cfg = cfg.get("limiter", {})
+    if args.limit or limiter_cfg.get("enabled", False):
+        limiter = OutputLimiter(
+            rate_hz=float(limiter_cfg.get("rate_hz", 50)),
+            burst=int(limiter_cfg.get("burst", 10)),
+            min_spacing_ms=float(limiter_cfg.get("min_spacing_ms", 0)),
+        )
+
+    timeline = simulate(
+        items,
+        args.hours * 3600.0,
+        seed=args.seed,
+        offsets=offsets,
+        engine=args.engine,
+        tool_use_interval_ms=tool_ms,
+        tool_use_clicks=int(tool.get("clicks_per_injection", 1)),
+        wake_latency_ms=tuple(args.wake_latency_ms),
+        inject_ms=args.inject_ms,
+        limiter=limiter,
+    )
+
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+    try:
+        if args.format == "csv":
+            w = csv.writer(out)
+            w.writerow(["slot", "item", "planned", "actual"])
+            for rec in timeline:
+                w.writerow([rec.slot, rec.name, repr(rec.planned), repr(rec.actual)])
+        else:
+            json.dump(summarize(timeline), out, indent=2)
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Startup-time profile of the app entry point, checked against a budget.
+
+Starts a fresh interpreter (`python -X importtime`) that imports app,
+creates the QApplication and shows MainWindow, the same path main() takes up
+to the first window. Reports the time to first window (process spawn to
+shown), the time to import app, the slowest imports and whether any module
+that should be deferred was loaded before the window appeared:
+
+    python startup_profile.py --runs 5 --out startup.json
+
+Exits with 1 when a median is over startup_budget.json or a deferred module
+was imported early. --write-budget stores the measured medians plus
+headroom as the new budget (keeping the deferred list). The window is
+created for real (favwhite.cfg is loaded as usual); use
+QT_QPA_PLATFORM=offscreen on a machine without a display.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+
+BUDGET_PATH = Path(__file__).resolve().parent / "startup_budget.json"
+# --write-budget: allowed time = measured median * this
+HEADROOM = 1.5
+TOP_IMPORTS = 15
+
+
+def _child() -> int:
+    t0 = time.perf_counter()
+    import app
+
+    t1 = time.perf_counter()
+    from PySide6.QtWidgets import QApplication
+
+    qa = QApplication(sys.argv[:1])
+    w = app.MainWindow()
+    w.show()
+    qa.processEvents()
+    t2 = time.perf_counter()
+
+    print(json.dumps({
+        "import_app_ms": (t1 - t0) * 1000.0,
+        "window_ms": (t2 - t1) * 1000.0,
+        "modules": sorted(sys.modules),
+    }), flush=True)
+    w.close()
+    return 0
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, float, float]]:
+    """(module, self ms, cumulative ms) from -X importtime output."""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        out.append((parts[2].strip(), int(parts[0]) / 1000.0, int(parts[1]) / 1000.0))
+    return out
+
+
+def run_once() -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", str(Path(__file__).resolve()), "--child"],
+        cwd=str(Path(__file__).resolve().parent),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    line = proc.stdout.readline()
+    first_window_ms = (time.perf_counter() - t0) * 1000.0
+    rest, stderr = proc.communicate(timeout=60)
+    if proc.returncode != 0 or not line:
+        raise RuntimeError(f"startup child failed ({proc.returncode}):\n{stderr[-2000:]}{rest}")
+
+    child = json.loads(line)
+    child["first_window_ms"] = first_window_ms
+    child["imports"] = _parse_importtime(stderr)
+    return child
+
+
+def check_budget(report: Dict[str, Any], budget: Dict[str, Any]) -> List[str]:
+    problems = []
+    for key in ("first_window_ms", "import_app_ms"):
+        limit = budget.get(key)
+        if limit is not None and report[key] > limit:
+            problems.append(f"{key} {report[key]:0.0f} > budget {limit:0.0f}")
+    for name in report["deferred_loaded_early"]:
+        problems.append(f"{name} was imported before the first window")
+    return problems
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--runs", type=int, default=3, help="fresh interpreters to start (medians are reported)")
+    ap.add_argument("--budget", default=str(BUDGET_PATH))
+    ap.add_argument("--write-budget", action="store_true", help="store the measured medians (+headroom) as budget")
+    ap.add_argument("--out", help="write JSON here instead of stdout")
+    args = ap.parse_args(argv)
+
+    if args.child:
+        return _child()
+
+    runs = [run_once() for _ in range(max(1, args.runs))]
+    last = runs[-1]
+
+    budget_path = Path(args.budget)
+    budget: Dict[str, Any] = {}
+    if budget_path.exists():
+        budget = json.loads(budget_path.read_text(encoding="utf-8"))
+    deferred = list(budget.get("deferred_modules", []))
+
+    slowest = sorted(last["imports"], key=lambda x: x[1], reverse=True)[:TOP_IMPORTS]
+    report: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": len(runs),
+        "first_window_ms": statistics.median(r["first_window_ms"] for r in runs),
+        "import_app_ms": statistics.median(r["import_app_ms"] for r in runs),
+        "window_ms": statistics.median(r["window_ms"] for r in runs),
+        "slowest_imports_ms": [{"module": m, "self": s, "cumulative": c} for m, s, c in slowest],
+        "deferred_loaded_early": [m for m in deferred if m in last["modules"]],
+    }
+
+    if args.write_budget:
+        budget.update({
+            "first_window_ms": round(report["first_window_ms"] * HEADROOM),
+            "import_app_ms": round(report["import_app_ms"] * HEADROOM),
+        })
+        budget.setdefault("deferred_modules", deferred)
+        budget_path.write_text(json.dumps(budget, indent=2) + "\n", encoding="utf-8")
+
+    problems = check_budget(report, budget)
+    report["budget"] = budget
+    report["over_budget"] = problems
+
+    print(
+        f"first window {report['first_window_ms']:0.0f}ms (import app {report['import_app_ms']:0.0f}ms, "
+        f"window {report['window_ms']:0.0f}ms)",
+        file=sys.stderr,
+    )
+    for p in problems:
+        print(f"OVER BUDGET: {p}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import time
+from array import array
+
+
+def _f64(n: int) -> array:
+    return array("d", bytes(8 * n))
+
+
+def _i64(n: int) -> array:
+    return array("q", bytes(8 * n))
+
+
+class _Columns:
+    """One preallocated array per ItemState field, indexed by slot."""
+
+    __slots__ = ("size", "uses", "missed", "next_fire", "last_fire", "started", "configured_hz")
+
+    def __init__(self, size: int = 0) -> None:
+        self._alloc(size)
+
+    def _alloc(self, size: int) -> None:
+        self.size = size
+        self.uses = _i64(size)
+        self.missed = _i64(size)
+        self.next_fire = _f64(size)
+        self.last_fire = _f64(size)
+        self.started = _f64(size)
+        self.configured_hz = _f64(size)
+
+    def achieved_hz(self, slot: int, now: float) -> float:
+        started = self.started[slot]
+        elapsed = now - started
+        if started <= 0.0 or elapsed <= 0.0:
+            return 0.0
+        return self.uses[slot] / elapsed
+
+
+class StateView(_Columns):
+    """A reader's private copy of a StateStore, reused across reads."""
+
+    __slots__ = ("version",)
+
+    def __init__(self) -> None:
+        super().__init__(0)
+        self.version = -1
+
+
+class StateStore(_Columns):
+    """Scheduler item state in array columns, one slot per item position.
+
+    Writers (the scheduler, holding its own lock) bracket every change with
+    begin_write()/end_write(), which bumps a sequence counter to odd and back
+    to even. Readers never take a lock: read_into() copies every column into a
+    StateView (a memcpy per column, no per-item objects) and retries if the
+    counter moved or was odd meanwhile.
+    """
+
+    __slots__ = ("version",)
+
+    def __init__(self, size: int) -> None:
+        super().__init__(size)
+        self.version = 0
+
+    def begin_write(self) -> None:
+        self.version += 1
+
+    def end_write(self) -> None:
+        self.version += 1
+
+    def resize(self, size: int) -> None:
+        """Reallocates for `size` slots, keeping the common prefix. Call inside a write."""
+        old = (self.uses, self.missed, self.next_fire, self.last_fire, self.started, self.configured_hz)
+        self._alloc(size)
+        keep = min(size, len(old[0]))
+        for dst, src in zip(
+            (self.uses, self.missed, self.next_fire, self.last_fire, self.started, self.configured_hz), old
+        ):
+            dst[:keep] = src[:keep]
+
+    def read_into(self, view: StateView) -> bool:
+        """Copies a consistent state into `view`. Returns False if it was already current."""
+        if view.version == self.version:
+            return False
+
+        while True:
+            v = self.version
+            if v & 1:
+                time.sleep(0)
+                continue
+
+            if view.size != self.size:
+                view._alloc(self.size)
+            view.uses[:] = self.uses
+            view.missed[:] = self.missed
+            view.next_fire[:] = self.next_fire
+            view.last_fire[:] = self.last_fire
+            view.started[:] = self.started
+            view.configured_hz[:] = self.configured_hz
+
+            if self.version == v:
+                view.version = v
+                return True
@@ -1,18 +1,40 @@
 from __future__ import annotations
 
+import atexit
+import hashlib
 import json
 import os
+import stat
 import sys
+import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from models import MacroItem
+from models import MacroItem, Profile
 
 
 DEFAULT_CONFIG: Dict[str, Any] = {
     "hotkey": "Ctrl+Q",
-    "overlay": {"x": 40, "y": 40, "always_on_top": True, "opacity": 0.95},
-    "tool_use": {"enabled": False, "interval_ms": 30},
+    # extra bindings: [{"combo": "Ctrl+Shift+1", "action": "toggle_item", "arg": "Gumdrop"}, ...]
+    "hotkeys": [{"combo": "Ctrl+Shift+P", "action": "pause", "arg": ""}],
+    "overlay": {
+        "x": 40, "y": 40, "always_on_top": True, "opacity": 0.95, "show_late_p99": False,
+        # countdown updates per second; more than max_rows items scroll; compact = shorter rows
+        "refresh_hz": 10, "max_rows": 12, "compact": False,
+    },
+    "tool_use": {"enabled": False, "interval_ms": 30, "clicks_per_injection": 1},
+    "scheduler": {"engine": "deadline"},
+    "dispatch": {"enabled": True, "queue_size": 64, "overflow": "drop_oldest"},
+    "input": {"backend": "pynput"},
+    "limiter": {"enabled": False, "rate_hz": 50, "burst": 10, "min_spacing_ms": 0},
+    "planner": {"enabled": True, "min_spacing_ms": 100, "resolution_ms": 10, "budget_ms": 250, "preview_minutes": 5},
+    "hot_reload": {"enabled": True, "poll_ms": 1000},
+    # items / tool_use above are the active profile; the others are kept here:
+    # [{"name", "items", "tool_use", "hotkey"}, ...]
+    "active_profile": "Default",
+    "profiles": [],
     "items": [
         {"name": "Gumdrop",      "key": "2", "interval_ms": 3000, "jitter_min_ms": 0,   "jitter_max_ms": 0,   "enabled": True},
         {"name": "Jelly Beans",  "key": "3", "interval_ms": 9500, "jitter_min_ms": 0,   "jitter_max_ms": 0,   "enabled": True},
@@ -60,16 +82,34 @@ def _is_writable_dir(d: Path) -> bool:
         return False
 
 
+_resolved_cfg_path: Optional[Path] = None
+
+
 def resolve_cfg_path() -> Path:
+    """favwhite.cfg next to the exe if that folder is writable, else in AppData.
+
+    Probed once per process; the write test isn't repeated on every load/save.
+    """
+    global _resolved_cfg_path
+    if _resolved_cfg_path is not None:
+        return _resolved_cfg_path
+
     primary = cfg_path()
     if _is_writable_dir(primary.parent):
+        _resolved_cfg_path = primary
         return primary
 
     fallback = _appdata_cfg_path()
     fallback.parent.mkdir(parents=True, exist_ok=True)
+    _resolved_cfg_path = fallback
     return fallback
 
 
+def data_path(name: str) -> Path:
+    """A file kept next to favwhite.cfg (caches and the like)."""
+    return resolve_cfg_path().parent / name
+
+
 def _deep_merge(defaults: Dict[str, Any], user: Dict[str, Any]) -> Dict[str, Any]:
     out = dict(defaults)
     for k, v in (user or {}).items():
@@ -80,31 +120,282 @@ def _deep_merge(defaults: Dict[str, Any], user: Dict[str, Any]) -> Dict[str, Any
     return out
 
 
+# hash of what favwhite.cfg is known to contain (last read or written), per path
+_known_hash: Dict[Path, bytes] = {}
+_write_lock = threading.Lock()
+
+
+def _serialize(cfg: Dict[str, Any]) -> bytes:
+    return json.dumps(cfg, indent=2).encode("utf-8")
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _file_mode(p: Path) -> int:
+    try:
+        return stat.S_IMODE(p.stat().st_mode)
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_file_atomic(p: Path, data: bytes) -> None:
+    """Temp file in the same folder + fsync + rename: a crash leaves the old file or the new one."""
+    p.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(p.parent), prefix=f".{p.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp makes the file 0600: keep the old file's mode, or what a plain open() would give
+        os.chmod(tmp, _file_mode(p))
+        os.replace(tmp, p)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _write_if_changed(p: Path, data: bytes) -> bool:
+    digest = _digest(data)
+    with _write_lock:
+        if _known_hash.get(p) == digest:
+            return False
+        write_file_atomic(p, data)
+        _known_hash[p] = digest
+        return True
+
+
 def load_config() -> Dict[str, Any]:
+    """Reads favwhite.cfg merged over DEFAULT_CONFIG.
+
+    The file is only written when it is missing or lacks keys from
+    DEFAULT_CONFIG.
+    """
     p = resolve_cfg_path()
     if p.exists():
-        with p.open("r", encoding="utf-8") as f:
-            cfg = json.load(f)
+        data = p.read_bytes()
+        cfg = json.loads(data.decode("utf-8"))
+        with _write_lock:
+            _known_hash[p] = _digest(data)
         merged = _deep_merge(DEFAULT_CONFIG, cfg)
-        save_config(merged)
+        if merged != cfg:
+            # a key was filled in; the user's own formatting is kept otherwise
+            save_config(merged)
         return merged
 
     save_config(DEFAULT_CONFIG)
     return dict(DEFAULT_CONFIG)
 
 
-def save_config(cfg: Dict[str, Any]) -> None:
-    p = resolve_cfg_path()
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open("w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2)
+def save_config(cfg: Dict[str, Any]) -> bool:
+    """Writes favwhite.cfg now (atomically). Returns False if the content was unchanged.
+
+    Supersedes any save_config_async() still pending.
+    """
+    _writer.cancel()
+    return _write_if_changed(resolve_cfg_path(), _serialize(cfg))
+
+
+class _DebouncedWriter:
+    """Background thread writing the latest scheduled config after a quiet period."""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._pending: Optional[Tuple[Path, bytes]] = None
+        self._due = 0.0
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, p: Path, data: bytes, delay_s: float) -> None:
+        with self._cond:
+            self._pending = (p, data)
+            self._due = time.monotonic() + delay_s
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def cancel(self) -> None:
+        with self._cond:
+            self._pending = None
+
+    def flush(self) -> None:
+        with self._cond:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            _write_if_changed(*pending)
 
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                remaining = self._due - time.monotonic()
+                if remaining > 0.0:
+                    # a newer schedule() may move the deadline; re-check after waking
+                    self._cond.wait(remaining)
+                    continue
+                pending, self._pending = self._pending, None
+            try:
+                _write_if_changed(*pending)
+            except Exception:
+                # keep the writer alive; the next save retries (the hash wasn't recorded)
+                pass
 
-def load_items(cfg: Dict[str, Any]) -> List[MacroItem]:
+
+_writer = _DebouncedWriter()
+atexit.register(_writer.flush)
+
+SAVE_DEBOUNCE_S = 0.5
+
+
+def save_config_async(cfg: Dict[str, Any], delay_s: float = SAVE_DEBOUNCE_S) -> None:
+    """Schedules a save on a background thread; saves within delay_s coalesce into one write.
+
+    cfg is serialised now, so later changes to it aren't picked up. Pending
+    saves are written by flush_config() and at interpreter exit.
+    """
+    _writer.schedule(resolve_cfg_path(), _serialize(cfg), delay_s)
+
+
+def flush_config() -> None:
+    """Writes a pending save_config_async() now, on the calling thread."""
+    _writer.flush()
+
+
+WATCH_INTERVAL_S = 1.0
+
+
+class ConfigWatcher:
+    """Polls favwhite.cfg and calls callback(cfg) when someone else changed it.
+
+    Each poll is one stat() of the file; it is only read when its mtime or
+    size moved. Content this process wrote itself, or that didn't change, is
+    ignored, and so is a file that doesn't parse (an editor mid-save); the
+    next change is picked up again. callback gets the config merged over
+    DEFAULT_CONFIG and runs on the watcher thread.
+    """
+
+    def __init__(self, callback: Callable[[Dict[str, Any]], None], interval_s: float = WATCH_INTERVAL_S) -> None:
+        self._callback = callback
+        self._interval_s = max(0.05, float(interval_s))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sig: Optional[Tuple[int, int]] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._sig = self._stat(resolve_cfg_path())
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    @staticmethod
+    def _stat(p: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = p.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self) -> bool:
+        """Checks once. Returns True if callback was called."""
+        p = resolve_cfg_path()
+        sig = self._stat(p)
+        if sig is None or sig == self._sig:
+            return False
+        self._sig = sig
+
+        try:
+            data = p.read_bytes()
+            cfg = json.loads(data.decode("utf-8"))
+        except (OSError, ValueError):
+            return False
+        if not isinstance(cfg, dict):
+            return False
+
+        digest = _digest(data)
+        with _write_lock:
+            if _known_hash.get(p) == digest:
+                return False
+            _known_hash[p] = digest
+
+        self._callback(_deep_merge(DEFAULT_CONFIG, cfg))
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_s):
+            try:
+                self.poll()
+            except Exception:
+                # keep watching
+                pass
+
+
+def load_items(cfg: Dict[str, Any], repair: bool = False) -> List[MacroItem]:
+    """Raises ValueError for an item with unusable timing, unless repair (see MacroItem.from_dict)."""
     items_raw = cfg.get("items", [])
-    return [MacroItem.from_dict(x) for x in items_raw]
+    return [MacroItem.from_dict(x, repair) for x in items_raw]
 
 
 def write_items(cfg: Dict[str, Any], items: List[MacroItem]) -> Dict[str, Any]:
     cfg["items"] = [i.to_dict() for i in items]
     return cfg
+
+
+def load_profiles(cfg: Dict[str, Any], repair: bool = False) -> List[Profile]:
+    """Every profile, parsed. The active one is built from the top-level items and tool_use.
+
+    Raises ValueError like load_items(); repair fixes such items up instead.
+    """
+    active = str(cfg.get("active_profile") or "Default")
+    profiles: List[Profile] = []
+    names = set()
+    for d in cfg.get("profiles", []) or []:
+        if not isinstance(d, dict):
+            continue
+        p = Profile.from_dict(d, repair)
+        if p.name and p.name not in names:
+            names.add(p.name)
+            profiles.append(p)
+
+    tool_use = cfg.get("tool_use", {})
+    current = Profile(
+        active,
+        load_items(cfg, repair),
+        {"enabled": bool(tool_use.get("enabled", False)), "interval_ms": int(tool_use.get("interval_ms", 30))},
+    )
+    for i, p in enumerate(profiles):
+        if p.name == active:
+            current.hotkey = p.hotkey
+            profiles[i] = current
+            break
+    else:
+        profiles.insert(0, current)
+    return profiles
+
+
+def write_profiles(cfg: Dict[str, Any], profiles: List[Profile], active: str) -> Dict[str, Any]:
+    """Stores the profiles and makes `active` the top-level items / tool_use."""
+    cfg["profiles"] = [p.to_dict() for p in profiles]
+    cfg["active_profile"] = active
+    for p in profiles:
+        if p.name == active:
+            write_items(cfg, p.items)
+            cfg["tool_use"] = {**cfg.get("tool_use", {}), **p.tool_use}
+            break
+    return cfg
+
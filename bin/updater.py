@@ -0,0 +1,197 @@
+"""Update check against the remote version file named in version.json.
+
+The answer is cached next to favwhite.cfg for CACHE_TTL_S, so most launches
+do no network I/O at all. Once the cache is stale the file is fetched with
+If-None-Match / If-Modified-Since and a 304 just renews the cache. Any
+failure (offline, timeout, bad JSON) falls back to the cached answer, or to
+"unknown", which never blocks the app. UpdateChecker runs the check on a
+background thread.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from storage import data_path, write_file_atomic
+
+
+DEFAULT_UPDATE_URL = "https://github.com/Kreativscripts/FavWhite"
+DEFAULT_CHECKER_URL = "https://favnc.pages.dev/bss/whm.json"
+
+CACHE_NAME = "update_cache.json"
+CACHE_TTL_S = 6 * 3600
+TIMEOUT_S = 3.5
+
+# UpdateResult.source
+SOURCE_CACHE = "cache"                # fresh cache, no request
+SOURCE_NETWORK = "network"            # 200 from the checker
+SOURCE_NOT_MODIFIED = "not_modified"  # 304, cached version still current
+SOURCE_ERROR = "error"                # request failed; remote_version is the stale cache, if any
+SOURCE_DISABLED = "disabled"          # no version_checker configured
+
+
+def _exe_dir() -> Path:
+    if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
+        return Path(sys._MEIPASS).resolve()
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).resolve().parent
+    return Path(__file__).resolve().parent
+
+
+@lru_cache(maxsize=None)
+def read_version_json() -> Dict[str, Any]:
+    """version.json shipped with the build; read once per process."""
+    p = _exe_dir() / "version.json"
+    try:
+        data = json.loads(p.read_text(encoding="utf-8"))
+        if isinstance(data, dict):
+            return data
+    except Exception:
+        pass
+    return {
+        "version": "unknown",
+        "version_checker": DEFAULT_CHECKER_URL,
+        "update_url": DEFAULT_UPDATE_URL,
+    }
+
+
+def extract_remote_version(payload: Any) -> Optional[str]:
+    if payload is None:
+        return None
+    if isinstance(payload, str):
+        return payload.strip()
+    if isinstance(payload, dict):
+        if isinstance(payload.get("version"), str):
+            return payload["version"].strip()
+        for v in payload.values():
+            if isinstance(v, str):
+                return v.strip()
+    return None
+
+
+@dataclass
+class UpdateResult:
+    local_version: str
+    remote_version: Optional[str]
+    update_url: str
+    source: str
+    error: str = ""
+
+    @property
+    def update_available(self) -> bool:
+        return bool(self.remote_version) and self.remote_version != self.local_version
+
+
+def _load_cache(p: Path, url: str) -> Dict[str, Any]:
+    try:
+        cache = json.loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    if not isinstance(cache, dict) or cache.get("url") != url:
+        return {}
+    return cache
+
+
+def _save_cache(p: Path, cache: Dict[str, Any]) -> None:
+    try:
+        write_file_atomic(p, json.dumps(cache, indent=2).encode("utf-8"))
+    except OSError:
+        # not cached: the next launch asks again
+        pass
+
+
+def check(
+    version_info: Optional[Dict[str, Any]] = None,
+    cache_path: Optional[Path] = None,
+    ttl_s: float = CACHE_TTL_S,
+    timeout_s: float = TIMEOUT_S,
+    clock: Callable[[], float] = time.time,
+) -> UpdateResult:
+    """Blocking check; see the module docstring. Never raises for network trouble."""
+    info = version_info if version_info is not None else read_version_json()
+    local = str(info.get("version", "unknown")).strip()
+    url = str(info.get("version_checker", "")).strip()
+    update_url = str(info.get("update_url", DEFAULT_UPDATE_URL)).strip()
+    if not url:
+        return UpdateResult(local, None, update_url, SOURCE_DISABLED)
+
+    p = cache_path if cache_path is not None else data_path(CACHE_NAME)
+    cache = _load_cache(p, url)
+    cached = cache.get("remote_version")
+    now = clock()
+    if cached and 0.0 <= now - float(cache.get("checked_at", 0.0)) < ttl_s:
+        return UpdateResult(local, cached, update_url, SOURCE_CACHE)
+
+    # only needed on a cache miss, and kept off the startup path
+    import urllib.error
+    import urllib.request
+
+    headers = {"User-Agent": f"FavWhite/{local}"}
+    if cached:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    try:
+        req = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+            raw = resp.read().decode("utf-8", errors="replace")
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+        remote = extract_remote_version(json.loads(raw))
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached:
+            cache["checked_at"] = now
+            _save_cache(p, cache)
+            return UpdateResult(local, cached, update_url, SOURCE_NOT_MODIFIED)
+        return UpdateResult(local, cached, update_url, SOURCE_ERROR, f"HTTP {e.code}")
+    except Exception as e:
+        return UpdateResult(local, cached, update_url, SOURCE_ERROR, f"{type(e).__name__}: {e}")
+
+    if not remote:
+        return UpdateResult(local, None, update_url, SOURCE_ERROR, "no version in response")
+
+    _save_cache(p, {
+        "url": url,
+        "checked_at": now,
+        "remote_version": remote,
+        "etag": etag or "",
+        "last_modified": last_modified or "",
+    })
+    return UpdateResult(local, remote, update_url, SOURCE_NETWORK)
+
+
+class UpdateChecker:
+    """Runs check() on a daemon thread and passes the UpdateResult to callback (on that thread)."""
+
+    def __init__(self, callback: Callable[[UpdateResult], None], **check_kwargs: Any) -> None:
+        self._callback = callback
+        self._kwargs = check_kwargs
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            result = check(**self._kwargs)
+        except Exception as e:
+            info = read_version_json()
+            result = UpdateResult(
+                str(info.get("version", "unknown")), None, DEFAULT_UPDATE_URL, SOURCE_ERROR, str(e)
+            )
+        self._callback(result)
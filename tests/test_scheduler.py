@@ -0,0 +1,200 @@
+"""MacroScheduler, mostly on a VirtualClock: missed-tick policies, live item changes, pause and halt."""
+from __future__ import annotations
+
+import random
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "bin"))
+
+from models import MISSED_BURST, MISSED_COALESCE, MISSED_SKIP, MacroItem  # noqa: E402
+from scheduler import ENGINE_DEADLINE, ENGINE_POLLING, InputDispatcher, MacroScheduler  # noqa: E402
+from simulation import VirtualClock  # noqa: E402
+
+START = 1000.0
+
+
+class _Run:
+    """A scheduler on a VirtualClock; at() queues calls made once virtual time reaches t."""
+
+    def __init__(self, items, engine=ENGINE_DEADLINE, stall_at=None, stall_s=0.0):
+        self.clock = VirtualClock(start=START)
+        self.sent = []
+        self._stall_at = stall_at
+        self._stall_s = stall_s
+        self._due = []
+        self.sched = MacroScheduler(
+            items,
+            self._send,
+            engine=engine,
+            clock=self.clock.now,
+            sleeper=self._sleep,
+            rng=random.Random(0),
+        )
+
+    def _send(self, key):
+        self.sent.append((self.clock.now() - START, key))
+        if self._stall_at is not None and len(self.sent) == self._stall_at:
+            # the send blocks: stall, system sleep, ...
+            self.clock.advance(self._stall_s)
+
+    def _sleep(self, seconds):
+        # wakes early for a queued call, like the real loop does on _wake
+        if self._due and self._due[0][0] < self.clock.now() - START + seconds:
+            t, fn = self._due.pop(0)
+            self.clock.sleep(max(0.0, t - (self.clock.now() - START)))
+            fn()
+            return
+        self.clock.sleep(seconds)
+
+    def at(self, t, fn):
+        self._due.append((t, fn))
+        self._due.sort(key=lambda x: x[0])
+
+    def simulate(self, duration_s):
+        return self.sched.simulate(duration_s)
+
+    def state(self, slot):
+        return self.sched.snapshot()[slot]
+
+    def fires(self, timeline, name):
+        return [round(r.actual - START, 3) for r in timeline if r.name == name]
+
+
+def _item(name, interval_ms, **kw):
+    return MacroItem(name=name, key=name[0], interval_ms=interval_ms, **kw)
+
+
+class MissedPolicyTest(unittest.TestCase):
+    # 100 ms fixed-rate item; the third send (t=0.3) stalls for 1.05 s, so the
+    # deadlines 0.4 ... 1.3 (ten of them) pass while it is blocked
+    def run_policy(self, policy):
+        run = _Run([_item("fixed", 100, fixed_rate=True, missed_policy=policy)], stall_at=3, stall_s=1.05)
+        timeline = run.simulate(1.95)
+        return run, run.fires(timeline, "fixed")
+
+    def test_skip_drops_the_missed_fires(self):
+        run, fires = self.run_policy(MISSED_SKIP)
+        self.assertEqual(fires, [0.1, 0.2, 0.3, 1.4, 1.5, 1.6, 1.7, 1.8, 1.9])
+        self.assertEqual(run.state(0).missed, 10)
+
+    def test_coalesce_fires_once_and_rejoins_the_grid(self):
+        run, fires = self.run_policy(MISSED_COALESCE)
+        self.assertEqual(fires, [0.1, 0.2, 0.3, 1.35, 1.4, 1.5, 1.6, 1.7, 1.8, 1.9])
+        self.assertEqual(run.state(0).missed, 9)
+
+    def test_burst_replays_the_missed_fires(self):
+        run, fires = self.run_policy(MISSED_BURST)
+        self.assertEqual(fires, [0.1, 0.2, 0.3] + [1.35] * 10 + [1.4, 1.5, 1.6, 1.7, 1.8, 1.9])
+        self.assertEqual(run.state(0).missed, 0)
+
+    def test_fixed_rate_does_not_drift(self):
+        run = _Run([_item("fixed", 100, fixed_rate=True)])
+        timeline = run.sched.simulate(10.05)
+        planned = [round(r.planned - START, 6) for r in timeline]
+        self.assertEqual(planned, [round(0.1 * k, 6) for k in range(1, 101)])
+
+
+class ApplyItemsTest(unittest.TestCase):
+    def test_unchanged_items_keep_their_timer_and_grid(self):
+        run = _Run([_item("a", 1000), _item("b", 1500)])
+        kept = {}
+
+        def swap():
+            kept["timer"] = run.sched._timer_by_slot[0]
+            run.sched.apply_items([_item("a", 1000), _item("b", 700), _item("c", 400)])
+
+        run.at(2.2, swap)
+        timeline = run.simulate(4.05)
+
+        self.assertIs(run.sched._timer_by_slot[0], kept["timer"])
+        self.assertEqual(run.fires(timeline, "a"), [1.0, 2.0, 3.0, 4.0])
+        # b's pending deadline (3.0) was later than one new interval from now
+        self.assertEqual(run.fires(timeline, "b"), [1.5, 2.9, 3.6])
+        self.assertEqual(run.fires(timeline, "c"), [2.6, 3.0, 3.4, 3.8])
+        self.assertEqual(run.state(0).uses, 4)
+
+    def test_reenabling_a_config_disabled_item_starts_it_over(self):
+        run = _Run([_item("on", 1000), _item("off", 500, enabled=False, fixed_rate=True, missed_policy=MISSED_BURST)])
+        run.at(50.0, lambda: run.sched.apply_items([_item("on", 1000), _item("off", 500, fixed_rate=True, missed_policy=MISSED_BURST)]))
+        timeline = run.simulate(51.6)
+
+        self.assertEqual(run.fires(timeline, "off"), [50.5, 51.0, 51.5])
+        self.assertEqual(run.state(1).missed, 0)
+
+    def test_reenabling_a_hotkey_disabled_item_starts_it_over(self):
+        run = _Run([_item("on", 1000), _item("off", 500, fixed_rate=True, missed_policy=MISSED_BURST)])
+        run.at(5.2, lambda: run.sched.set_item_enabled(1, False))
+        run.at(50.0, lambda: run.sched.apply_items([_item("on", 1000), _item("off", 500, fixed_rate=True, missed_policy=MISSED_BURST)]))
+        timeline = run.simulate(51.6)
+
+        fires = run.fires(timeline, "off")
+        self.assertEqual(fires[-3:], [50.5, 51.0, 51.5])
+        self.assertEqual(len(fires), 13)
+        self.assertEqual(run.state(1).missed, 0)
+        # counters carry over
+        self.assertEqual(run.state(1).uses, 13)
+
+    def test_disabled_items_have_no_deadline(self):
+        run = _Run([_item("on", 1000), _item("off", 500, enabled=False)])
+        run.simulate(1.0)
+        self.assertEqual(run.state(1).next_fire_monotonic, 0.0)
+
+    def test_polling_engine_reenables_the_same_way(self):
+        run = _Run([_item("on", 1000), _item("off", 500, enabled=False)], engine=ENGINE_POLLING)
+        run.at(20.0, lambda: run.sched.apply_items([_item("on", 1000), _item("off", 500)]))
+        timeline = run.simulate(21.3)
+        # 50 ms ticks: one interval after the reload, give or take a tick
+        fires = run.fires(timeline, "off")
+        self.assertEqual(len(fires), 2)
+        self.assertTrue(20.5 <= fires[0] <= 20.65, fires)
+
+
+class PauseHaltTest(unittest.TestCase):
+    def test_pause_keeps_the_remaining_time(self):
+        run = _Run([_item("a", 1000)])
+        run.at(2.4, run.sched.pause)
+        run.at(5.0, run.sched.resume)
+        timeline = run.simulate(7.0)
+        # 0.6 s were left at the pause
+        self.assertEqual(run.fires(timeline, "a"), [1.0, 2.0, 5.6, 6.6])
+        self.assertEqual([t for t, _ in run.sent if 2.4 < t < 5.0], [])
+
+    def test_nothing_is_sent_after_halt(self):
+        run = _Run([_item("a", 100), _item("b", 250)])
+        run.at(1.0, run.sched.halt)
+        run.simulate(3.0)
+        self.assertTrue(run.sent)
+        self.assertLessEqual(max(t for t, _ in run.sent), 1.0)
+
+    def test_stop_releases_a_key_the_worker_pressed_after_halt(self):
+        # real threads: halt() lands while the dispatcher is injecting the key down
+        events = []
+        in_down = threading.Event()
+        go = threading.Event()
+
+        def down(key):
+            in_down.set()
+            go.wait(2.0)
+            events.append(("down", key))
+
+        it = _item("hold", 100, steps=[{"op": "hold", "key": "5", "ms": 400}])
+        sched = MacroScheduler(
+            [it], lambda key: None, dispatcher=InputDispatcher(),
+            key_down_fn=down, key_up_fn=lambda key: events.append(("up", key)),
+        )
+        sched.start()
+        self.assertTrue(in_down.wait(2.0))
+        time.sleep(0.05)
+        sched.halt()
+        go.set()
+        sched.stop()
+        self.assertEqual(events[-1], ("up", "5"))
+        self.assertIn(("down", "5"), events)
+
+
+if __name__ == "__main__":
+    unittest.main()
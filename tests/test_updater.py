@@ -0,0 +1,162 @@
+"""updater.check() and UpdateChecker against a local HTTP stand-in for the version checker."""
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "bin"))
+
+import updater  # noqa: E402
+
+
+class _Checker(BaseHTTPRequestHandler):
+    # behaviour comes from attributes set on the server in setUp()
+    def do_GET(self):
+        srv = self.server
+        srv.requests.append(dict(self.headers))
+        if srv.delay_s:
+            time.sleep(srv.delay_s)
+        if srv.status != 200:
+            self.send_response(srv.status)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == srv.etag:
+            self.send_response(304)
+            self.send_header("ETag", srv.etag)
+            self.end_headers()
+            return
+        body = json.dumps({"version": srv.version}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", srv.etag)
+        self.send_header("Last-Modified", "Wed, 01 Jan 2025 00:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class UpdaterTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Checker)
+        self.server.daemon_threads = True
+        self.server.requests = []
+        self.server.delay_s = 0.0
+        self.server.status = 200
+        self.server.version = "1.1"
+        self.server.etag = '"v1"'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = Path(self._tmp.name) / updater.CACHE_NAME
+        self.now = 1000.0
+        self.info = {
+            "version": "1.0",
+            "version_checker": f"http://127.0.0.1:{self.server.server_address[1]}/whm.json",
+            "update_url": "https://example.invalid/download",
+        }
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp.cleanup()
+
+    def check(self, **kw):
+        kw.setdefault("timeout_s", 2.0)
+        return updater.check(self.info, cache_path=self.cache, ttl_s=60.0, clock=lambda: self.now, **kw)
+
+    def test_fetch_writes_cache_and_ttl_skips_the_network(self):
+        r = self.check()
+        self.assertEqual(r.source, updater.SOURCE_NETWORK)
+        self.assertEqual(r.remote_version, "1.1")
+        self.assertTrue(r.update_available)
+
+        cache = json.loads(self.cache.read_text(encoding="utf-8"))
+        self.assertEqual(cache["remote_version"], "1.1")
+        self.assertEqual(cache["etag"], '"v1"')
+        self.assertEqual(cache["checked_at"], 1000.0)
+
+        self.now += 59.0
+        r = self.check()
+        self.assertEqual(r.source, updater.SOURCE_CACHE)
+        self.assertEqual(r.remote_version, "1.1")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_stale_cache_revalidates_with_304(self):
+        self.check()
+        self.now += 61.0
+        r = self.check()
+        self.assertEqual(r.source, updater.SOURCE_NOT_MODIFIED)
+        self.assertEqual(r.remote_version, "1.1")
+
+        sent = self.server.requests[-1]
+        self.assertEqual(sent.get("If-None-Match"), '"v1"')
+        self.assertEqual(sent.get("If-Modified-Since"), "Wed, 01 Jan 2025 00:00:00 GMT")
+        # the 304 renewed the TTL
+        self.assertEqual(json.loads(self.cache.read_text(encoding="utf-8"))["checked_at"], 1061.0)
+        self.now += 30.0
+        self.assertEqual(self.check().source, updater.SOURCE_CACHE)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_changed_etag_fetches_the_new_version(self):
+        self.check()
+        self.server.version = "1.2"
+        self.server.etag = '"v2"'
+        self.now += 61.0
+        r = self.check()
+        self.assertEqual(r.source, updater.SOURCE_NETWORK)
+        self.assertEqual(r.remote_version, "1.2")
+        cache = json.loads(self.cache.read_text(encoding="utf-8"))
+        self.assertEqual((cache["remote_version"], cache["etag"]), ("1.2", '"v2"'))
+
+    def test_server_error_falls_back_to_the_cache(self):
+        self.check()
+        self.server.status = 500
+        self.now += 61.0
+        r = self.check()
+        self.assertEqual(r.source, updater.SOURCE_ERROR)
+        self.assertEqual(r.error, "HTTP 500")
+        self.assertEqual(r.remote_version, "1.1")
+
+    def test_server_error_without_cache(self):
+        self.server.status = 500
+        r = self.check()
+        self.assertEqual(r.source, updater.SOURCE_ERROR)
+        self.assertIsNone(r.remote_version)
+        self.assertFalse(r.update_available)
+        self.assertFalse(self.cache.exists())
+
+    def test_slow_server_times_out_without_blocking_the_caller(self):
+        self.server.delay_s = 1.5
+        results = []
+        done = threading.Event()
+
+        def on_result(r):
+            results.append(r)
+            done.set()
+
+        t0 = time.monotonic()
+        checker = updater.UpdateChecker(
+            on_result, version_info=self.info, cache_path=self.cache, timeout_s=0.3, clock=lambda: self.now
+        )
+        checker.start()
+        # the caller (the GUI thread in the app) gets control back right away
+        self.assertLess(time.monotonic() - t0, 0.2)
+        self.assertFalse(done.is_set())
+
+        self.assertTrue(done.wait(1.2))
+        self.assertEqual(results[0].source, updater.SOURCE_ERROR)
+        self.assertIsNone(results[0].remote_version)
+        self.assertLess(time.monotonic() - t0, 1.2)
+
+
+if __name__ == "__main__":
+    unittest.main()